@@ -1,4 +1,5 @@
 # -*- mode: python ; coding: utf-8 -*-
+from PyInstaller.utils.hooks import collect_submodules
 
 
 a = Analysis(
@@ -6,7 +7,7 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[('resources', 'resources'), ('system_prompts\\*.txt', 'system_prompts'), ('output_cards', 'output_cards')],
-    hiddenimports=[],
+    hiddenimports=collect_submodules('core'),
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
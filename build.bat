@@ -14,6 +14,15 @@ if not exist system_prompts (
   exit /b 1
 )
 
+:: Compile Qt resources to a binary .rcc (loaded on demand by the Support tab)
+echo Compiling Qt resources...
+where rcc >nul 2>nul
+if %errorlevel% equ 0 (
+  rcc -binary resources\resources.qrc -o resources\resources.rcc
+) else (
+  echo rcc not found, falling back to the embedded resources.py module
+)
+
 :: Execute PyInstaller packaging command
 echo Executing PyInstaller...
 pyinstaller --name=Memoride --windowed --clean ^
@@ -21,6 +30,7 @@ pyinstaller --name=Memoride --windowed --clean ^
   --add-data "resources;resources" ^
   --add-data "system_prompts\*.txt;system_prompts" ^
   --add-data "output_cards;output_cards" ^
+  --collect-submodules core ^
   --exclude PyQt6 --exclude PySide6 ^
   main.py
 
@@ -1,14 +1,41 @@
 """
 核心功能模块，提供日志、配置和错误处理等基础服务。
+
+导出的类按需导入（模块级 __getattr__），``import core`` 本身不会加载
+PyQt5 或网络库，无界面的工具可以只使用其中的API层。
 """
 
-# 导出主要类，使其可以通过 from core import X 直接导入
-from core.error_handler import ErrorHandler
-from core.api import get_api_handler
-from core.config import Config
-from core.config_manager import ConfigManager
-from core.logging import Logger
-from core.models import OllamaModelManager, RemoteApiManager, ModelLoader, ModelManager
+import importlib
+
+# 导出主要类，使其可以通过 from core import X 直接导入：名称 -> 所在模块
+_LAZY_EXPORTS = {
+    'Logger': 'core.logging',
+    'Config': 'core.config',
+    'ConfigManager': 'core.config_manager',
+    'ErrorHandler': 'core.error_handler',
+    'get_api_handler': 'core.api',
+    'OllamaModelManager': 'core.models',
+    'RemoteApiManager': 'core.models',
+    'ModelLoader': 'core.models',
+    'ModelManager': 'core.models',
+}
+
+__all__ = list(_LAZY_EXPORTS)
+
+
+def _load_lazy_export(module_globals, exports, name):
+    """导入导出名称所在的模块，并缓存到包的命名空间中"""
+    module_path = exports.get(name)
+    if module_path is None:
+        raise AttributeError(f"module {module_globals['__name__']!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_path), name)
+    module_globals[name] = value
+    return value
+
+
+def __getattr__(name):
+    return _load_lazy_export(globals(), _LAZY_EXPORTS, name)
+
 
-# 版本信息
-__all__ = ['Logger', 'Config', 'ConfigManager', 'ErrorHandler', 'get_api_handler', 'OllamaModelManager', 'RemoteApiManager', 'ModelLoader', 'ModelManager']
\ No newline at end of file
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -3,10 +3,19 @@ API处理包
 提供与各种LLM API服务交互的功能
 """
 
-from core.api.get_api_handler import get_api_handler
-from core.api.utils import handle_stream_response
-from core.api.api_handler import APIHandler
-from core.api.ollama_api_handler import OllamaAPIHandler
-from core.api.remote_api_handler import RemoteAPIHandler
+from core import _load_lazy_export
+
+# 导出名称 -> 所在模块，首次访问时才导入
+_LAZY_EXPORTS = {
+    'get_api_handler': 'core.api.get_api_handler',
+    'handle_stream_response': 'core.api.utils',
+    'APIHandler': 'core.api.api_handler',
+    'OllamaAPIHandler': 'core.api.ollama_api_handler',
+    'RemoteAPIHandler': 'core.api.remote_api_handler',
+}
 
 __all__ = ['get_api_handler', 'APIHandler', 'OllamaAPIHandler', 'RemoteAPIHandler', 'handle_stream_response']
+
+
+def __getattr__(name):
+    return _load_lazy_export(globals(), _LAZY_EXPORTS, name)
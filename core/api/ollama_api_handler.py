@@ -1,15 +1,23 @@
 from core.api.api_handler import APIHandler
-from ollama import Client
 from core.config import OLLAMA_API_URL
+from core.text.cleaning import strip_think
 from typing import Dict, Optional
 
 
 class OllamaAPIHandler(APIHandler):
     def __init__(self):
-        self.client = Client(host=OLLAMA_API_URL)
+        self._client = None  # ollama客户端在首次请求时创建
         self.headers = {'Content-Type': 'application/json'}
         self.current_request = None  # 用于跟踪当前的生成请求
 
+    @property
+    def client(self):
+        """按需导入ollama并创建客户端，导入API层时不加载httpx"""
+        if self._client is None:
+            from ollama import Client
+            self._client = Client(host=OLLAMA_API_URL)
+        return self._client
+
     def generate_completion(
         self,
         model: str,
@@ -49,8 +57,7 @@ class OllamaAPIHandler(APIHandler):
             # 直接返回响应中的有效内容
             if hasattr(self.current_request, 'response'):
                 # 过滤掉<think>标签内的内容
-                import re
-                filtered_response = re.sub(r'<think>.*?</think>', '', self.current_request.response, flags=re.DOTALL).strip()
+                filtered_response = strip_think(self.current_request.response)
                 
                 return {
                     "response": filtered_response,
@@ -114,6 +121,35 @@ class OllamaAPIHandler(APIHandler):
                 "error": f"聊天补全失败: {str(e)}"
             }
 
+    def embed(
+        self,
+        model: str,
+        texts: list,
+        batch_size: int = 64,
+        truncate: bool = True
+    ) -> Dict:
+        """
+        生成文本嵌入向量
+        使用ollama-sdk的embed方法，每次请求最多发送batch_size条文本
+        """
+        try:
+            embeddings = []
+            for start in range(0, len(texts), batch_size):
+                response = self.client.embed(
+                    model=model,
+                    input=list(texts[start:start + batch_size]),
+                    truncate=truncate
+                )
+                embeddings.extend(response.embeddings)
+            return {
+                "embeddings": embeddings,
+                "model": model
+            }
+        except Exception as e:
+            return {
+                "error": f"生成嵌入向量失败: {str(e)}"
+            }
+
     def create_model(
         self,
         model: str,
@@ -148,6 +184,7 @@ class OllamaAPIHandler(APIHandler):
                 "models": [
                     {
                         "name": model.model,
+                        "digest": model.digest,
                         "size": f"{(model.size.real / 1024 / 1024):.2f}MB",
                         "details": {
                             "format": model.details.format if model.details else None,
@@ -6,13 +6,14 @@
 from core.api.api_handler import APIHandler
 from core.config import Config
 from typing import Dict, Optional
-import requests
 import json
 from core.api.utils import handle_stream_response 
+from core.logging import PayloadLogPolicy
 
 class RemoteAPIHandler(APIHandler):
     """远程API处理器，用于处理远程模型API调用"""
     def __init__(self):
+        Config.ensure_loaded()
         self.api_url = Config.REMOTE_API_URL.rstrip('/')  # 移除末尾的斜杠，确保URL格式一致
         self.api_key = Config.REMOTE_API_KEY
         self.headers = {
@@ -141,6 +142,41 @@ class RemoteAPIHandler(APIHandler):
             print("尝试从默认API获取模型列表: /models")
             return self._get_request("/models")
     
+    def list_remote_models(self, etag: Optional[str] = None) -> Dict:
+        """从远程API获取模型列表，支持ETag条件请求
+        
+        Args:
+            etag: 上次响应的ETag，服务器返回304时不再传输列表
+            
+        Returns:
+            {"models": [名称], "etag": ETag, "not_modified": False}，
+            未变化时为 {"models": None, "etag": etag, "not_modified": True}，失败时为 {"error": ...}
+        """
+        import requests
+        api_url_lower = self.api_url.lower()
+        endpoint = "/v1/models" if "deepseek.com" in api_url_lower or "openai" in api_url_lower else "/models"
+        headers = dict(self.headers)
+        if etag:
+            headers['If-None-Match'] = etag
+        try:
+            response = requests.get(f"{self.api_url}{endpoint}", headers=headers, timeout=Config.REQUEST_TIMEOUT)
+            if response.status_code == 304:
+                return {"models": None, "etag": etag, "not_modified": True}
+            response.raise_for_status()
+            data = response.json()
+        except Exception as e:
+            return {"error": f"获取远程模型列表失败: {str(e)}"}
+        
+        if isinstance(data.get("data"), list):
+            # OpenAI格式
+            models = [m.get("id") for m in data["data"] if m.get("id")]
+        elif isinstance(data.get("models"), list):
+            # 通用格式
+            models = [m.get("name") for m in data["models"] if m.get("name")]
+        else:
+            models = []
+        return {"models": models, "etag": response.headers.get("ETag"), "not_modified": False}
+    
     def list_local_models(self) -> Dict:
         """列出本地模型（远程API模式下返回空列表）"""
         print("RemoteAPIHandler.list_local_models: 远程API模式不支持本地模型，返回空列表")
@@ -148,6 +184,7 @@ class RemoteAPIHandler(APIHandler):
 
     def _get_request(self, endpoint: str) -> Dict:
         """发送GET请求到远程API"""
+        import requests  # 按需导入，避免导入API层时加载整个HTTP栈
         try:
             # 确保endpoint以/开头
             if not endpoint.startswith("/"):
@@ -187,6 +224,7 @@ class RemoteAPIHandler(APIHandler):
     
     def _post_request(self, endpoint: str, payload: Dict) -> Dict:
         """发送POST请求到远程API"""
+        import requests
         try:
             # 确保endpoint以/开头
             if not endpoint.startswith("/"):
@@ -194,7 +232,7 @@ class RemoteAPIHandler(APIHandler):
                 
             url = f"{self.api_url}{endpoint}"
             print(f"发送POST请求到: {url}")
-            print(f"请求负载: {json.dumps(payload, ensure_ascii=False)}")
+            print(f"请求负载: {PayloadLogPolicy.describe_payload(payload)}")
             
             timeout = Config.REQUEST_TIMEOUT * 2  # 生成请求允许更长的超时时间
             
@@ -219,7 +257,7 @@ class RemoteAPIHandler(APIHandler):
                 else:
                     # 如果响应不成功，输出详细信息
                     print(f"请求失败 - 状态码: {response.status_code}")
-                    print(f"响应内容: {response.text}")
+                    print(f"响应内容: {PayloadLogPolicy.summarize(response.text)}")
                     print(f"请求头: {self.headers}")
                     # 隐藏API密钥
                     safe_headers = self.headers.copy()
@@ -242,7 +280,7 @@ class RemoteAPIHandler(APIHandler):
                 try:
                     return response.json()
                 except json.JSONDecodeError:
-                    print(f"响应不是有效的JSON格式: {response.text}")
+                    print(f"响应不是有效的JSON格式: {PayloadLogPolicy.summarize(response.text)}")
                     return {
                         "error": "远程API返回了非JSON响应",
                         "response": response.text
@@ -250,7 +288,7 @@ class RemoteAPIHandler(APIHandler):
             else:
                 # 如果响应不成功，输出详细信息
                 print(f"请求失败 - 状态码: {response.status_code}")
-                print(f"响应内容: {response.text}")
+                print(f"响应内容: {PayloadLogPolicy.summarize(response.text)}")
                 
                 # 隐藏API密钥
                 safe_headers = self.headers.copy()
@@ -266,12 +304,12 @@ class RemoteAPIHandler(APIHandler):
             
             if 'response' in locals():
                 print(f"状态码: {response.status_code}")
-                print(f"响应内容: {response.text}")
+                print(f"响应内容: {PayloadLogPolicy.summarize(response.text)}")
                 
                 # 尝试解析JSON响应（如果有）
                 try:
                     error_json = response.json()
-                    print(f"错误JSON: {json.dumps(error_json, ensure_ascii=False)}")
+                    print(f"错误JSON: {PayloadLogPolicy.describe_payload(error_json)}")
                 except:
                     pass
                     
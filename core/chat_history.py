@@ -0,0 +1,146 @@
+"""
+对话历史管理
+按token预算组织每次发送给模型的消息，长对话不会无限增长：
+
+- 每条消息写入时估算一次token数
+- 发送时从最新的消息往前取，直到用完预算（最新一条总是保留）
+- 较早的消息由模型在后台整理成滚动摘要，作为系统消息放在窗口之前
+- 已并入摘要的消息不再保留在内存中，恢复很长的会话时也只需载入摘要之后的消息
+"""
+
+from core.tokens import estimate_tokens
+
+# 每条消息除正文外的格式开销（角色标记等）
+_MESSAGE_OVERHEAD = 4
+
+
+class ChatHistoryManager:
+    """带滚动摘要的对话历史"""
+
+    DEFAULT_TOKEN_BUDGET = 4000
+    # 未摘要的历史超过预算的该比例时开始整理摘要
+    SUMMARY_TRIGGER = 0.7
+    # 整理摘要时保留不动的最近消息数
+    KEEP_RECENT = 6
+
+    SUMMARY_PROMPT = (
+        "请把下面的对话整理成简洁的摘要，供后续对话参考。"
+        "保留关键事实、结论、用户的偏好和尚未解决的问题，省略寒暄和重复内容，"
+        "只输出摘要正文，不超过{limit}字。"
+    )
+
+    def __init__(self, token_budget=None):
+        self.token_budget = token_budget or self.DEFAULT_TOKEN_BUDGET
+        self.clear()
+
+    def clear(self):
+        # 尚未并入摘要的消息
+        self.messages = []
+        self.tokens = []
+        self.summary = ''
+        self.summary_tokens = 0
+        # 已并入摘要的消息数，对话中第 summarized_upto 条消息对应 messages[0]
+        self.summarized_upto = 0
+        # 清空后递增，丢弃清空前发起的摘要结果
+        self.generation = getattr(self, 'generation', 0) + 1
+
+    def restore(self, messages, summary='', summarized_upto=0):
+        """恢复保存的会话
+
+        Args:
+            messages: 摘要之后的消息（字典，含 role、content，可选 tokens）
+            summary: 已有摘要
+            summarized_upto: 摘要覆盖的消息数
+        """
+        self.clear()
+        for message in messages:
+            self.append(message['role'], message['content'], message.get('tokens'))
+        self.summarized_upto = summarized_upto
+        if summary:
+            self.summary = summary
+            self.summary_tokens = self.count_tokens(f"之前的对话摘要：\n{summary}")
+
+    def __len__(self):
+        """对话中的消息总数（包括已并入摘要的消息）"""
+        return self.summarized_upto + len(self.messages)
+
+    @staticmethod
+    def count_tokens(content):
+        return estimate_tokens(content) + _MESSAGE_OVERHEAD
+
+    def append(self, role, content, tokens=None):
+        """追加一条消息，返回其token数"""
+        if tokens is None:
+            tokens = self.count_tokens(content)
+        self.messages.append({"role": role, "content": content})
+        self.tokens.append(tokens)
+        return tokens
+
+    def build_messages(self, system_prompt=''):
+        """生成本次请求的消息列表：系统提示词、对话摘要、预算内的最近消息
+
+        Returns:
+            (消息列表, 估算的token总数)
+        """
+        head = []
+        used = 0
+        if system_prompt:
+            head.append({"role": "system", "content": system_prompt})
+            used += self.count_tokens(system_prompt)
+        if self.summary:
+            head.append({"role": "system", "content": f"之前的对话摘要：\n{self.summary}"})
+            used += self.summary_tokens
+
+        start = len(self.messages)
+        while start > 0:
+            cost = self.tokens[start - 1]
+            if start < len(self.messages) and used + cost > self.token_budget:
+                break
+            used += cost
+            start -= 1
+        return head + [dict(message) for message in self.messages[start:]], used
+
+    def summary_request(self, system_prompt=''):
+        """未摘要的历史接近预算时，返回整理摘要的请求
+
+        Returns:
+            (发送给模型的消息列表, 摘要覆盖到的位置, generation)，不需要整理时返回None
+        """
+        fold = len(self.messages) - self.KEEP_RECENT
+        if fold <= 0:
+            return None
+        pending = sum(self.tokens)
+        fixed = self.summary_tokens + (self.count_tokens(system_prompt) if system_prompt else 0)
+        if fixed + pending < self.token_budget * self.SUMMARY_TRIGGER:
+            return None
+
+        lines = []
+        if self.summary:
+            lines.append(f"【已有摘要】\n{self.summary}\n")
+        lines.append("【新的对话】")
+        for message in self.messages[:fold]:
+            speaker = '用户' if message['role'] == 'user' else '助手'
+            lines.append(f"{speaker}: {message['content']}")
+        limit = max(self.token_budget // 4, 200)
+        messages = [
+            {"role": "system", "content": self.SUMMARY_PROMPT.format(limit=limit)},
+            {"role": "user", "content": '\n'.join(lines)},
+        ]
+        return messages, self.summarized_upto + fold, self.generation
+
+    def apply_summary(self, summary, upto, generation):
+        """写入后台整理好的摘要，对话已清空或已有更新的摘要时忽略
+
+        Returns:
+            是否已采用
+        """
+        summary = summary.strip()
+        if not summary or generation != self.generation or upto <= self.summarized_upto:
+            return False
+        fold = min(upto, len(self)) - self.summarized_upto
+        self.summary = summary
+        self.summary_tokens = self.count_tokens(f"之前的对话摘要：\n{summary}")
+        del self.messages[:fold]
+        del self.tokens[:fold]
+        self.summarized_upto += fold
+        return True
@@ -1,5 +1,6 @@
 import os
-import json
+
+from core.config_store import ConfigSnapshot, ConfigStore
 OLLAMA_API_URL = 'http://localhost:11434'
 
 class Config:
@@ -27,9 +28,28 @@ class Config:
     
     # 当前选择的远程API配置索引
     CURRENT_REMOTE_CONFIG_INDEX = 0
+    
+    # 生成卡片时过滤近似重复的问题，相似度（0~1）达到阈值即视为重复
+    DEDUP_ENABLED = True
+    DEDUP_THRESHOLD = 0.8
+    # 阈值的取值范围，加载配置、保存设置和界面输入框共用
+    DEDUP_THRESHOLD_RANGE = (0.3, 1.0)
+    # Ollama嵌入模型（例如 nomic-embed-text），留空时不启用语义去重和相关卡片检索
+    EMBEDDING_MODEL = ''
+    SEMANTIC_DEDUP_THRESHOLD = 0.92
+    SEMANTIC_DEDUP_THRESHOLD_RANGE = (0.5, 1.0)
+    
+    # 每次对话请求中系统提示词、历史摘要和历史消息的token上限
+    CHAT_TOKEN_BUDGET = 4000
 
     # 配置文件路径
     CONFIG_FILE = os.path.join(os.path.expanduser("~"), ".memoride_config.json")
+    
+    # 配置是否已从文件加载
+    _loaded = False
+    
+    # 配置文件存储（首次读写时按CONFIG_FILE创建）
+    _store = None
 
     @classmethod
     def update_selected_model(cls, model_name):
@@ -46,27 +66,55 @@ class Config:
     def get_chat_completion_url(cls):
         return f'{cls.OLLAMA_API_URL}/api/chat'
         
+    @classmethod
+    def get_store(cls):
+        """获取配置文件存储"""
+        if cls._store is None or cls._store.path != cls.CONFIG_FILE:
+            cls._store = ConfigStore(cls.CONFIG_FILE)
+        return cls._store
+    
+    @classmethod
+    def snapshot(cls):
+        """生成当前配置的快照"""
+        return ConfigSnapshot(
+            SELECTED_MODEL=cls.SELECTED_MODEL,
+            MODEL_SOURCE=cls.MODEL_SOURCE,
+            REMOTE_API_URL=cls.REMOTE_API_URL,
+            REMOTE_API_KEY=cls.REMOTE_API_KEY,
+            REMOTE_API_MODELS=list(cls.REMOTE_API_MODELS),
+            REMOTE_API_CONFIGS=[dict(config) for config in cls.REMOTE_API_CONFIGS],
+            CURRENT_REMOTE_CONFIG_INDEX=cls.CURRENT_REMOTE_CONFIG_INDEX,
+            DEDUP_ENABLED=cls.DEDUP_ENABLED,
+            DEDUP_THRESHOLD=cls.DEDUP_THRESHOLD,
+            EMBEDDING_MODEL=cls.EMBEDDING_MODEL,
+            SEMANTIC_DEDUP_THRESHOLD=cls.SEMANTIC_DEDUP_THRESHOLD,
+            CHAT_TOKEN_BUDGET=cls.CHAT_TOKEN_BUDGET
+        )
+    
     @classmethod
     def save_config(cls):
-        """保存配置到文件"""
-        config_data = {
-            "SELECTED_MODEL": cls.SELECTED_MODEL,
-            "MODEL_SOURCE": cls.MODEL_SOURCE,
-            "REMOTE_API_URL": cls.REMOTE_API_URL,
-            "REMOTE_API_KEY": cls.REMOTE_API_KEY,
-            "REMOTE_API_MODELS": cls.REMOTE_API_MODELS,
-            "REMOTE_API_CONFIGS": cls.REMOTE_API_CONFIGS,
-            "CURRENT_REMOTE_CONFIG_INDEX": cls.CURRENT_REMOTE_CONFIG_INDEX
-        }
-        try:
-            with open(cls.CONFIG_FILE, 'w', encoding='utf-8') as f:
-                json.dump(config_data, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"保存配置文件失败: {e}")
+        """保存配置到文件
+        
+        写盘经过防抖合并，短时间内的多次调用只会写一次；需要立即落盘时调用flush_config。
+        """
+        cls.get_store().schedule_save(cls.snapshot())
+    
+    @classmethod
+    def flush_config(cls):
+        """立即写入尚未落盘的配置"""
+        if cls._store is not None:
+            cls._store.flush()
+    
+    @classmethod
+    def ensure_loaded(cls):
+        """确保配置已从文件加载，重复调用不会再次读取文件"""
+        if not cls._loaded:
+            cls.load_config()
     
     @classmethod
     def load_config(cls):
         """从文件加载配置"""
+        cls._loaded = True
         print(f"尝试从 {cls.CONFIG_FILE} 加载配置...")
         if not os.path.exists(cls.CONFIG_FILE):
             print("配置文件不存在，使用默认配置")
@@ -81,19 +129,35 @@ class Config:
             return
             
         try:
-            with open(cls.CONFIG_FILE, 'r', encoding='utf-8') as f:
-                config_data = json.load(f)
+            # 文件中缺失的字段使用的默认值
+            defaults = ConfigSnapshot(
+                SELECTED_MODEL=cls.DEFAULT_MODEL,
+                MODEL_SOURCE="Ollama本地模型",
+                REMOTE_API_CONFIGS=cls.REMOTE_API_CONFIGS,
+                DEDUP_ENABLED=cls.DEDUP_ENABLED,
+                DEDUP_THRESHOLD=cls.DEDUP_THRESHOLD,
+                EMBEDDING_MODEL=cls.EMBEDDING_MODEL,
+                SEMANTIC_DEDUP_THRESHOLD=cls.SEMANTIC_DEDUP_THRESHOLD,
+                CHAT_TOKEN_BUDGET=cls.CHAT_TOKEN_BUDGET
+            )
+            config_data = cls.get_store().load(defaults)
             
             print("成功读取配置文件")    
             # 更新配置
-            cls.SELECTED_MODEL = config_data.get("SELECTED_MODEL", cls.DEFAULT_MODEL)
-            cls.MODEL_SOURCE = config_data.get("MODEL_SOURCE", "Ollama本地模型")
-            cls.REMOTE_API_URL = config_data.get("REMOTE_API_URL", "")
-            cls.REMOTE_API_KEY = config_data.get("REMOTE_API_KEY", "")
-            cls.REMOTE_API_MODELS = config_data.get("REMOTE_API_MODELS", [])
+            cls.SELECTED_MODEL = config_data.SELECTED_MODEL
+            cls.MODEL_SOURCE = config_data.MODEL_SOURCE
+            cls.REMOTE_API_URL = config_data.REMOTE_API_URL
+            cls.REMOTE_API_KEY = config_data.REMOTE_API_KEY
+            cls.REMOTE_API_MODELS = config_data.REMOTE_API_MODELS
             # 加载多配置支持
-            cls.REMOTE_API_CONFIGS = config_data.get("REMOTE_API_CONFIGS", cls.REMOTE_API_CONFIGS)
-            cls.CURRENT_REMOTE_CONFIG_INDEX = config_data.get("CURRENT_REMOTE_CONFIG_INDEX", 0)
+            cls.REMOTE_API_CONFIGS = config_data.REMOTE_API_CONFIGS
+            cls.CURRENT_REMOTE_CONFIG_INDEX = config_data.CURRENT_REMOTE_CONFIG_INDEX
+            cls.DEDUP_ENABLED = config_data.DEDUP_ENABLED
+            # 阈值限制在合理范围内
+            cls.DEDUP_THRESHOLD = cls._clamp(config_data.DEDUP_THRESHOLD, cls.DEDUP_THRESHOLD_RANGE)
+            cls.EMBEDDING_MODEL = config_data.EMBEDDING_MODEL.strip()
+            cls.SEMANTIC_DEDUP_THRESHOLD = cls._clamp(config_data.SEMANTIC_DEDUP_THRESHOLD, cls.SEMANTIC_DEDUP_THRESHOLD_RANGE)
+            cls.CHAT_TOKEN_BUDGET = max(config_data.CHAT_TOKEN_BUDGET, 1000)
             
             print(f"已加载配置: MODEL_SOURCE={cls.MODEL_SOURCE}, SELECTED_MODEL={cls.SELECTED_MODEL}")
             print(f"远程API配置数量: {len(cls.REMOTE_API_CONFIGS)}, 当前索引: {cls.CURRENT_REMOTE_CONFIG_INDEX}")
@@ -112,6 +176,35 @@ class Config:
         except Exception as e:
             print(f"加载配置文件失败: {e}")
             
+    @staticmethod
+    def _clamp(value, bounds):
+        low, high = bounds
+        return min(max(float(value), low), high)
+    
+    @classmethod
+    def update_dedup_settings(cls, enabled=None, threshold=None):
+        """更新近似重复卡片过滤设置"""
+        if enabled is not None:
+            cls.DEDUP_ENABLED = bool(enabled)
+        if threshold is not None:
+            cls.DEDUP_THRESHOLD = cls._clamp(threshold, cls.DEDUP_THRESHOLD_RANGE)
+        cls.save_config()
+    
+    @classmethod
+    def update_embedding_settings(cls, model=None, threshold=None):
+        """更新嵌入模型和语义去重阈值"""
+        if model is not None:
+            cls.EMBEDDING_MODEL = model.strip()
+        if threshold is not None:
+            cls.SEMANTIC_DEDUP_THRESHOLD = cls._clamp(threshold, cls.SEMANTIC_DEDUP_THRESHOLD_RANGE)
+        cls.save_config()
+    
+    @classmethod
+    def update_chat_token_budget(cls, budget):
+        """更新对话请求的token预算"""
+        cls.CHAT_TOKEN_BUDGET = max(int(budget), 1000)
+        cls.save_config()
+    
     @classmethod
     def add_remote_config(cls, name, url, key, models):
         """添加新的远程API配置"""
@@ -156,6 +249,3 @@ class Config:
             return True
         print(f"切换远程API配置失败: 索引 {index} 超出范围")
         return False
-
-# 启动时加载配置
-Config.load_config()
@@ -0,0 +1,130 @@
+"""
+配置持久化模块
+
+负责 ~/.memoride_config.json 的读写：
+- 启动时只读取一次文件，得到类型化的内存快照
+- 保存请求先合并（防抖），空闲一段时间后由后台线程统一写盘
+- 写入使用 临时文件 + fsync + rename，避免进程崩溃时留下半截文件
+- 内容与上次写入相同时跳过写盘
+"""
+
+import atexit
+import json
+import os
+import tempfile
+import threading
+from dataclasses import asdict, dataclass, field, fields
+from typing import Dict, List, Optional
+
+
+def atomic_write_text(path: str, text: str):
+    """写入同目录下的临时文件后重命名覆盖，保证文件要么是旧内容要么是新内容"""
+    directory = os.path.dirname(path) or '.'
+    prefix = '.' + os.path.basename(path) + '.'
+    fd, tmp_path = tempfile.mkstemp(prefix=prefix, suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+@dataclass
+class ConfigSnapshot:
+    """配置文件内容的内存快照"""
+    SELECTED_MODEL: str = ''
+    MODEL_SOURCE: str = ''
+    REMOTE_API_URL: str = ''
+    REMOTE_API_KEY: str = ''
+    REMOTE_API_MODELS: List[str] = field(default_factory=list)
+    REMOTE_API_CONFIGS: List[Dict] = field(default_factory=list)
+    CURRENT_REMOTE_CONFIG_INDEX: int = 0
+    DEDUP_ENABLED: bool = True
+    DEDUP_THRESHOLD: float = 0.8
+    EMBEDDING_MODEL: str = ''
+    SEMANTIC_DEDUP_THRESHOLD: float = 0.92
+    CHAT_TOKEN_BUDGET: int = 4000
+
+    @classmethod
+    def from_dict(cls, data: Dict, defaults: 'ConfigSnapshot') -> 'ConfigSnapshot':
+        """从JSON字典构建快照，缺失或类型不符的字段使用默认值"""
+        values = {}
+        for f in fields(cls):
+            default = getattr(defaults, f.name)
+            value = data.get(f.name, default)
+            # JSON中的整数可以作为浮点字段的值
+            if isinstance(default, float) and isinstance(value, int) and not isinstance(value, bool):
+                value = float(value)
+            # 类型不符时保留默认值，避免损坏的配置污染运行时状态（bool不能作为int字段的值）
+            if not isinstance(value, type(default)) or (isinstance(value, bool) and not isinstance(default, bool)):
+                value = default
+            values[f.name] = value
+        return cls(**values)
+
+    def to_json(self) -> str:
+        """序列化为配置文件内容"""
+        return json.dumps(asdict(self), ensure_ascii=False, indent=2)
+
+
+class ConfigStore:
+    """带防抖和原子写入的配置文件存储"""
+
+    # 最后一次保存请求之后等待多久再写盘（秒）
+    DEBOUNCE_SECONDS = 0.5
+
+    def __init__(self, path: str, debounce: Optional[float] = None):
+        self.path = path
+        self.debounce = self.DEBOUNCE_SECONDS if debounce is None else debounce
+        self._lock = threading.Lock()
+        self._timer = None
+        self._pending = None       # 等待写入的JSON文本
+        self._last_written = None  # 最近一次写盘（或读取）的JSON文本
+        atexit.register(self.flush)
+
+    def load(self, defaults: ConfigSnapshot) -> Optional[ConfigSnapshot]:
+        """读取配置文件，文件不存在时返回None，读取失败时抛出异常"""
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        snapshot = ConfigSnapshot.from_dict(json.loads(text), defaults)
+        with self._lock:
+            # 记录磁盘上的内容，未修改的配置不会被重新写回
+            self._last_written = snapshot.to_json()
+        return snapshot
+
+    def schedule_save(self, snapshot: ConfigSnapshot):
+        """登记一次保存请求，在防抖间隔内的多次请求只写一次"""
+        # 在调用线程上序列化，后台线程只处理不可变的文本
+        text = snapshot.to_json()
+        with self._lock:
+            self._pending = text
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.debounce, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """立即写入等待中的配置，返回是否发生了写盘"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            text, self._pending = self._pending, None
+            if text is None or text == self._last_written:
+                return False
+            try:
+                atomic_write_text(self.path, text)
+            except Exception as e:
+                print(f"保存配置文件失败: {e}")
+                return False
+            self._last_written = text
+            return True
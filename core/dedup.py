@@ -0,0 +1,212 @@
+"""
+近似重复卡片检测
+用MinHash签名估计两个问题的字符n-gram Jaccard相似度，再用LSH分桶只比较可能相似的卡片，
+整体耗时随卡片数量近似线性增长，不需要两两比较。
+
+- 签名使用 crc32(n-gram) 经过 NUM_PERM 个通用哈希 (a*x+b) mod p 后取最小值
+- LSH把签名分成 bands 段，任意一段完全相同的卡片才作为候选，再用签名估计的相似度确认
+- 安装了numpy时批量计算签名，结果与纯Python实现完全一致
+"""
+
+import random
+import re
+import zlib
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # numpy是可选依赖
+    np = None
+
+# 梅森素数 2^61-1，哈希参数都小于2^32，a*x+b不会超出64位
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+# 比较前去掉空白和常见标点，大小写不敏感
+_NORMALIZE_PATTERN = re.compile(r'[\s　，。、；：？！“”‘’（）《》【】,.;:?!"\'()\[\]<>{}\-_*#`~]+')
+
+
+class MinHasher:
+    """计算文本的MinHash签名"""
+
+    def __init__(self, num_perm=64, ngram=3, seed=1):
+        self.num_perm = num_perm
+        self.ngram = ngram
+        self.seed = seed
+        rng = random.Random(seed)
+        self._a = [rng.randint(1, _MAX_HASH) for _ in range(num_perm)]
+        self._b = [rng.randint(0, _MAX_HASH) for _ in range(num_perm)]
+        if np is not None:
+            self._np_a = np.array(self._a, dtype=np.uint64)[:, None]
+            self._np_b = np.array(self._b, dtype=np.uint64)[:, None]
+
+    @property
+    def scheme(self):
+        """签名参数的标识，参数不同的签名不能相互比较"""
+        return f"minhash:{self.num_perm}:{self.ngram}:{self.seed}"
+
+    @staticmethod
+    def normalize(text):
+        return _NORMALIZE_PATTERN.sub('', text).lower()
+
+    def shingles(self, text):
+        """文本的字符n-gram哈希集合（文本短于n时整体作为一个n-gram）"""
+        text = self.normalize(text)
+        n = self.ngram
+        if len(text) <= n:
+            return {zlib.crc32(text.encode('utf-8'))} if text else set()
+        return {zlib.crc32(text[i:i + n].encode('utf-8')) for i in range(len(text) - n + 1)}
+
+    def signature(self, text):
+        """返回长度为 num_perm 的签名（整数元组），空文本返回None"""
+        hashes = self.shingles(text)
+        if not hashes:
+            return None
+        if np is not None and len(hashes) > 8:
+            values = np.fromiter(hashes, dtype=np.uint64, count=len(hashes))[None, :]
+            mins = ((self._np_a * values + self._np_b) % _MERSENNE_PRIME & _MAX_HASH).min(axis=1)
+            return tuple(int(v) for v in mins)
+        return tuple(
+            min(((a * x + b) % _MERSENNE_PRIME) & _MAX_HASH for x in hashes)
+            for a, b in zip(self._a, self._b)
+        )
+
+    @staticmethod
+    def to_bytes(signature):
+        return array('I', signature).tobytes()
+
+    @staticmethod
+    def from_bytes(data):
+        values = array('I')
+        values.frombytes(data)
+        return tuple(values)
+
+    @staticmethod
+    def similarity(sig1, sig2):
+        """用签名中相同位置的比例估计Jaccard相似度"""
+        return sum(1 for x, y in zip(sig1, sig2) if x == y) / len(sig1)
+
+
+class LshIndex:
+    """MinHash签名的LSH分桶索引"""
+
+    def __init__(self, num_perm, threshold):
+        self.num_perm = num_perm
+        self.threshold = threshold
+        self.bands, self.rows = self.choose_bands(num_perm, threshold)
+        self._buckets = [dict() for _ in range(self.bands)]
+        self._signatures = {}
+
+    @staticmethod
+    def choose_bands(num_perm, threshold):
+        """选择分段方式，使候选概率曲线的拐点 (1/b)^(1/r) 最接近阈值"""
+        best = None
+        for rows in range(1, num_perm + 1):
+            bands = num_perm // rows
+            if bands == 0:
+                break
+            error = abs((1.0 / bands) ** (1.0 / rows) - threshold)
+            if best is None or error < best[0]:
+                best = (error, bands, rows)
+        return best[1], best[2]
+
+    def __len__(self):
+        return len(self._signatures)
+
+    def _band_keys(self, signature):
+        r = self.rows
+        return [signature[i * r:(i + 1) * r] for i in range(self.bands)]
+
+    def add(self, key, signature):
+        self._signatures[key] = signature
+        for bucket, band in zip(self._buckets, self._band_keys(signature)):
+            bucket.setdefault(band, []).append(key)
+
+    def query(self, signature):
+        """返回相似度达到阈值的最相似条目 (key, 相似度)，没有时返回None"""
+        candidates = set()
+        for bucket, band in zip(self._buckets, self._band_keys(signature)):
+            keys = bucket.get(band)
+            if keys:
+                candidates.update(keys)
+        best = None
+        for key in candidates:
+            score = MinHasher.similarity(signature, self._signatures[key])
+            if score >= self.threshold and (best is None or score > best[1]):
+                best = (key, score)
+        return best
+
+
+class CardDeduplicator:
+    """按问题文本过滤近似重复的卡片
+
+    先用 seed_from_store() 载入已有卡片，再对新卡片调用 filter()：
+    与已有卡片或本次任务中更早的卡片相似度达到阈值的卡片被丢弃，其余卡片加入索引。
+    """
+
+    DEFAULT_THRESHOLD = 0.8
+    NUM_PERM = 64
+
+    def __init__(self, threshold=None, num_perm=None):
+        self.threshold = self.DEFAULT_THRESHOLD if threshold is None else threshold
+        self.hasher = MinHasher(num_perm or self.NUM_PERM)
+        self.index = LshIndex(self.hasher.num_perm, self.threshold)
+        self._next_key = 0
+
+    def __len__(self):
+        return len(self.index)
+
+    def _add(self, label, signature):
+        self._next_key += 1
+        self.index.add((self._next_key, label), signature)
+
+    def seed_from_store(self, store, exclude_csv_paths=(), directory=None):
+        """载入卡片库中来自 directory 的已有卡片（排除本次将重新生成的CSV），缓存签名下次直接读取
+
+        Returns:
+            载入的卡片数量
+        """
+        scheme = self.hasher.scheme
+        computed = []
+        count = 0
+        for card_hash, question, blob in store.iter_card_signatures(scheme, exclude_csv_paths, directory):
+            if blob is not None:
+                signature = MinHasher.from_bytes(blob)
+            else:
+                signature = self.hasher.signature(question)
+                if signature is None:
+                    continue
+                computed.append((card_hash, MinHasher.to_bytes(signature)))
+            self._add(question, signature)
+            count += 1
+        if computed:
+            store.save_card_signatures(scheme, computed)
+        return count
+
+    def find_duplicate(self, question):
+        """返回与问题近似重复的已有问题，不修改索引"""
+        signature = self.hasher.signature(question)
+        if signature is None:
+            return None
+        match = self.index.query(signature)
+        return match[0][1] if match else None
+
+    def filter(self, rows):
+        """过滤 (问题, 答案) 序列
+
+        Returns:
+            (保留的行, [(被丢弃的问题, 与之重复的问题)])
+        """
+        kept, dropped = [], []
+        for question, answer in rows:
+            signature = self.hasher.signature(question)
+            if signature is None:
+                kept.append((question, answer))
+                continue
+            match = self.index.query(signature)
+            if match is not None:
+                dropped.append((question, match[0][1]))
+                continue
+            self._add(question, signature)
+            kept.append((question, answer))
+        return kept, dropped
@@ -1,11 +1,12 @@
 """
 应用程序错误处理模块
 提供全局异常捕获和错误显示功能
+
+PyQt5只在需要显示对话框时导入，core包的其余部分可以在无界面环境中使用。
 """
 
 import sys
 import traceback
-from PyQt5.QtWidgets import QMessageBox, QApplication
 
 from core.logging import Logger
 
@@ -26,6 +27,7 @@ class ErrorHandler:
         
         # 显示错误对话框（如果应用程序还在运行）
         try:
+            from PyQt5.QtWidgets import QMessageBox, QApplication
             if QApplication.instance():
                 QMessageBox.critical(None, "应用程序错误",
                                   f"发生了未处理的错误：\n{exc_value}\n\n详细信息已记录到日志文件。")
@@ -51,6 +53,7 @@ class ErrorHandler:
             title: 对话框标题
             message: 错误信息
         """
+        from PyQt5.QtWidgets import QMessageBox
         Logger.error(f"显示错误: {title} - {message}")
         QMessageBox.critical(parent, title, message)
     
@@ -63,5 +66,6 @@ class ErrorHandler:
             title: 对话框标题
             message: 警告信息
         """
+        from PyQt5.QtWidgets import QMessageBox
         Logger.warning(f"显示警告: {title} - {message}")
         QMessageBox.warning(parent, title, message)
\ No newline at end of file
@@ -0,0 +1,17 @@
+"""
+导出模块
+把生成的学习卡片写入其他应用可以直接导入的格式
+"""
+
+from core import _load_lazy_export
+
+_LAZY_EXPORTS = {
+    'AnkiExporter': 'core.export.anki_exporter',
+    'CsvCardSink': 'core.export.csv_sink',
+}
+
+__all__ = ['AnkiExporter', 'CsvCardSink']
+
+
+def __getattr__(name):
+    return _load_lazy_export(globals(), _LAZY_EXPORTS, name)
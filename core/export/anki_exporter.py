@@ -0,0 +1,303 @@
+"""
+Anki卡包导出模块
+把问答卡片直接写成 .apkg 文件（Anki 2.1 可导入的 collection.anki2 + media），
+不需要用户再手动导入CSV。
+
+- 所有笔记在同一个事务中批量写入临时数据库，最后打包成zip
+- 笔记GUID由 牌组名 + 问题 的哈希得到，同一个问题重新导出时GUID不变，
+  Anki导入时会更新已有笔记而不是新建重复笔记
+- 笔记类型和牌组ID同样由名称哈希得到，多次导出使用同一个笔记类型
+"""
+
+import csv
+import hashlib
+import html
+import json
+import os
+import re
+import sqlite3
+import string
+import tempfile
+import time
+import zipfile
+
+# Anki生成GUID使用的base91字符表
+_BASE91_TABLE = string.ascii_letters + string.digits + "!#$%&()*+,-./:;<=>?@[]^_`{|}~"
+
+_HTML_TAG_PATTERN = re.compile(r'<[^>]+>')
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+
+_SCHEMA = """
+CREATE TABLE col (
+    id integer primary key, crt integer not null, mod integer not null,
+    scm integer not null, ver integer not null, dty integer not null,
+    usn integer not null, ls integer not null, conf text not null,
+    models text not null, decks text not null, dconf text not null, tags text not null
+);
+CREATE TABLE notes (
+    id integer primary key, guid text not null, mid integer not null,
+    mod integer not null, usn integer not null, tags text not null,
+    flds text not null, sfld integer not null, csum integer not null,
+    flags integer not null, data text not null
+);
+CREATE TABLE cards (
+    id integer primary key, nid integer not null, did integer not null,
+    ord integer not null, mod integer not null, usn integer not null,
+    type integer not null, queue integer not null, due integer not null,
+    ivl integer not null, factor integer not null, reps integer not null,
+    lapses integer not null, left integer not null, odue integer not null,
+    odid integer not null, flags integer not null, data text not null
+);
+CREATE TABLE revlog (
+    id integer primary key, cid integer not null, usn integer not null,
+    ease integer not null, ivl integer not null, lastIvl integer not null,
+    factor integer not null, time integer not null, type integer not null
+);
+CREATE TABLE graves (usn integer not null, oid integer not null, type integer not null);
+CREATE INDEX ix_notes_usn on notes (usn);
+CREATE INDEX ix_cards_usn on cards (usn);
+CREATE INDEX ix_revlog_usn on revlog (usn);
+CREATE INDEX ix_cards_nid on cards (nid);
+CREATE INDEX ix_cards_sched on cards (did, queue, due);
+CREATE INDEX ix_revlog_cid on revlog (cid);
+CREATE INDEX ix_notes_csum on notes (csum);
+"""
+
+_CARD_CSS = """.card {
+    font-family: arial;
+    font-size: 20px;
+    text-align: left;
+    color: black;
+    background-color: white;
+}
+"""
+
+
+class AnkiExporter:
+    """把问答卡片流写入 .apkg 文件"""
+
+    NOTE_TYPE_NAME = 'Memoride 问答'
+    FIELD_NAMES = ('问题', '答案')
+    # 每批写入的笔记数量
+    BATCH_SIZE = 1000
+
+    def __init__(self, deck_name, note_type_name=None):
+        self.deck_name = deck_name
+        self.note_type_name = note_type_name or self.NOTE_TYPE_NAME
+        self.deck_id = self._stable_id('deck', self.deck_name)
+        self.model_id = self._stable_id('model', self.note_type_name)
+
+    @staticmethod
+    def _hash_int(*parts):
+        digest = hashlib.sha1('\x1f'.join(parts).encode('utf-8')).digest()
+        return int.from_bytes(digest[:8], 'big')
+
+    @classmethod
+    def _stable_id(cls, *parts):
+        """由名称得到固定的13位ID（与Anki毫秒时间戳ID的范围一致）"""
+        return 10 ** 12 + cls._hash_int(*parts) % (9 * 10 ** 12)
+
+    @staticmethod
+    def _base91(number):
+        chars = []
+        while number:
+            number, remainder = divmod(number, len(_BASE91_TABLE))
+            chars.append(_BASE91_TABLE[remainder])
+        return ''.join(reversed(chars)) or _BASE91_TABLE[0]
+
+    @staticmethod
+    def _normalize(text):
+        return _WHITESPACE_PATTERN.sub(' ', text).strip()
+
+    def note_guid(self, question):
+        """由牌组名和问题生成稳定的笔记GUID，答案修改后重新导出会更新同一条笔记"""
+        return self._base91(self._hash_int(self.deck_name, self._normalize(question)))
+
+    @staticmethod
+    def _to_html(text):
+        """卡片内容按纯文本处理：转义HTML并保留换行"""
+        return html.escape(text.strip()).replace('\n', '<br>')
+
+    @staticmethod
+    def _checksum(field):
+        """Anki用首字段（去除HTML后）SHA1的前8位十六进制作为重复检查的校验和"""
+        plain = html.unescape(_HTML_TAG_PATTERN.sub('', field))
+        return int(hashlib.sha1(plain.encode('utf-8')).hexdigest()[:8], 16), plain
+
+    @staticmethod
+    def read_csv_cards(csv_path):
+        """逐行读取程序输出的 问题,答案 CSV文件，跳过表头和空行"""
+        with open(csv_path, 'r', newline='', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            for row in reader:
+                if len(row) < 2 or not row[0].strip():
+                    continue
+                if row[0] == '问题' and row[1] == '答案':
+                    continue
+                yield row[0], row[1]
+
+    def export(self, cards, output_path):
+        """把卡片写入 .apkg 文件
+
+        Args:
+            cards: 可迭代的 (问题, 答案) 序列，按需消费，不会整体读入内存
+            output_path: 输出的 .apkg 路径，已存在时覆盖
+
+        Returns:
+            {"path": 输出路径, "notes": 笔记数量} 或 {"error": 错误信息}
+        """
+        temp_dir = tempfile.mkdtemp(prefix='memoride_apkg_')
+        db_path = os.path.join(temp_dir, 'collection.anki2')
+        try:
+            note_count = self._write_collection(db_path, cards)
+            self._write_package(db_path, output_path)
+            return {"path": output_path, "notes": note_count}
+        except Exception as e:
+            return {"error": f"导出Anki卡包失败: {str(e)}"}
+        finally:
+            for name in os.listdir(temp_dir):
+                try:
+                    os.remove(os.path.join(temp_dir, name))
+                except OSError:
+                    pass
+            try:
+                os.rmdir(temp_dir)
+            except OSError:
+                pass
+
+    def _write_collection(self, db_path, cards):
+        now = int(time.time())
+        conn = sqlite3.connect(db_path, isolation_level=None)
+        try:
+            # 临时数据库写完即打包，不需要日志和同步
+            conn.execute('PRAGMA journal_mode = OFF')
+            conn.execute('PRAGMA synchronous = OFF')
+            conn.executescript(_SCHEMA)
+            conn.execute('BEGIN')
+            conn.execute(
+                'INSERT INTO col VALUES (1, ?, ?, ?, 11, 0, 0, 0, ?, ?, ?, ?, ?)',
+                (now, now * 1000, now * 1000,
+                 json.dumps(self._collection_conf()),
+                 json.dumps({str(self.model_id): self._note_type(now)}, ensure_ascii=False),
+                 json.dumps(self._decks(now), ensure_ascii=False),
+                 json.dumps({'1': self._deck_conf()}),
+                 '{}'),
+            )
+
+            note_ids = set()
+            batch_notes, batch_cards = [], []
+            for question, answer in cards:
+                if not question or not question.strip():
+                    continue
+                guid = self.note_guid(question)
+                note_id = self._stable_id('note', guid)
+                card_id = self._stable_id('card', guid)
+                fields = [self._to_html(question), self._to_html(answer or '')]
+                checksum, sort_field = self._checksum(fields[0])
+                # 同一问题在一次导出中出现多次时，后出现的覆盖前面的（INSERT OR REPLACE）
+                note_ids.add(note_id)
+                batch_notes.append((note_id, guid, self.model_id, now, -1, '',
+                                    '\x1f'.join(fields), sort_field, checksum, 0, ''))
+                batch_cards.append((card_id, note_id, self.deck_id, 0, now, -1,
+                                    0, 0, len(note_ids), 0, 0, 0, 0, 0, 0, 0, 0, ''))
+                if len(batch_notes) >= self.BATCH_SIZE:
+                    self._insert_batch(conn, batch_notes, batch_cards)
+                    batch_notes, batch_cards = [], []
+            if batch_notes:
+                self._insert_batch(conn, batch_notes, batch_cards)
+            conn.execute('COMMIT')
+            return len(note_ids)
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _insert_batch(conn, notes, cards):
+        conn.executemany('INSERT OR REPLACE INTO notes VALUES (?,?,?,?,?,?,?,?,?,?,?)', notes)
+        conn.executemany('INSERT OR REPLACE INTO cards VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)', cards)
+
+    @staticmethod
+    def _write_package(db_path, output_path):
+        """打包为 .apkg：先写临时文件再替换，避免留下不完整的卡包"""
+        directory = os.path.dirname(os.path.abspath(output_path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix='.memoride_', suffix='.apkg', dir=directory)
+        os.close(fd)
+        try:
+            with zipfile.ZipFile(tmp_path, 'w', compression=zipfile.ZIP_DEFLATED) as package:
+                package.write(db_path, 'collection.anki2')
+                # 卡片不含媒体文件
+                package.writestr('media', '{}')
+            os.replace(tmp_path, output_path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def _collection_conf(self):
+        return {
+            'activeDecks': [1], 'curDeck': 1, 'newSpread': 0, 'collapseTime': 1200,
+            'timeLim': 0, 'estTimes': True, 'dueCounts': True, 'curModel': self.model_id,
+            'nextPos': 1, 'sortType': 'noteFld', 'sortBackwards': False, 'addToCur': True,
+        }
+
+    def _note_type(self, now):
+        question_field, answer_field = self.FIELD_NAMES
+        return {
+            'id': self.model_id,
+            'name': self.note_type_name,
+            'type': 0,
+            'mod': now,
+            'usn': -1,
+            'sortf': 0,
+            'did': self.deck_id,
+            'tmpls': [{
+                'name': 'Card 1',
+                'ord': 0,
+                'qfmt': '{{%s}}' % question_field,
+                'afmt': '{{FrontSide}}<hr id=answer>{{%s}}' % answer_field,
+                'did': None,
+                'bqfmt': '',
+                'bafmt': '',
+            }],
+            'flds': [
+                {'name': name, 'ord': index, 'sticky': False, 'rtl': False,
+                 'font': 'Arial', 'size': 20, 'media': []}
+                for index, name in enumerate(self.FIELD_NAMES)
+            ],
+            'css': _CARD_CSS,
+            'latexPre': '\\documentclass[12pt]{article}\n\\special{papersize=3in,5in}\n'
+                        '\\usepackage[utf8]{inputenc}\n\\usepackage{amssymb,amsmath}\n'
+                        '\\pagestyle{empty}\n\\setlength{\\parindent}{0in}\n\\begin{document}\n',
+            'latexPost': '\\end{document}',
+            'tags': [],
+            'vers': [],
+            'req': [[0, 'all', [0]]],
+        }
+
+    def _decks(self, now):
+        def deck(deck_id, name):
+            return {
+                'id': deck_id, 'name': name, 'mod': now, 'usn': -1, 'desc': '',
+                'dyn': 0, 'conf': 1, 'collapsed': False, 'extendNew': 10, 'extendRev': 50,
+                'newToday': [0, 0], 'revToday': [0, 0], 'lrnToday': [0, 0], 'timeToday': [0, 0],
+            }
+        return {'1': deck(1, 'Default'), str(self.deck_id): deck(self.deck_id, self.deck_name)}
+
+    @staticmethod
+    def _deck_conf():
+        return {
+            'id': 1, 'name': 'Default', 'mod': 0, 'usn': 0, 'maxTaken': 60,
+            'autoplay': True, 'timer': 0, 'replayq': True, 'dyn': False,
+            'new': {'bury': True, 'delays': [1, 10], 'initialFactor': 2500,
+                    'ints': [1, 4, 7], 'order': 1, 'perDay': 20, 'separate': True},
+            'rev': {'bury': True, 'ease4': 1.3, 'fuzz': 0.05, 'ivlFct': 1,
+                    'maxIvl': 36500, 'minSpace': 1, 'perDay': 100},
+            'lapse': {'delays': [10], 'leechAction': 0, 'leechFails': 8,
+                      'minInt': 1, 'mult': 0},
+        }
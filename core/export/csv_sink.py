@@ -0,0 +1,127 @@
+"""
+CSV卡片输出模块
+每个处理任务只保留一个打开的文件句柄，所有片段的卡片都经由它写入：
+
+- 写入先进入缓冲区，累计超过 FLUSH_BYTES 或距上次刷新超过 FLUSH_INTERVAL 秒时写入系统
+- 每个片段处理完成后调用 checkpoint()，刷新并 fsync，程序崩溃时最多丢失当前片段
+- 写入操作加锁，多个片段并发处理时也不会出现行交错
+- 打开的输出文件登记在进程内，is_open() 为真时卡片库不应导入该文件（卡片由处理任务直接写入）
+"""
+
+import csv
+import io
+import os
+import threading
+import time
+
+
+class CsvCardSink:
+    """线程安全、带缓冲的 问题,答案 CSV写入器"""
+
+    HEADER = ('问题', '答案')
+    # 缓冲区大小阈值（字符数）和时间阈值（秒）
+    FLUSH_BYTES = 64 * 1024
+    FLUSH_INTERVAL = 2.0
+
+    # 当前打开的输出文件（规范化的绝对路径）
+    _open_paths = set()
+    _open_lock = threading.Lock()
+
+    @staticmethod
+    def _key(path):
+        return os.path.normcase(os.path.abspath(path))
+
+    @classmethod
+    def is_open(cls, path):
+        """该文件是否正在被某个 CsvCardSink 写入"""
+        with cls._open_lock:
+            return cls._key(path) in cls._open_paths
+
+    def __init__(self, path, flush_bytes=None, flush_interval=None):
+        self.path = path
+        self.flush_bytes = flush_bytes or self.FLUSH_BYTES
+        self.flush_interval = self.FLUSH_INTERVAL if flush_interval is None else flush_interval
+        self.card_count = 0
+        self._lock = threading.Lock()
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer)
+        self._file = None
+        self._last_flush = time.monotonic()
+
+    def open(self):
+        """创建（覆盖）输出文件并写入表头"""
+        with self._lock:
+            if self._file is None:
+                # 先登记再截断文件，卡片库不会读到写了一半的文件
+                with self._open_lock:
+                    self._open_paths.add(self._key(self.path))
+                try:
+                    self._file = open(self.path, 'w', newline='', encoding='utf-8')
+                except Exception:
+                    with self._open_lock:
+                        self._open_paths.discard(self._key(self.path))
+                    raise
+                self._writer.writerow(self.HEADER)
+                self._flush_locked()
+        return self
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    @property
+    def closed(self):
+        return self._file is None
+
+    def write_cards(self, rows):
+        """追加多行 (问题, 答案)，同一批的行在文件中保持连续"""
+        with self._lock:
+            if self._file is None:
+                raise ValueError(f"卡片输出文件未打开: {self.path}")
+            count = 0
+            for question, answer in rows:
+                self._writer.writerow((question, answer))
+                count += 1
+            self.card_count += count
+            if (self._buffer.tell() >= self.flush_bytes
+                    or time.monotonic() - self._last_flush >= self.flush_interval):
+                self._flush_locked()
+            return count
+
+    def flush(self):
+        """把缓冲区写入操作系统"""
+        with self._lock:
+            if self._file is not None:
+                self._flush_locked()
+
+    def checkpoint(self):
+        """片段完成：刷新缓冲区并同步到磁盘"""
+        with self._lock:
+            if self._file is not None:
+                self._flush_locked()
+                os.fsync(self._file.fileno())
+
+    def close(self):
+        """同步并关闭文件，可重复调用"""
+        with self._lock:
+            if self._file is None:
+                return
+            try:
+                self._flush_locked()
+                os.fsync(self._file.fileno())
+            finally:
+                self._file.close()
+                self._file = None
+                with self._open_lock:
+                    self._open_paths.discard(self._key(self.path))
+
+    def _flush_locked(self):
+        data = self._buffer.getvalue()
+        if data:
+            self._file.write(data)
+            self._buffer.seek(0)
+            self._buffer.truncate()
+        self._file.flush()
+        self._last_flush = time.monotonic()
@@ -4,9 +4,12 @@
 """
 
 import os
+import json
+import hashlib
 import logging
 import sys
 import tempfile
+import threading
 from datetime import datetime
 
 # 日志和错误处理类
@@ -106,3 +109,92 @@ class Logger:
     def debug(message):
         """记录调试日志"""
         Logger.get_instance()._logger.debug(message)
+
+
+class PayloadLogPolicy:
+    """请求/响应负载的日志策略
+
+    大段提示词和响应文本不再整段写入日志，而是记录长度、内容哈希以及首尾片段；
+    每隔 SAMPLE_EVERY 次才完整输出一次，便于排查问题的同时控制日志I/O。
+    """
+
+    HEAD_CHARS = 160  # 截断时保留的开头字符数
+    TAIL_CHARS = 80  # 截断时保留的结尾字符数
+    SAMPLE_EVERY = 50  # 每N次记录完整输出一次，0表示从不完整输出
+
+    _counter = 0
+    _lock = threading.Lock()
+
+    @staticmethod
+    def content_hash(text):
+        """计算文本内容的短哈希，用于在日志中标识同一份内容"""
+        if not isinstance(text, str):
+            text = str(text)
+        return hashlib.sha1(text.encode('utf-8', errors='replace')).hexdigest()[:12]
+
+    @classmethod
+    def should_dump_full(cls):
+        """按 1/N 采样决定本次是否完整输出"""
+        if cls.SAMPLE_EVERY <= 0:
+            return False
+        with cls._lock:
+            cls._counter += 1
+            return cls._counter % cls.SAMPLE_EVERY == 0
+
+    @classmethod
+    def truncate(cls, text):
+        """保留文本首尾片段，中间部分以省略标记代替"""
+        if not isinstance(text, str):
+            text = str(text)
+        limit = cls.HEAD_CHARS + cls.TAIL_CHARS
+        if len(text) <= limit:
+            return text
+        omitted = len(text) - limit
+        tail = text[-cls.TAIL_CHARS:] if cls.TAIL_CHARS > 0 else ''
+        return f"{text[:cls.HEAD_CHARS]} …[省略{omitted}字符]… {tail}"
+
+    @classmethod
+    def summarize(cls, text, full=None):
+        """生成文本摘要：长度、哈希和截断后的内容
+
+        Args:
+            text: 要记录的文本
+            full: 是否完整输出；为None时按采样策略决定
+        """
+        if not isinstance(text, str):
+            text = str(text)
+        if full is None:
+            full = cls.should_dump_full()
+        header = f"[{len(text)}字符 sha1:{cls.content_hash(text)}]"
+        if full:
+            return f"{header} {text}"
+        return f"{header} {cls.truncate(text)}"
+
+    @classmethod
+    def describe_payload(cls, payload):
+        """描述请求负载，不对整个负载重新做JSON序列化
+
+        只有命中采样时才完整序列化一次负载。
+        """
+        if not isinstance(payload, dict):
+            return cls.summarize(payload)
+        if cls.should_dump_full():
+            return json.dumps(payload, ensure_ascii=False)
+
+        parts = []
+        for key, value in payload.items():
+            if key == 'messages' and isinstance(value, list):
+                message_parts = []
+                for message in value:
+                    if isinstance(message, dict):
+                        role = message.get('role', '?')
+                        content = message.get('content', '')
+                        message_parts.append(f"{role}{cls.summarize(content, full=False)}")
+                    else:
+                        message_parts.append(cls.summarize(message, full=False))
+                parts.append(f"messages({len(value)}): " + " | ".join(message_parts))
+            elif isinstance(value, str) and len(value) > cls.HEAD_CHARS:
+                parts.append(f"{key}={cls.summarize(value, full=False)}")
+            else:
+                parts.append(f"{key}={value!r}")
+        return ", ".join(parts)
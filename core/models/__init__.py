@@ -2,10 +2,15 @@
 数据模型和业务逻辑模块。
 """
 
-from core.models.model_loader import ModelLoader
-from core.models.model_manager import ModelManager
-from core.models.ollama_model_manager import OllamaModelManager    
-from core.models.remote_api_manager import RemoteApiManager
+from core import _load_lazy_export
+
+# 这些模块依赖PyQt5，首次访问时才导入
+_LAZY_EXPORTS = {
+    'ModelLoader': 'core.models.model_loader',
+    'ModelManager': 'core.models.model_manager',
+    'OllamaModelManager': 'core.models.ollama_model_manager',
+    'RemoteApiManager': 'core.models.remote_api_manager',
+}
 
 __all__ = [
     'ModelLoader',
@@ -13,3 +18,7 @@ __all__ = [
     'RemoteApiManager',
     'ModelManager',
 ]
+
+
+def __getattr__(name):
+    return _load_lazy_export(globals(), _LAZY_EXPORTS, name)
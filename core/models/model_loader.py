@@ -1,7 +1,13 @@
 from PyQt5.QtCore import QObject, pyqtSignal
 
+from core.services.model_catalog import ModelCatalog
+
 class ModelLoader(QObject):
-    finished = pyqtSignal(list)
+    """在后台线程刷新本地模型目录
+
+    finished(models, changed)：models为空表示刷新失败，changed表示与缓存相比列表是否有变化
+    """
+    finished = pyqtSignal(list, bool)
     
     def __init__(self, handler):
         super().__init__()
@@ -9,9 +15,12 @@ class ModelLoader(QObject):
 
     def run(self):
         try:
-            result = self.handler.list_local_models()
-            models = [m['name'] for m in result.get('models', [])]
-            self.finished.emit(models)
+            result = ModelCatalog.refresh_local(self.handler)
+            if 'error' in result:
+                print(f"刷新本地模型列表失败: {result['error']}")
+                self.finished.emit([], False)
+            else:
+                self.finished.emit(result['models'], result['changed'])
         except Exception as e:
-            self.finished.emit([])
-            
\ No newline at end of file
+            print(f"刷新本地模型列表失败: {str(e)}")
+            self.finished.emit([], False)
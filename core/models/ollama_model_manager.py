@@ -5,9 +5,13 @@
 
 from PyQt5.QtWidgets import (
     QDialog, QVBoxLayout, QLabel, QComboBox, QHBoxLayout,
-    QLineEdit, QProgressBar, QCheckBox, QDialogButtonBox, QApplication, QPushButton
+    QLineEdit, QListWidget, QDialogButtonBox, QApplication, QPushButton
 )
-from PyQt5.QtCore import QThread, pyqtSignal, Qt
+from PyQt5.QtCore import Qt
+
+from core.config import Config
+from core.services.model_catalog import ModelCatalog
+from core.services.model_downloads import ModelDownloadManager, ModelPullJob
 
 class OllamaModelManager:
     """Ollama模型管理器类，负责安装和管理Ollama模型"""
@@ -19,14 +23,46 @@ class OllamaModelManager:
             parent_window: 父窗口，用于显示对话框
         """
         self.parent = parent_window
-        self.install_thread = None
+        self.downloads = None
+        self.download_signals = None
         self.local_models = []
     
+    def get_download_manager(self):
+        """获取下载管理器，首次使用时连接下载完成的处理"""
+        if self.downloads is None:
+            from ui.services.download_signals import ModelDownloadSignals
+            self.download_signals = ModelDownloadSignals.instance()
+            self.download_signals.job_finished.connect(self.on_download_finished)
+            self.downloads = self.download_signals.downloads
+        return self.downloads
+    
+    def resume_pending_downloads(self):
+        """继续上次未完成的模型下载"""
+        resumed = self.get_download_manager().resume_pending()
+        if resumed:
+            print(f"继续下载模型: {', '.join(resumed)}")
+        return resumed
+    
+    def on_download_finished(self, model_name, success, message):
+        """模型下载成功后让本地模型缓存失效，本地模式下刷新列表"""
+        if not success:
+            return
+        ModelCatalog.invalidate(ModelCatalog.local_key())
+        if Config.MODEL_SOURCE == 'Ollama本地模型' and hasattr(self.parent, 'refresh_local_models'):
+            self.parent.refresh_local_models()
+    
+    def cleanup(self):
+        """程序退出时停止下载，未完成的模型下次启动后可继续"""
+        ModelDownloadManager.shutdown()
+    
     def install_ollama_model(self):
-        """提供Ollama模型安装指导"""
+        """选择模型加入下载队列，并显示所有下载的进度（关闭对话框不影响下载）"""
+        downloads = self.get_download_manager()
+        signals = self.download_signals
+        
         dialog = QDialog(self.parent)
         dialog.setWindowTitle("安装Ollama模型")
-        dialog.setMinimumWidth(500)
+        dialog.setMinimumWidth(560)
         
         layout = QVBoxLayout(dialog)
         
@@ -53,138 +89,99 @@ class OllamaModelManager:
         import platform
         system = platform.system().lower()
         
-        # 对于Windows系统，添加PowerShell选项
-        use_powershell = False
-        if system == "windows":
-            ps_checkbox = QCheckBox("使用PowerShell安装模型（推荐）")
-            ps_checkbox.setChecked(True)  # 默认选中
-            layout.addWidget(ps_checkbox)
-            use_powershell = True
-        
         # 添加状态标签
         status_label = QLabel("")
+        status_label.setWordWrap(True)
         layout.addWidget(status_label)
         
-        # 添加进度条
-        progress = QProgressBar()
-        progress.setRange(0, 100)  # 设置为确定模式
-        progress.setVisible(False)
-        layout.addWidget(progress)
+        # 下载队列，每行显示一个模型的进度、速度和剩余时间
+        layout.addWidget(QLabel("下载队列（可同时下载多个模型，关闭窗口后继续在后台下载）："))
+        job_list = QListWidget()
+        job_list.setMinimumHeight(120)
+        layout.addWidget(job_list)
+        
+        queue_layout = QHBoxLayout()
+        cancel_btn = QPushButton("取消选中的下载")
+        clear_btn = QPushButton("清除已结束")
+        resume_btn = QPushButton("继续未完成的下载")
+        queue_layout.addWidget(cancel_btn)
+        queue_layout.addWidget(clear_btn)
+        queue_layout.addWidget(resume_btn)
+        queue_layout.addStretch()
+        layout.addLayout(queue_layout)
         
         # 添加按钮
         button_box = QDialogButtonBox()
-        install_btn = button_box.addButton("安装", QDialogButtonBox.AcceptRole)
-        close_btn = button_box.addButton("关闭", QDialogButtonBox.RejectRole)
+        install_btn = button_box.addButton("加入下载队列", QDialogButtonBox.AcceptRole)
+        button_box.addButton("关闭", QDialogButtonBox.RejectRole)
         button_box.rejected.connect(dialog.reject)
         layout.addWidget(button_box)
         
-        # 安装模型的函数
+        def refresh_job_list():
+            snapshots = downloads.snapshot()
+            # 行数不变时只更新文本，保留用户的选中状态
+            if job_list.count() != len(snapshots):
+                job_list.clear()
+                job_list.addItems(['' for _ in snapshots])
+            for row, snapshot in enumerate(snapshots):
+                item = job_list.item(row)
+                item.setText(ModelDownloadManager.describe(snapshot))
+                item.setData(Qt.UserRole, snapshot['model'])
+            pending = [name for name in downloads.pending_models()
+                       if not any(s['model'] == name and s['state'] != ModelPullJob.FAILED for s in snapshots)]
+            resume_btn.setVisible(bool(pending))
+            resume_btn.setText(f"继续未完成的下载（{len(pending)}）")
+        
         def start_model_installation():
             # 获取选择的模型
-            model_name = custom_input.text() if custom_input.text() else model_combo.currentText()
+            model_name = custom_input.text().strip() if custom_input.text().strip() else model_combo.currentText()
             
             if not model_name:
                 status_label.setText("请选择或输入模型名称")
                 status_label.setStyleSheet("color: red;")
                 return
             
-            # 更新UI状态
-            status_label.setText(f"正在安装模型 {model_name}，这可能需要一些时间...")
+            downloads.enqueue(model_name)
+            status_label.setText(f"模型 {model_name} 已加入下载队列，这可能需要一些时间...")
             status_label.setStyleSheet("color: blue;")
-            progress.setVisible(True)
-            install_btn.setEnabled(False)
-            custom_input.setEnabled(False)
-            model_combo.setEnabled(False)
-            if system == "windows":
-                ps_checkbox.setEnabled(False)
-            QApplication.processEvents()
-            
-            # 使用QThread执行安装任务
-            class ModelInstallThread(QThread):
-                finished_signal = pyqtSignal(bool, str)
-                progress_signal = pyqtSignal(int)  # 新增信号用于传递进度
-                cancel_signal = pyqtSignal()  # 新增信号用于取消安装
-                
-                def __init__(self, model_name, use_powershell=False):
-                    super().__init__()
-                    self.model_name = model_name
-                    self.use_powershell = use_powershell and system == "windows"
-                    self._is_cancelled = False  # 用于标记是否取消
+            custom_input.clear()
+        
+        def cancel_selected():
+            item = job_list.currentItem()
+            if item is not None:
+                downloads.cancel(item.data(Qt.UserRole))
+        
+        def on_job_finished(model_name, success, message):
+            if success:
+                status_label.setText(f"{message}！模型 {model_name} 已安装。")
+                status_label.setStyleSheet("color: green;")
+            else:
+                status_label.setText(f"模型 {model_name}: {message}")
+                status_label.setStyleSheet("color: red;")
                 
-                def run(self):
-                    import subprocess
-                    from tqdm import tqdm
-                    from ollama import pull
-                    try:
-                        current_digest, bars = '', {}
-                        for progress_data in pull(self.model_name, stream=True):
-                            if self._is_cancelled:
-                                self.finished_signal.emit(False, "安装已取消")
-                                return
-
-                            digest = progress_data.get('digest', '')
-                            if digest != current_digest and current_digest in bars:
-                                bars[current_digest].close()
-
-                            if not digest:
-                                print(progress_data.get('status'))
-                                continue
-
-                            if digest not in bars and (total := progress_data.get('total')):
-                                bars[digest] = tqdm(total=total, desc=f'pulling {digest[7:19]}', unit='B', unit_scale=True)
-
-                            if completed := progress_data.get('completed'):
-                                bars[digest].update(completed - bars[digest].n)
-                                # 发出进度信号
-                                self.progress_signal.emit(int((completed / total) * 100))
-
-                            current_digest = digest
-
-                        self.finished_signal.emit(True, "模型安装成功")
-                    except Exception as e:
-                        self.finished_signal.emit(False, f"安装过程出错: {str(e)}")
-
-                def cancel(self):
-                    self._is_cancelled = True
-            
-            # 获取PowerShell选项状态
-            use_ps = False
-            if system == "windows":
-                use_ps = ps_checkbox.isChecked()
-            
-            # 创建并启动线程
-            self.install_thread = ModelInstallThread(model_name, use_ps)
-            
-            # 连接信号
-            def on_install_finished(success, message):
-                progress.setVisible(False)
-                install_btn.setEnabled(True)
-                custom_input.setEnabled(True)
-                model_combo.setEnabled(True)
+                # 添加手动安装指南按钮
                 if system == "windows":
-                    ps_checkbox.setEnabled(True)
-                
-                if success:
-                    status_label.setText(f"{message}！模型 {model_name} 已安装。")
-                    status_label.setStyleSheet("color: green;")
-                else:
-                    status_label.setText(message)
-                    status_label.setStyleSheet("color: red;")
-                    
-                    # 添加手动安装指南按钮
-                    if system == "windows":
-                        guide_btn = button_box.addButton("手动安装指南", QDialogButtonBox.HelpRole)
-                        guide_btn.clicked.connect(lambda: self.show_manual_install_guide(model_name))
-            
-            self.install_thread.finished_signal.connect(on_install_finished)
-            self.install_thread.progress_signal.connect(lambda value: progress.setValue(value))
-            self.install_thread.cancel_signal.connect(self.install_thread.cancel)
-            button_box.rejected.connect(lambda: self.install_thread.cancel())
-            self.install_thread.start()
+                    guide_btn = button_box.addButton("手动安装指南", QDialogButtonBox.HelpRole)
+                    guide_btn.clicked.connect(lambda: self.show_manual_install_guide(model_name))
         
-        # 连接安装按钮
         install_btn.clicked.connect(start_model_installation)
-        
+        cancel_btn.clicked.connect(cancel_selected)
+        clear_btn.clicked.connect(downloads.clear_finished)
+        resume_btn.clicked.connect(self.resume_pending_downloads)
+        signals.jobs_changed.connect(refresh_job_list)
+        signals.job_finished.connect(on_job_finished)
+        
+        def disconnect_downloads(*args):
+            # 对话框只是下载队列的视图，关闭后下载继续进行
+            for signal, slot in ((signals.jobs_changed, refresh_job_list),
+                                 (signals.job_finished, on_job_finished)):
+                try:
+                    signal.disconnect(slot)
+                except TypeError:
+                    pass
+        dialog.finished.connect(disconnect_downloads)
+        
+        refresh_job_list()
         dialog.exec_()
     
     def show_manual_install_guide(self, model_name):
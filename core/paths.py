@@ -0,0 +1,25 @@
+"""
+应用数据目录模块
+统一计算缓存、数据库等用户数据文件的存放位置
+"""
+
+import os
+import tempfile
+
+
+def app_data_dir(*parts):
+    """返回应用数据目录下的路径（不创建目录）
+
+    与日志、输出卡片目录的规则一致：
+    Windows 使用 %APPDATA%\\Memoride，其次使用 ~/.memoride，都不可用时使用临时目录。
+
+    Args:
+        parts: 追加在数据目录后的子路径
+    """
+    if 'APPDATA' in os.environ:
+        base = os.path.join(os.environ['APPDATA'], 'Memoride')
+    elif 'HOME' in os.environ:
+        base = os.path.join(os.environ['HOME'], '.memoride')
+    else:
+        base = os.path.join(tempfile.gettempdir(), 'memoride')
+    return os.path.join(base, *parts)
@@ -0,0 +1,58 @@
+"""
+启动性能分析模块
+按阶段记录应用启动耗时，用于 --profile-startup 模式
+"""
+
+import time
+
+from core.logging import Logger
+
+
+class StartupProfiler:
+    """启动阶段计时器
+
+    未启用时所有方法都是空操作，正常启动不会产生额外开销。
+    """
+
+    def __init__(self, enabled=False):
+        """
+        初始化计时器
+
+        Args:
+            enabled: 是否启用计时
+        """
+        self.enabled = enabled
+        self.start_time = time.perf_counter()
+        self.last_time = self.start_time
+        self.phases = []  # (阶段名称, 阶段耗时, 累计耗时)
+        self.reported = False
+
+    def mark(self, phase):
+        """记录一个阶段的结束时间点
+
+        Args:
+            phase: 阶段名称
+        """
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last_time, now - self.start_time))
+        self.last_time = now
+
+    def report(self):
+        """输出各阶段耗时报告，只输出一次
+
+        Returns:
+            str: 报告文本，未启用时返回空字符串
+        """
+        if not self.enabled or self.reported:
+            return ""
+        self.reported = True
+
+        lines = ["启动耗时分析 (time-to-first-window):"]
+        for phase, duration, elapsed in self.phases:
+            lines.append(f"  {phase:<16} {duration * 1000:8.1f} ms   累计 {elapsed * 1000:8.1f} ms")
+        report = "\n".join(lines)
+        print(report)
+        Logger.info(report)
+        return report
@@ -0,0 +1,91 @@
+"""
+任务进度统计模块
+
+后台任务只更新加锁保护的计数器，不再为每一步发送跨线程信号；
+界面以固定频率调用 snapshot() 采样，并根据最近一段时间窗口计算
+处理速度（片段/秒、tokens/秒）和剩余时间。
+"""
+
+import threading
+import time
+from collections import deque
+
+
+class ProgressTracker:
+    """线程安全的任务进度聚合器"""
+
+    # 计算速度时使用的滚动窗口长度（秒）
+    WINDOW_SECONDS = 30.0
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._fraction = 0.0     # 整体完成比例 0~1
+        self._sections = 0       # 已完成的片段数
+        self._tokens = 0         # 已生成的token数
+        self._message = ''
+        self._started = time.monotonic()
+        self._samples = deque()  # (时间, 完成比例, 片段数, token数)
+
+    def set_progress(self, current, total, message=None):
+        """设置整体进度（current/total），可附带状态描述"""
+        with self._lock:
+            if total > 0:
+                self._fraction = min(max(current / total, 0.0), 1.0)
+            if message is not None:
+                self._message = message
+
+    def add_section(self):
+        """记录一个片段处理完成"""
+        with self._lock:
+            self._sections += 1
+
+    def add_tokens(self, tokens):
+        """累加模型生成的token数"""
+        with self._lock:
+            self._tokens += tokens
+
+    def snapshot(self):
+        """采样当前进度，返回包含进度、速度和剩余时间的字典"""
+        now = time.monotonic()
+        with self._lock:
+            fraction, sections, tokens, message = self._fraction, self._sections, self._tokens, self._message
+            self._samples.append((now, fraction, sections, tokens))
+            # 丢弃窗口之外的采样，但至少保留一个作为基准
+            while len(self._samples) > 1 and now - self._samples[0][0] > self.WINDOW_SECONDS:
+                self._samples.popleft()
+            base_time, base_fraction, base_sections, base_tokens = self._samples[0]
+
+        # 窗口刚开始时以任务开始时刻为基准
+        if now - base_time < 1.0:
+            base_time, base_fraction, base_sections, base_tokens = self._started, 0.0, 0, 0
+        span = max(now - base_time, 1e-6)
+
+        fraction_rate = (fraction - base_fraction) / span
+        eta = None
+        if fraction >= 1.0:
+            eta = 0.0
+        elif fraction_rate > 0:
+            eta = (1.0 - fraction) / fraction_rate
+
+        return {
+            'percent': int(fraction * 100),
+            'message': message,
+            'sections': sections,
+            'tokens': tokens,
+            'elapsed': now - self._started,
+            'sections_per_sec': (sections - base_sections) / span,
+            'tokens_per_sec': (tokens - base_tokens) / span,
+            'eta': eta,
+        }
+
+    @staticmethod
+    def format_duration(seconds):
+        """将秒数格式化为 'X小时Y分' / 'X分Y秒' / 'X秒'"""
+        if seconds is None:
+            return '--'
+        seconds = int(seconds)
+        if seconds >= 3600:
+            return f"{seconds // 3600}小时{seconds % 3600 // 60}分"
+        if seconds >= 60:
+            return f"{seconds // 60}分{seconds % 60}秒"
+        return f"{seconds}秒"
@@ -0,0 +1,114 @@
+"""
+对话检索模块
+从卡片库中检索与问题相关的原文分块和学习卡片，在token预算内拼接成参考资料注入提示词，
+不需要每轮对话都重新发送整本书。
+
+- 原文片段在生成卡片时按段落切成不超过 CHUNK_TOKENS 的分块保存
+- 检索使用卡片库的 passages_fts 索引（中文按相邻两字切词，BM25排序）
+- 候选按相关度依次放入，放不下的跳过，直到用完预算
+"""
+
+import os
+
+from core.tokens import estimate_tokens
+
+
+def split_passages(text, max_tokens=400):
+    """按段落把文本切成不超过 max_tokens 的分块，过长的段落按行、再按字符切分"""
+    chunks = []
+    current, current_tokens = [], 0
+
+    def pieces(paragraph):
+        if estimate_tokens(paragraph) <= max_tokens:
+            yield paragraph
+            return
+        for line in paragraph.split('\n'):
+            while estimate_tokens(line) > max_tokens:
+                # 每个字符最多算1个token，max_tokens个字符一定不超过预算
+                yield line[:max_tokens]
+                line = line[max_tokens:]
+            if line.strip():
+                yield line
+
+    for paragraph in text.split('\n\n'):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        for piece in pieces(paragraph):
+            tokens = estimate_tokens(piece)
+            if current and current_tokens + tokens > max_tokens:
+                chunks.append('\n\n'.join(current))
+                current, current_tokens = [], 0
+            current.append(piece)
+            current_tokens += tokens
+    if current:
+        chunks.append('\n\n'.join(current))
+    return chunks
+
+
+class ContextRetriever:
+    """为对话检索参考资料"""
+
+    DEFAULT_TOKEN_BUDGET = 2000
+    # 原文分块大小（估算token数）
+    CHUNK_TOKENS = 400
+    # 参与挑选的候选数量
+    CANDIDATES = 40
+
+    def __init__(self, store=None, token_budget=None):
+        if store is None:
+            from core.storage.card_store import CardStore
+            store = CardStore.default()
+        self.store = store
+        self.token_budget = token_budget or self.DEFAULT_TOKEN_BUDGET
+
+    def add_source(self, content, source_file=''):
+        """保存一个原文片段供之后检索
+
+        Returns:
+            新增的分块数量（片段已保存过时为0）
+        """
+        from core.storage.card_store import CardStore
+        return self.store.add_source_chunks(
+            CardStore.section_hash(content),
+            split_passages(content, self.CHUNK_TOKENS),
+            source_file,
+        )
+
+    def retrieve(self, query):
+        """检索与问题相关的资料，总长度不超过token预算
+
+        Returns:
+            按相关度降序的资料列表（字典，另含 tokens 字段）
+        """
+        remaining = self.token_budget
+        selected, seen = [], set()
+        for passage in self.store.search_passages(query, limit=self.CANDIDATES):
+            text = passage['text'].strip()
+            if text in seen:
+                continue
+            tokens = estimate_tokens(text)
+            if tokens > remaining:
+                continue
+            passage['tokens'] = tokens
+            selected.append(passage)
+            seen.add(text)
+            remaining -= tokens
+            if remaining <= 0:
+                break
+        return selected
+
+    @staticmethod
+    def build_prompt(question, passages):
+        """把检索到的资料和问题组合成发送给模型的用户消息"""
+        if not passages:
+            return question
+        parts = ["请参考以下从用户资料中检索到的内容回答问题。资料不足以回答时请直接说明，不要编造。", ""]
+        for i, passage in enumerate(passages, 1):
+            label = '卡片' if passage['kind'] == 'card' else '原文'
+            source = os.path.basename(passage['source_file']) if passage['source_file'] else '未知来源'
+            parts.append(f"[{i}] {label}（{source}）")
+            parts.append(passage['text'].strip())
+            parts.append("")
+        parts.append(f"问题：{question}")
+        return '\n'.join(parts)
@@ -3,6 +3,19 @@
 包含各种核心服务功能
 """
 
-from core.services.ollama_service import OllamaService
+from core import _load_lazy_export
 
-__all__ = ['OllamaService']
+_LAZY_EXPORTS = {
+    'CardEmbeddings': 'core.services.card_embeddings',
+    'ModelCatalog': 'core.services.model_catalog',
+    'ModelDownloadManager': 'core.services.model_downloads',
+    'OllamaService': 'core.services.ollama_service',
+    'OllamaSupervisor': 'core.services.ollama_supervisor',
+    'SystemPromptRegistry': 'core.services.prompt_registry',
+}
+
+__all__ = ['CardEmbeddings', 'ModelCatalog', 'ModelDownloadManager', 'OllamaService', 'OllamaSupervisor', 'SystemPromptRegistry']
+
+
+def __getattr__(name):
+    return _load_lazy_export(globals(), _LAZY_EXPORTS, name)
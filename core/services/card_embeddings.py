@@ -0,0 +1,193 @@
+"""
+卡片嵌入服务
+调用Ollama嵌入模型为卡片生成向量并保存在 EmbeddingIndex 中，用于：
+
+- 语义去重：新卡片与已有卡片的余弦相似度达到阈值时丢弃（可识别换了说法的重复问题）
+- 相关卡片：检索与某张卡片语义最接近的其他卡片
+
+每个嵌入模型使用独立的索引目录（不同模型的向量不能混用），卡片按内容哈希只生成一次向量。
+"""
+
+import os
+import re
+import threading
+
+from core.paths import app_data_dir
+from core.storage.card_store import CardStore
+from core.storage.embedding_index import EmbeddingIndex, np
+
+
+class CardEmbeddings:
+    """某个嵌入模型的卡片向量索引"""
+
+    DEFAULT_DIRECTORY = app_data_dir("embeddings")
+    # 每次嵌入请求的卡片数量
+    BATCH_SIZE = 64
+
+    # index_store 已经处理到的位置 {(索引目录, 卡片库路径): CardStore.change_marker()}，进程内共享
+    _indexed_upto = {}
+    _indexed_lock = threading.Lock()
+
+    def __init__(self, model, api_handler=None, directory=None):
+        if api_handler is None:
+            # 嵌入总是使用本地Ollama，与当前选择的生成模型来源无关
+            from core.api.ollama_api_handler import OllamaAPIHandler
+            api_handler = OllamaAPIHandler()
+        self.model = model
+        self.api_handler = api_handler
+        safe_name = re.sub(r'[^\w.-]+', '_', model)
+        # 同一模型的索引在进程内共享，文件处理和卡片搜索可以同时追加
+        self.index = EmbeddingIndex.shared(os.path.join(directory or self.DEFAULT_DIRECTORY, safe_name), model)
+        self.store = None
+        # 语义去重时参与比较的行（已有卡片 + 本次保留的卡片），EmbeddingIndex.rows_mask() 格式
+        self._allowed = None
+
+    @staticmethod
+    def available():
+        return EmbeddingIndex.available()
+
+    @staticmethod
+    def card_text(question, answer):
+        return f"{question.strip()}\n{answer.strip()}"
+
+    def embed(self, texts):
+        """批量生成向量，返回 N x dim 矩阵，失败时抛出RuntimeError"""
+        result = self.api_handler.embed(self.model, list(texts), batch_size=self.BATCH_SIZE)
+        if 'error' in result:
+            raise RuntimeError(result['error'])
+        return np.asarray(result['embeddings'], dtype=np.float32)
+
+    def index_cards(self, cards, should_stop=None):
+        """为尚无向量的卡片生成向量
+
+        Args:
+            cards: 可迭代的 (卡片哈希, 问题, 答案)
+
+        Returns:
+            新生成向量的卡片数量
+        """
+        added = 0
+        batch = []
+
+        def flush(batch):
+            missing = set(self.index.missing(item[0] for item in batch))
+            pending = [item for item in batch if item[0] in missing]
+            if not pending:
+                return 0
+            vectors = self.embed(self.card_text(q, a) for _, q, a in pending)
+            self.index.add([item[0] for item in pending], vectors)
+            return len(pending)
+
+        for card in cards:
+            batch.append(card)
+            if len(batch) >= self.BATCH_SIZE * 16:
+                if should_stop is not None and should_stop():
+                    return added
+                added += flush(batch)
+                batch = []
+        if batch:
+            added += flush(batch)
+        return added
+
+    def index_store(self, store, should_stop=None):
+        """为卡片库中尚无向量的卡片生成向量，只检查上次调用之后新写入的卡片
+
+        Returns:
+            新生成向量的卡片数量
+        """
+        key = (self.index.directory, os.path.abspath(store.path))
+        marker = store.change_marker()
+        with self._indexed_lock:
+            last = self._indexed_upto.get(key)
+        if last == marker:
+            return 0
+        # 删除过卡片时新卡片可能重用旧id，需要全部重新检查
+        min_id = last[1] + 1 if last is not None and last[0] == marker[0] else None
+        added = self.index_cards(store.iter_unique_cards(min_id=min_id), should_stop)
+        if should_stop is None or not should_stop():
+            with self._indexed_lock:
+                self._indexed_upto[key] = marker
+        return added
+
+    def seed_from_store(self, store, exclude_csv_paths=(), directory=None, should_stop=None):
+        """与 CardDeduplicator.seed_from_store 相同：只和来自 directory 的已有卡片比较，
+        缺少向量的卡片先补齐
+
+        Returns:
+            参与比较的已有卡片数量
+        """
+        self.store = store
+        keys = []
+
+        def cards():
+            for card in store.iter_unique_cards(exclude_csv_paths, directory):
+                keys.append(card[0])
+                yield card
+
+        self.index_cards(cards(), should_stop)
+        self._allowed = self.index.rows_mask(keys)
+        return len(keys)
+
+    def filter(self, rows, threshold):
+        """过滤 (问题, 答案) 序列中与已有卡片或同批卡片语义重复的卡片，保留的卡片加入索引
+
+        Returns:
+            (保留的行, [(被丢弃的问题, 与之重复的问题)])
+        """
+        rows = [(q, a) for q, a in rows]
+        if not rows:
+            return [], []
+        vectors = EmbeddingIndex.normalize(self.embed(self.card_text(q, a) for q, a in rows))
+        keys = [CardStore.card_hash(q, a) for q, a in rows]
+        if self._allowed is None:
+            self._allowed = np.zeros(0, dtype=bool)
+        matches = self.index.search_many(vectors, k=1, min_score=threshold, allowed_rows=self._allowed)
+        duplicates = {}
+        if self.store is not None:
+            duplicates = self.store.cards_by_hash(match[0][0] for match in matches if match)
+
+        kept, kept_rows, dropped = [], [], []
+        for i, (question, answer) in enumerate(rows):
+            if matches[i]:
+                card = duplicates.get(matches[i][0][0])
+                dropped.append((question, card['question'] if card else ''))
+                continue
+            # 同一批中更早保留的卡片
+            if kept:
+                scores = vectors[kept] @ vectors[i]
+                best = int(np.argmax(scores))
+                if scores[best] >= threshold:
+                    dropped.append((question, rows[kept[best]][0]))
+                    continue
+            kept.append(i)
+            kept_rows.append((question, answer))
+
+        if kept:
+            kept_keys = [keys[i] for i in kept]
+            missing = set(self.index.missing(kept_keys))
+            new = [i for i in kept if keys[i] in missing]
+            if new:
+                self.index.add([keys[i] for i in new], vectors[new])
+            rows = self.index.rows(kept_keys)
+            rows = rows[rows >= 0]
+            if len(rows) and rows.max() >= len(self._allowed):
+                # 其他使用者追加的行不参与比较
+                self._allowed = np.concatenate([self._allowed, np.zeros(rows.max() + 1 - len(self._allowed), dtype=bool)])
+            self._allowed[rows] = True
+        return kept_rows, dropped
+
+    def related(self, card, k=20):
+        """检索与卡片语义最接近的其他卡片
+
+        Args:
+            card: 卡片字典（至少包含 question 和 answer）
+
+        Returns:
+            [(卡片哈希, 相似度)]
+        """
+        key = CardStore.card_hash(card['question'], card['answer'])
+        vector = self.index.get_vector(key)
+        if vector is None:
+            vector = self.embed([self.card_text(card['question'], card['answer'])])[0]
+            self.index.add([key], vector[None, :])
+        return self.index.search(vector, k=k, exclude_keys=[key])
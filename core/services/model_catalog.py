@@ -0,0 +1,152 @@
+"""
+模型目录服务
+缓存本地（Ollama /api/tags）和远程（/v1/models）模型列表，
+界面先用缓存立即填充选择器，再在后台刷新，切换模型来源不再等待网络请求
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+from core.config import Config, OLLAMA_API_URL
+from core.config_store import atomic_write_text
+from core.logging import Logger
+from core.paths import app_data_dir
+
+
+class ModelCatalog:
+    """带TTL和变化检测的模型列表缓存
+
+    - 每个端点一条缓存：模型名称列表、获取时间、指纹（Ollama按模型digest计算）和ETag（远程API）
+    - 缓存超过TTL后视为过期，但仍可用于立即显示
+    - 刷新结果的指纹未变化时不改写缓存文件，调用方也可据此跳过界面更新
+    """
+
+    # 缓存有效期（秒）
+    TTL_SECONDS = 300
+
+    CACHE_FILE = app_data_dir("model_catalog.json")
+
+    _entries = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def local_key():
+        """本地Ollama模型列表的缓存键"""
+        return f"ollama:{OLLAMA_API_URL}"
+
+    @staticmethod
+    def remote_key(api_url=None):
+        """远程API模型列表的缓存键"""
+        return f"remote:{api_url or Config.REMOTE_API_URL}"
+
+    @classmethod
+    def _load(cls):
+        """首次访问时读取缓存文件（调用方需持有锁）"""
+        if cls._entries is None:
+            cls._entries = {}
+            try:
+                if os.path.exists(cls.CACHE_FILE):
+                    with open(cls.CACHE_FILE, 'r', encoding='utf-8') as f:
+                        data = json.load(f)
+                    if isinstance(data, dict):
+                        cls._entries = data
+            except Exception as e:
+                Logger.warning(f"读取模型目录缓存失败: {str(e)}")
+        return cls._entries
+
+    @classmethod
+    def _save(cls):
+        """持久化缓存（调用方需持有锁）"""
+        try:
+            os.makedirs(os.path.dirname(cls.CACHE_FILE), exist_ok=True)
+            atomic_write_text(cls.CACHE_FILE, json.dumps(cls._entries, ensure_ascii=False, indent=2))
+        except Exception as e:
+            Logger.warning(f"保存模型目录缓存失败: {str(e)}")
+
+    @classmethod
+    def get_cached(cls, key):
+        """获取缓存的模型列表
+
+        Returns:
+            (模型名称列表或None, 缓存是否仍在有效期内)
+        """
+        with cls._lock:
+            entry = cls._load().get(key)
+        if not entry:
+            return None, False
+        fresh = time.time() - entry.get('fetched_at', 0) < cls.TTL_SECONDS
+        return list(entry.get('models', [])), fresh
+
+    @classmethod
+    def invalidate(cls, key):
+        """使缓存过期，下次刷新时强制请求"""
+        with cls._lock:
+            entry = cls._load().get(key)
+            if entry:
+                entry['fetched_at'] = 0
+
+    @classmethod
+    def _store(cls, key, models, fingerprint=None, etag=None):
+        """写入刷新结果，返回模型列表是否发生变化"""
+        with cls._lock:
+            entries = cls._load()
+            old = entries.get(key)
+            changed = old is None or old.get('fingerprint') != fingerprint
+            entries[key] = {
+                'models': models,
+                'fingerprint': fingerprint,
+                'etag': etag,
+                'fetched_at': time.time(),
+            }
+            # 只有内容变化时才写盘，获取时间保存在内存中即可
+            if changed:
+                cls._save()
+            return changed
+
+    @staticmethod
+    def _fingerprint(items):
+        return hashlib.sha1(json.dumps(items, ensure_ascii=False, sort_keys=True).encode('utf-8')).hexdigest()
+
+    @classmethod
+    def refresh_local(cls, handler):
+        """从Ollama刷新本地模型列表（在后台线程调用）
+
+        Returns:
+            {"models": [名称], "changed": bool} 或 {"error": ...}
+        """
+        result = handler.list_local_models()
+        if 'error' in result:
+            return {"error": result['error']}
+        models = result.get('models', [])
+        names = [m['name'] for m in models]
+        # 名称和digest都相同说明模型没有变化（重新拉取同名模型时digest会变）
+        fingerprint = cls._fingerprint([[m['name'], m.get('digest')] for m in models])
+        changed = cls._store(cls.local_key(), names, fingerprint)
+        return {"models": names, "changed": changed}
+
+    @classmethod
+    def refresh_remote(cls, handler, api_url=None):
+        """从远程API刷新模型列表，带上次的ETag做条件请求
+
+        Returns:
+            {"models": [名称], "changed": bool} 或 {"error": ...}
+        """
+        key = cls.remote_key(api_url)
+        with cls._lock:
+            entry = dict(cls._load().get(key) or {})
+
+        result = handler.list_remote_models(etag=entry.get('etag'))
+        if 'error' in result:
+            return {"error": result['error']}
+        if result.get('not_modified') and entry:
+            # 服务器确认未变化，只延长有效期
+            with cls._lock:
+                cls._load()[key]['fetched_at'] = time.time()
+            return {"models": list(entry.get('models', [])), "changed": False}
+
+        names = result.get('models') or []
+        changed = cls._store(key, names, cls._fingerprint(names), result.get('etag'))
+        return {"models": names, "changed": changed}
@@ -0,0 +1,386 @@
+"""
+模型下载管理模块
+排队并发拉取Ollama模型，汇总各层的字节数计算整体进度、速度和剩余时间。
+下载在后台线程中进行，不依赖安装对话框；未完成的下载会记录到磁盘，
+程序重启或网络中断后可以继续（Ollama会复用已下载的部分）。
+
+本模块不依赖PyQt5，界面通过 ui.services.download_signals 定时采样进度并接收通知。
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from core.config import OLLAMA_API_URL
+from core.config_store import atomic_write_text
+from core.logging import Logger
+from core.paths import app_data_dir
+from core.progress import ProgressTracker
+
+
+class ModelPullJob:
+    """单个模型的拉取任务，进度计数器由下载线程更新、界面线程采样"""
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    RETRYING = 'retrying'
+    DONE = 'done'
+    FAILED = 'failed'
+    CANCELLED = 'cancelled'
+
+    # 计算下载速度时使用的滚动窗口长度（秒）
+    RATE_WINDOW_SECONDS = 10.0
+
+    def __init__(self, model_name):
+        self.model_name = model_name
+        self.state = self.QUEUED
+        self.message = '等待下载...'
+        self.attempt = 0
+        self.cancelled = False
+        # 失败后是否值得在重启时重试（服务端明确拒绝的请求，例如模型不存在，不再重试）
+        self.retryable = True
+        self._lock = threading.Lock()
+        self._layers = {}      # digest -> [已完成字节, 总字节]
+        self._percent = 0      # 已显示的最大进度，避免新层出现时进度回退
+        self._samples = deque()  # (时间, 已完成字节)
+
+    def update_layer(self, digest, completed, total):
+        with self._lock:
+            layer = self._layers.setdefault(digest, [0, 0])
+            if total:
+                layer[1] = total
+            if completed is not None:
+                layer[0] = completed
+
+    def set_state(self, state, message=None):
+        with self._lock:
+            self.state = state
+            if message is not None:
+                self.message = message
+            if state in (self.RETRYING, self.QUEUED):
+                # 重新连接后服务端会重新汇报各层进度，旧的速度采样不再有意义
+                self._samples.clear()
+
+    def set_message(self, message):
+        with self._lock:
+            self.message = message
+
+    @property
+    def finished(self):
+        return self.state in (self.DONE, self.FAILED, self.CANCELLED)
+
+    def snapshot(self):
+        """采样当前进度，返回包含字节数、进度、速度和剩余时间的字典"""
+        now = time.monotonic()
+        with self._lock:
+            completed = sum(min(c, t) if t else c for c, t in self._layers.values())
+            total = sum(t for _, t in self._layers.values())
+            if self.state == self.DONE:
+                self._percent = 100
+            elif total:
+                self._percent = max(self._percent, int(completed * 100 / total))
+            self._samples.append((now, completed))
+            while len(self._samples) > 1 and now - self._samples[0][0] > self.RATE_WINDOW_SECONDS:
+                self._samples.popleft()
+            base_time, base_completed = self._samples[0]
+            state, message, percent = self.state, self.message, self._percent
+
+        span = now - base_time
+        rate = max(completed - base_completed, 0) / span if span > 0.5 else 0.0
+        eta = None
+        if state == self.DONE:
+            eta = 0.0
+        elif rate > 0 and total > completed:
+            eta = (total - completed) / rate
+        return {
+            'model': self.model_name,
+            'state': state,
+            'message': message,
+            'completed': completed,
+            'total': total,
+            'percent': percent,
+            'bytes_per_sec': rate,
+            'eta': eta,
+        }
+
+
+class ModelPullWorker:
+    """在线程池中拉取一个模型，网络中断时按退避间隔重试"""
+
+    # 连接类错误的最大重试次数和首次重试等待时间（秒）
+    MAX_RETRIES = 3
+    RETRY_DELAY = 2.0
+
+    def __init__(self, job, on_finished):
+        self.job = job
+        self.on_finished = on_finished
+
+    def run(self):
+        job = self.job
+        try:
+            success, message = self._pull_with_retry()
+        except Exception as e:
+            success, message = False, f"安装过程出错: {str(e)}"
+        if job.cancelled:
+            success, message = False, "安装已取消"
+        job.set_state(job.DONE if success else (job.CANCELLED if job.cancelled else job.FAILED), message)
+        self.on_finished(job.model_name, success, message)
+
+    def _pull_with_retry(self):
+        from ollama import Client, ResponseError
+        client = Client(host=OLLAMA_API_URL)
+        job = self.job
+        delay = self.RETRY_DELAY
+        while True:
+            job.attempt += 1
+            job.set_state(job.RUNNING, "正在连接Ollama服务...")
+            try:
+                for progress_data in client.pull(job.model_name, stream=True):
+                    if job.cancelled:
+                        return False, "安装已取消"
+                    digest = progress_data.get('digest') or ''
+                    status = progress_data.get('status') or ''
+                    if digest:
+                        job.update_layer(digest, progress_data.get('completed'), progress_data.get('total'))
+                    if status:
+                        job.set_message(status)
+                return True, "模型安装成功"
+            except ResponseError as e:
+                # 服务端明确拒绝（例如模型不存在），重试没有意义
+                job.retryable = False
+                return False, f"安装过程出错: {e.error}"
+            except Exception as e:
+                if job.cancelled:
+                    return False, "安装已取消"
+                if job.attempt > self.MAX_RETRIES:
+                    return False, f"安装过程出错（已重试{self.MAX_RETRIES}次）: {str(e)}"
+                Logger.warning(f"拉取模型 {job.model_name} 中断，{delay:.0f}秒后重试: {str(e)}")
+                job.set_state(job.RETRYING, f"连接中断，{delay:.0f}秒后继续下载...")
+                if not self._sleep(delay):
+                    return False, "安装已取消"
+                delay *= 2
+
+    def _sleep(self, seconds):
+        """分段等待以便及时响应取消，被取消时返回False"""
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            if self.job.cancelled:
+                return False
+            time.sleep(0.1)
+        return True
+
+
+class ModelDownloadManager:
+    """模型下载队列
+
+    - enqueue() 把模型加入队列，最多同时拉取 MAX_CONCURRENT_PULLS 个
+    - 下载线程只更新任务计数器，界面按固定频率通过 snapshot() 采样进度，
+      关闭对话框不会影响下载
+    - 排队和进行中的模型记录在 PENDING_FILE 中，resume_pending() 可在重启后继续
+
+    任务列表变化和任务结束通过 add_listener() 注册的回调通知（可能在下载线程中调用）：
+    - JOBS_CHANGED: 无参数
+    - JOB_FINISHED: 模型名称、是否成功、描述
+    """
+
+    JOBS_CHANGED = 'jobs_changed'
+    JOB_FINISHED = 'job_finished'
+
+    MAX_CONCURRENT_PULLS = 2
+
+    PENDING_FILE = app_data_dir("pending_pulls.json")
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def instance(cls):
+        """获取全局下载管理器"""
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+        return cls._instance
+
+    @classmethod
+    def shutdown(cls):
+        """程序退出时停止下载，未完成的模型保留在待续列表中"""
+        if cls._instance is not None:
+            cls._instance.stop_all()
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._jobs = {}  # 模型名称 -> ModelPullJob，按加入顺序排列
+        self._futures = {}  # 模型名称 -> 线程池中的任务
+        self._listeners = []
+        self._shutting_down = False
+        self._pool = ThreadPoolExecutor(max_workers=self.MAX_CONCURRENT_PULLS, thread_name_prefix='model-pull')
+
+    def add_listener(self, callback):
+        """注册回调 callback(事件, *参数)"""
+        with self._lock:
+            if callback not in self._listeners:
+                self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def _notify(self, event, *args):
+        with self._lock:
+            listeners = list(self._listeners)
+        for callback in listeners:
+            try:
+                callback(event, *args)
+            except Exception as e:
+                Logger.error(f"模型下载回调出错: {str(e)}")
+
+    def jobs(self):
+        """所有任务（包括已结束的），按加入顺序"""
+        with self._lock:
+            return list(self._jobs.values())
+
+    def snapshot(self):
+        """采样所有任务的进度"""
+        return [job.snapshot() for job in self.jobs()]
+
+    @property
+    def active(self):
+        """是否还有排队或进行中的任务"""
+        return any(not job.finished for job in self.jobs())
+
+    def enqueue(self, model_name):
+        """加入下载队列，模型已在下载中时直接返回现有任务"""
+        model_name = model_name.strip()
+        with self._lock:
+            if self._shutting_down:
+                return None
+            job = self._jobs.get(model_name)
+            if job is not None and not job.finished:
+                return job
+            job = ModelPullJob(model_name)
+            # 重新加入的模型移到队尾
+            self._jobs.pop(model_name, None)
+            self._jobs[model_name] = job
+
+            worker = ModelPullWorker(job, self._on_worker_finished)
+            self._futures[model_name] = self._pool.submit(worker.run)
+            self._save_pending()
+        self._notify(self.JOBS_CHANGED)
+        Logger.info(f"模型 {model_name} 已加入下载队列")
+        return job
+
+    def cancel(self, model_name):
+        """取消下载，并从待续列表中移除（已结束的任务只从待续列表中移除）"""
+        with self._lock:
+            job = self._jobs.get(model_name)
+            if job is None:
+                return
+            not_started = False
+            if not job.finished:
+                future = self._futures.get(model_name)
+                # 尚未开始的任务直接从线程池队列中移除
+                not_started = future is not None and future.cancel()
+                if not_started:
+                    self._futures.pop(model_name, None)
+                    job.set_state(job.CANCELLED, "安装已取消")
+            job.cancelled = True
+            self._save_pending()
+        if not_started:
+            self._notify(self.JOB_FINISHED, model_name, False, "安装已取消")
+        self._notify(self.JOBS_CHANGED)
+
+    def clear_finished(self):
+        """移除已结束的任务，失败的下载也不再保留在待续列表中"""
+        with self._lock:
+            self._jobs = {name: job for name, job in self._jobs.items() if not job.finished}
+            self._save_pending()
+        self._notify(self.JOBS_CHANGED)
+
+    def pending_models(self):
+        """读取上次未完成的下载"""
+        try:
+            if os.path.exists(self.PENDING_FILE):
+                with open(self.PENDING_FILE, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if isinstance(data, list):
+                    return [name for name in data if isinstance(name, str) and name]
+        except Exception as e:
+            Logger.warning(f"读取待续下载列表失败: {str(e)}")
+        return []
+
+    def resume_pending(self):
+        """继续上次未完成的下载，返回重新加入队列的模型"""
+        resumed = []
+        for name in self.pending_models():
+            with self._lock:
+                job = self._jobs.get(name)
+            if job is None or job.finished:
+                self.enqueue(name)
+                resumed.append(name)
+        return resumed
+
+    def stop_all(self):
+        """停止所有下载但保留待续列表，下次启动时可继续"""
+        with self._lock:
+            self._shutting_down = True
+            for job in self._jobs.values():
+                job.cancelled = True
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _on_worker_finished(self, model_name, success, message):
+        # 在下载线程中调用
+        with self._lock:
+            self._futures.pop(model_name, None)
+            if self._shutting_down:
+                return
+            self._save_pending()
+        if success:
+            Logger.info(f"模型 {model_name} 下载完成")
+        else:
+            Logger.warning(f"模型 {model_name} 下载未完成: {message}")
+        self._notify(self.JOBS_CHANGED)
+        self._notify(self.JOB_FINISHED, model_name, success, message)
+
+    def _save_pending(self):
+        """记录排队和进行中的模型（可重试的失败下载也保留，便于重启后重试；调用方需持有锁）"""
+        if self._shutting_down:
+            return
+        pending = [name for name, job in self._jobs.items()
+                   if not job.cancelled and (not job.finished or (job.state == job.FAILED and job.retryable))]
+        try:
+            os.makedirs(os.path.dirname(self.PENDING_FILE), exist_ok=True)
+            atomic_write_text(self.PENDING_FILE, json.dumps(pending, ensure_ascii=False, indent=2))
+        except Exception as e:
+            Logger.warning(f"保存待续下载列表失败: {str(e)}")
+
+    @staticmethod
+    def format_size(num_bytes):
+        """将字节数格式化为 KB / MB / GB"""
+        size = float(num_bytes)
+        for unit in ('B', 'KB', 'MB', 'GB'):
+            if size < 1024 or unit == 'GB':
+                return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+            size /= 1024
+
+    @classmethod
+    def describe(cls, snapshot):
+        """把任务快照格式化为一行状态描述"""
+        state = snapshot['state']
+        if state == ModelPullJob.DONE:
+            return f"{snapshot['model']} — 已完成"
+        if state in (ModelPullJob.FAILED, ModelPullJob.CANCELLED):
+            return f"{snapshot['model']} — {snapshot['message']}"
+        if state == ModelPullJob.QUEUED:
+            return f"{snapshot['model']} — 等待下载"
+        parts = [f"{snapshot['model']} — {snapshot['percent']}%"]
+        if snapshot['total']:
+            parts.append(f"{cls.format_size(snapshot['completed'])} / {cls.format_size(snapshot['total'])}")
+        if snapshot['bytes_per_sec'] > 0:
+            parts.append(f"{cls.format_size(snapshot['bytes_per_sec'])}/s")
+            parts.append(f"剩余 {ProgressTracker.format_duration(snapshot['eta'])}")
+        parts.append(snapshot['message'])
+        return '  '.join(parts)
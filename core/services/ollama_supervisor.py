@@ -0,0 +1,219 @@
+"""
+Ollama服务监管模块
+在后台线程中探测和启动Ollama服务，通过回调通知状态，不阻塞GUI线程
+
+本模块不依赖PyQt5，界面通过 ui.services.ollama_signals 把回调转换为Qt信号。
+"""
+
+import json
+import platform
+import shutil
+import subprocess
+import threading
+import time
+import urllib.request
+
+from core.config import OLLAMA_API_URL
+from core.logging import Logger
+
+
+class OllamaSupervisor:
+    """Ollama服务监管器
+
+    - start(): 先探测 /api/tags，服务未运行时以子进程方式启动 ``ollama serve``，
+      再按退避间隔轮询直到服务就绪或超时
+    - stop(): 只停止由本程序启动的服务进程，不影响用户自己运行的Ollama
+
+    状态通过 add_listener() 注册的回调通知，回调在后台线程中以 (事件, *参数) 调用：
+    - STATUS_CHANGED: 状态描述
+    - READY: 已安装的模型数量
+    - FAILED: 原因代码（'not_installed' / 'timeout' / 'start_error'）和描述
+    """
+
+    STATUS_CHANGED = 'status_changed'
+    READY = 'ready'
+    FAILED = 'failed'
+
+    PROBE_URL = f"{OLLAMA_API_URL}/api/tags"
+    PROBE_TIMEOUT = 2.0
+    # 轮询退避：首次间隔、最大间隔（秒）和启动超时（秒）
+    INITIAL_POLL_INTERVAL = 0.25
+    MAX_POLL_INTERVAL = 2.0
+    START_TIMEOUT = 30.0
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def instance(cls):
+        """获取全局监管器实例"""
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+        return cls._instance
+
+    @classmethod
+    def shutdown(cls):
+        """程序退出时调用：停止由本程序启动的服务（没有创建过监管器时什么都不做）
+
+        Returns:
+            是否停止了服务进程
+        """
+        if cls._instance is None:
+            return False
+        return cls._instance.stop()
+
+    def __init__(self):
+        self._process = None  # 由本程序启动的 ollama serve 进程
+        self._lock = threading.Lock()
+        self._starting = False
+        self._listeners = []
+
+    def add_listener(self, callback):
+        """注册状态回调 callback(事件, *参数)"""
+        with self._lock:
+            if callback not in self._listeners:
+                self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def _notify(self, event, *args):
+        with self._lock:
+            listeners = list(self._listeners)
+        for callback in listeners:
+            try:
+                callback(event, *args)
+            except Exception as e:
+                Logger.error(f"Ollama服务状态回调出错: {str(e)}")
+
+    @classmethod
+    def probe(cls, timeout=None):
+        """探测服务是否可用，返回已安装的模型数量，服务不可用时返回None"""
+        try:
+            with urllib.request.urlopen(cls.PROBE_URL, timeout=timeout or cls.PROBE_TIMEOUT) as response:
+                if response.status != 200:
+                    return None
+                return len(json.loads(response.read().decode('utf-8')).get('models', []))
+        except Exception:
+            return None
+
+    @property
+    def owns_process(self):
+        """服务是否由本程序启动且仍在运行"""
+        return self._process is not None and self._process.poll() is None
+
+    @property
+    def is_starting(self):
+        return self._starting
+
+    def start(self):
+        """在后台线程中确保服务运行，结果通过 READY / FAILED 事件通知"""
+        with self._lock:
+            if self._starting:
+                return
+            self._starting = True
+        threading.Thread(target=self._ensure_running, name='ollama-supervisor', daemon=True).start()
+
+    def _ensure_running(self):
+        try:
+            self._notify(self.STATUS_CHANGED, "正在检查Ollama服务状态...")
+            model_count = self.probe()
+            if model_count is not None:
+                Logger.info("Ollama服务已在运行")
+                self._notify(self.READY, model_count)
+                return
+
+            if not self.owns_process:
+                error = self._spawn_server()
+                if error:
+                    return
+
+            self._notify(self.STATUS_CHANGED, "Ollama服务启动中，正在等待服务就绪...")
+            model_count = self._wait_until_ready()
+            if model_count is not None:
+                Logger.info("Ollama服务已就绪")
+                self._notify(self.READY, model_count)
+            elif self._process is not None and self._process.poll() is not None:
+                self._notify(self.FAILED, 'start_error', f"Ollama服务进程已退出，退出码: {self._process.returncode}")
+            else:
+                self._notify(self.FAILED, 'timeout', f"等待Ollama服务就绪超时（{int(self.START_TIMEOUT)}秒）")
+        except Exception as e:
+            Logger.error(f"启动Ollama服务出错: {str(e)}")
+            self._notify(self.FAILED, 'start_error', f"启动Ollama服务出错: {str(e)}")
+        finally:
+            self._starting = False
+
+    def _spawn_server(self):
+        """启动 ollama serve 子进程，失败时通知FAILED并返回错误描述"""
+        executable = shutil.which('ollama')
+        system = platform.system().lower()
+
+        if executable is None:
+            if system == "darwin":
+                # macOS上可能只安装了Ollama应用，由应用自行启动服务（不属于本程序）
+                try:
+                    subprocess.Popen(["open", "-a", "Ollama"])
+                    self._notify(self.STATUS_CHANGED, "已启动Ollama应用，正在等待服务初始化...")
+                    return None
+                except Exception:
+                    pass
+            message = "未检测到Ollama安装，请先安装Ollama。"
+            self._notify(self.FAILED, 'not_installed', message)
+            return message
+
+        self._notify(self.STATUS_CHANGED, "Ollama服务未运行，正在启动...")
+        kwargs = {
+            'stdin': subprocess.DEVNULL,
+            'stdout': subprocess.DEVNULL,
+            'stderr': subprocess.DEVNULL,
+        }
+        if system == "windows":
+            # 不经过shell直接启动，隐藏控制台窗口，保证持有的是ollama进程本身
+            kwargs['creationflags'] = subprocess.CREATE_NO_WINDOW
+        try:
+            self._process = subprocess.Popen([executable, "serve"], **kwargs)
+            Logger.info(f"已启动Ollama服务进程，PID: {self._process.pid}")
+            return None
+        except Exception as e:
+            message = f"启动Ollama服务出错: {str(e)}"
+            Logger.error(message)
+            self._notify(self.FAILED, 'start_error', message)
+            return message
+
+    def _wait_until_ready(self):
+        """按退避间隔轮询服务，就绪时返回模型数量，超时或进程退出时返回None"""
+        deadline = time.monotonic() + self.START_TIMEOUT
+        interval = self.INITIAL_POLL_INTERVAL
+        while time.monotonic() < deadline:
+            if self._process is not None and self._process.poll() is not None:
+                return None
+            time.sleep(interval)
+            model_count = self.probe(timeout=min(self.PROBE_TIMEOUT, interval * 2))
+            if model_count is not None:
+                return model_count
+            interval = min(interval * 2, self.MAX_POLL_INTERVAL)
+        return None
+
+    def stop(self, timeout=5):
+        """停止由本程序启动的服务进程"""
+        process = self._process
+        if process is None or process.poll() is not None:
+            self._process = None
+            return False
+        Logger.info(f"正在停止由本程序启动的Ollama服务，PID: {process.pid}")
+        try:
+            process.terminate()
+            try:
+                process.wait(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait(timeout=timeout)
+        except Exception as e:
+            Logger.error(f"停止Ollama服务时出错: {str(e)}")
+            return False
+        self._process = None
+        return True
+
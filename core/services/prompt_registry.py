@@ -0,0 +1,142 @@
+"""
+系统提示词注册表模块
+统一管理内置和用户系统提示词，缓存文件内容
+
+目录监听和变化通知由界面层的 ui.services.prompt_watcher 负责，本模块不依赖PyQt5。
+"""
+
+import os
+import tempfile
+import threading
+
+from core.logging import Logger
+
+
+class SystemPromptRegistry:
+    """系统提示词注册表
+
+    提示词列表只在启动、点击刷新或目录发生变化时扫描一次，
+    文件内容按修改时间缓存，同一个提示词在一次任务中不会被重复读取。
+    用户目录中的提示词优先于同名的内置提示词。
+    """
+
+    # 支持的提示词文件扩展名
+    PROMPT_EXTENSIONS = ('.txt', '.md')
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def instance(cls):
+        """获取全局注册表实例"""
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+        return cls._instance
+
+    def __init__(self):
+        self._prompts = {}   # 提示词名称 -> (文件路径, 来源)
+        self._contents = {}  # 文件路径 -> (修改时间, 内容)
+
+        self.ensure_user_dir()
+        self.refresh()
+
+    @staticmethod
+    def get_built_in_dir():
+        """获取内置系统提示词目录的路径"""
+        return os.path.join(os.getcwd(), 'system_prompts')
+
+    @staticmethod
+    def get_user_dir():
+        """获取用户系统提示词目录的路径"""
+        try:
+            # 首先尝试使用APPDATA环境变量(Windows)
+            if 'APPDATA' in os.environ:
+                return os.path.join(os.environ['APPDATA'], 'Memoride', 'system_prompts')
+            # 其次尝试使用用户主目录
+            elif 'HOME' in os.environ:
+                return os.path.join(os.environ['HOME'], '.memoride', 'system_prompts')
+            # 最后使用临时目录
+            else:
+                return os.path.join(tempfile.gettempdir(), 'memoride_system_prompts')
+        except Exception as e:
+            print(f"获取用户提示词目录时出错: {str(e)}")
+            return os.path.join(os.getcwd(), 'user_system_prompts')
+
+    def ensure_user_dir(self):
+        """确保用户提示词目录存在，返回目录路径，创建失败时返回None"""
+        user_dir = self.get_user_dir()
+        if not os.path.exists(user_dir):
+            try:
+                os.makedirs(user_dir)
+                Logger.info(f"已创建用户系统提示词文件夹: {user_dir}")
+            except Exception as e:
+                Logger.error(f"创建用户系统提示词文件夹失败: {str(e)}")
+                return None
+        return user_dir
+
+    def refresh(self):
+        """重新扫描提示词目录"""
+        prompts = {}
+        # 先内置后用户，用户提示词覆盖同名的内置提示词
+        for directory, source in ((self.get_built_in_dir(), "内置"), (self.get_user_dir(), "用户")):
+            if not os.path.isdir(directory):
+                continue
+            try:
+                for file in os.listdir(directory):
+                    name, ext = os.path.splitext(file)
+                    if ext in self.PROMPT_EXTENSIONS:
+                        prompts[name] = (os.path.join(directory, file), source)
+            except Exception as e:
+                Logger.error(f"读取{source}提示词目录出错: {str(e)}")
+
+        self._prompts = prompts
+        # 丢弃已删除文件的缓存
+        paths = {path for path, _ in prompts.values()}
+        self._contents = {path: entry for path, entry in self._contents.items() if path in paths}
+
+        Logger.info(f"已加载 {len(prompts)} 个系统提示词模板")
+
+    def names(self):
+        """返回按名称排序的提示词列表"""
+        return sorted(self._prompts)
+
+    def get_prompt(self, name):
+        """获取提示词内容，不存在或读取失败时返回None"""
+        entry = self._prompts.get(name)
+        if entry is None:
+            Logger.warning(f"系统提示词文件不存在: {name}")
+            return None
+
+        path = entry[0]
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            Logger.warning(f"系统提示词文件不存在: {name}")
+            return None
+
+        cached = self._contents.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                content = f.read().strip()
+        except Exception as e:
+            Logger.error(f"读取系统提示词文件失败: {str(e)}")
+            return None
+
+        self._contents[path] = (mtime, content)
+        return content
+
+    def watched_paths(self):
+        """需要监听的路径：两个提示词目录和当前的全部提示词文件"""
+        paths = {path for path, _ in self._prompts.values()}
+        for directory in (self.get_built_in_dir(), self.get_user_dir()):
+            if os.path.isdir(directory):
+                paths.add(directory)
+        return paths
+
+    def invalidate(self, path):
+        """提示词文件被修改：丢弃缓存，下次使用时重新读取"""
+        self._contents.pop(path, None)
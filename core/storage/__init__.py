@@ -0,0 +1,18 @@
+"""
+存储模块
+保存生成的学习卡片等需要跨任务查询的数据
+"""
+
+from core import _load_lazy_export
+
+_LAZY_EXPORTS = {
+    'CardStore': 'core.storage.card_store',
+    'ChatStore': 'core.storage.chat_store',
+    'EmbeddingIndex': 'core.storage.embedding_index',
+}
+
+__all__ = ['CardStore', 'ChatStore', 'EmbeddingIndex']
+
+
+def __getattr__(name):
+    return _load_lazy_export(globals(), _LAZY_EXPORTS, name)
@@ -0,0 +1,541 @@
+"""
+学习卡片库模块
+把所有生成的卡片集中保存在一个SQLite数据库中，并建立FTS5全文索引：
+
+- 每张卡片记录来源文件、片段哈希、模型和生成时间
+- 新卡片按批次在单个事务中写入；写事务都以 BEGIN IMMEDIATE 开始，先取得写锁再读取，
+  多个线程同时写入时按超时等待，而不是在读锁升级为写锁时立即报 database is locked
+- 可以增量导入 output_cards 目录中已有的CSV（只处理新增或修改过的文件）
+- 全文检索优先使用 trigram 分词（中文无需分词即可按子串检索），不可用时退回 unicode61
+- 卡片和原文片段另外按检索词（中文相邻两字）建立 passages_fts 索引，按BM25排序供对话检索使用
+"""
+
+import csv
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+from core.export.csv_sink import CsvCardSink
+from core.paths import app_data_dir
+from core.tokens import index_terms
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cards (
+    id INTEGER PRIMARY KEY,
+    question TEXT NOT NULL,
+    answer TEXT NOT NULL,
+    source_file TEXT NOT NULL DEFAULT '',
+    section_hash TEXT NOT NULL DEFAULT '',
+    model TEXT NOT NULL DEFAULT '',
+    created_at REAL NOT NULL,
+    csv_path TEXT NOT NULL DEFAULT '',
+    card_hash TEXT NOT NULL,
+    UNIQUE (csv_path, card_hash)
+);
+CREATE INDEX IF NOT EXISTS ix_cards_card_hash ON cards (card_hash);
+CREATE INDEX IF NOT EXISTS ix_cards_source_file ON cards (source_file);
+CREATE TABLE IF NOT EXISTS ingested_files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    cards INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS source_chunks (
+    id INTEGER PRIMARY KEY,
+    section_hash TEXT NOT NULL,
+    chunk_index INTEGER NOT NULL,
+    source_file TEXT NOT NULL DEFAULT '',
+    content TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    UNIQUE (section_hash, chunk_index)
+);
+CREATE TABLE IF NOT EXISTS card_signatures (
+    card_hash TEXT NOT NULL,
+    scheme TEXT NOT NULL,
+    signature BLOB NOT NULL,
+    PRIMARY KEY (card_hash, scheme)
+);
+"""
+
+# 全文索引与cards表通过触发器保持同步（外部内容表，不重复保存文本）
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE cards_fts USING fts5(
+    question, answer, content='cards', content_rowid='id', tokenize='{tokenizer}'
+);
+CREATE TRIGGER cards_ai AFTER INSERT ON cards BEGIN
+    INSERT INTO cards_fts (rowid, question, answer) VALUES (new.id, new.question, new.answer);
+END;
+CREATE TRIGGER cards_ad AFTER DELETE ON cards BEGIN
+    INSERT INTO cards_fts (cards_fts, rowid, question, answer) VALUES ('delete', old.id, old.question, old.answer);
+END;
+CREATE TRIGGER cards_au AFTER UPDATE ON cards BEGIN
+    INSERT INTO cards_fts (cards_fts, rowid, question, answer) VALUES ('delete', old.id, old.question, old.answer);
+    INSERT INTO cards_fts (rowid, question, answer) VALUES (new.id, new.question, new.answer);
+END;
+"""
+
+# 卡片和原文片段共用的检索词索引：rowid为 卡片id*2 或 片段id*2+1，检索词由 passage_terms() 生成
+_PASSAGE_SCHEMA = """
+CREATE VIRTUAL TABLE passages_fts USING fts5(terms, tokenize='unicode61 remove_diacritics 0');
+CREATE TRIGGER cards_passage_ad AFTER DELETE ON cards BEGIN
+    DELETE FROM passages_fts WHERE rowid = old.id * 2;
+END;
+INSERT INTO passages_fts (rowid, terms) SELECT id * 2, passage_terms(question || ' ' || answer) FROM cards;
+INSERT INTO passages_fts (rowid, terms) SELECT id * 2 + 1, passage_terms(content) FROM source_chunks;
+"""
+
+_RESULT_COLUMNS = ('id', 'question', 'answer', 'source_file', 'model', 'created_at', 'csv_path')
+
+
+class CardStore:
+    """集中保存学习卡片的SQLite数据库（每个线程使用自己的连接）"""
+
+    DEFAULT_PATH = app_data_dir("cards.db")
+    # 每批写入的卡片数量
+    BATCH_SIZE = 5000
+    # 输出文件名格式：输入文件名-模型名-学习卡片.csv
+    CSV_SUFFIX = '-学习卡片'
+
+    _default = None
+    _default_lock = threading.Lock()
+    # 每个卡片库（按路径）在本进程中删除卡片的次数。cards.id 没有AUTOINCREMENT，
+    # 删除后新卡片可能重用旧id，按id增量处理新卡片的调用方据此判断是否需要全部重新检查
+    _deletions = {}
+
+    @classmethod
+    def default(cls):
+        """获取默认位置的卡片库"""
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls(cls.DEFAULT_PATH)
+            return cls._default
+
+    def __init__(self, path):
+        self.path = path
+        self.tokenizer = None
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            # WAL模式下界面检索不会被后台写入阻塞
+            conn.execute('PRAGMA journal_mode = WAL')
+            conn.execute('PRAGMA synchronous = NORMAL')
+            conn.create_function('passage_terms', 1, self.passage_terms, deterministic=True)
+            self._ensure_schema(conn)
+            self._local.conn = conn
+        return conn
+
+    def _ensure_schema(self, conn):
+        with self._schema_lock:
+            if self._schema_ready:
+                return
+            conn.executescript(_SCHEMA)
+            row = conn.execute("SELECT sql FROM sqlite_master WHERE name = 'cards_fts'").fetchone()
+            if row is None:
+                for tokenizer in ('trigram', 'unicode61'):
+                    try:
+                        conn.executescript('BEGIN;' + _FTS_SCHEMA.format(tokenizer=tokenizer) + 'COMMIT;')
+                        self.tokenizer = tokenizer
+                        break
+                    except sqlite3.OperationalError:
+                        if conn.in_transaction:
+                            conn.execute('ROLLBACK')
+                else:
+                    raise sqlite3.OperationalError("当前SQLite不支持FTS5全文索引")
+                # 数据库中已有卡片时（例如旧版本创建）重建索引
+                conn.execute("INSERT INTO cards_fts (cards_fts) VALUES ('rebuild')")
+            else:
+                self.tokenizer = 'trigram' if 'trigram' in row[0] else 'unicode61'
+            if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'passages_fts'").fetchone() is None:
+                # 首次创建时为已有的卡片和片段建立索引
+                conn.executescript('BEGIN;' + _PASSAGE_SCHEMA + 'COMMIT;')
+            self._schema_ready = True
+
+    def close(self):
+        """关闭当前线程的连接"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    @staticmethod
+    def card_hash(question, answer):
+        """问答内容的哈希（忽略首尾空白）"""
+        return hashlib.sha1(f"{question.strip()}\x1f{answer.strip()}".encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def section_hash(text):
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def passage_terms(text):
+        """passages_fts 中保存的检索词（空格分隔）"""
+        return ' '.join(index_terms(text or ''))
+
+    def _insert_rows(self, conn, rows):
+        """分批插入 (问题, 答案, 来源, 片段哈希, 模型, 时间, CSV路径, 卡片哈希)，调用方负责事务"""
+        inserted = 0
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.BATCH_SIZE:
+                inserted += self._insert_batch(conn, batch)
+                batch = []
+        if batch:
+            inserted += self._insert_batch(conn, batch)
+        return inserted
+
+    @staticmethod
+    def _insert_batch(conn, batch):
+        last_id = conn.execute('SELECT COALESCE(MAX(id), 0) FROM cards').fetchone()[0]
+        cursor = conn.executemany(
+            'INSERT OR IGNORE INTO cards (question, answer, source_file, section_hash, model, created_at, csv_path, card_hash) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            batch,
+        )
+        # rowcount不包含触发器写入的全文索引行，被忽略的重复卡片也不计入
+        inserted = cursor.rowcount
+        if inserted:
+            # 新卡片的id都大于插入前的最大id
+            conn.execute(
+                "INSERT INTO passages_fts (rowid, terms) "
+                "SELECT id * 2, passage_terms(question || ' ' || answer) FROM cards WHERE id > ?",
+                (last_id,),
+            )
+        return inserted
+
+    def add_cards(self, cards, source_file='', model='', section_hash='', csv_path=''):
+        """在一个事务中写入一批卡片
+
+        Args:
+            cards: 可迭代的 (问题, 答案)
+            source_file / model / section_hash / csv_path: 这批卡片共同的来源信息
+
+        Returns:
+            实际新增的卡片数量（同一CSV中完全相同的卡片只保存一次）
+        """
+        now = time.time()
+        csv_path = os.path.abspath(csv_path) if csv_path else ''
+        rows = ((q, a, source_file, section_hash, model, now, csv_path, self.card_hash(q, a))
+                for q, a in cards if q and q.strip())
+        conn = self._connection()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            return self._insert_rows(conn, rows)
+
+    def add_source_chunks(self, section_hash, chunks, source_file=''):
+        """保存原文片段的分块供对话检索，同一片段只保存一次
+
+        Returns:
+            新增的分块数量
+        """
+        now = time.time()
+        conn = self._connection()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            if conn.execute('SELECT 1 FROM source_chunks WHERE section_hash = ? LIMIT 1', (section_hash,)).fetchone():
+                return 0
+            last_id = conn.execute('SELECT COALESCE(MAX(id), 0) FROM source_chunks').fetchone()[0]
+            cursor = conn.executemany(
+                'INSERT INTO source_chunks (section_hash, chunk_index, source_file, content, created_at) VALUES (?, ?, ?, ?, ?)',
+                ((section_hash, i, source_file, chunk, now) for i, chunk in enumerate(chunks)),
+            )
+            conn.execute(
+                'INSERT INTO passages_fts (rowid, terms) '
+                'SELECT id * 2 + 1, passage_terms(content) FROM source_chunks WHERE id > ?',
+                (last_id,),
+            )
+            return cursor.rowcount
+
+    def remove_csv(self, csv_path):
+        """删除来自某个CSV文件的卡片（文件将被重新生成时调用）"""
+        csv_path = os.path.abspath(csv_path)
+        conn = self._connection()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.execute('DELETE FROM cards WHERE csv_path = ?', (csv_path,))
+            conn.execute('DELETE FROM ingested_files WHERE path = ?', (csv_path,))
+        self._count_deletion()
+
+    def mark_ingested(self, csv_path):
+        """记录CSV文件的当前状态，之后增量导入时跳过（卡片已在生成时写入）"""
+        csv_path = os.path.abspath(csv_path)
+        stat = os.stat(csv_path)
+        conn = self._connection()
+        count = conn.execute('SELECT COUNT(*) FROM cards WHERE csv_path = ?', (csv_path,)).fetchone()[0]
+        with conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO ingested_files (path, size, mtime, cards) VALUES (?, ?, ?, ?)',
+                (csv_path, stat.st_size, stat.st_mtime, count),
+            )
+
+    @classmethod
+    def parse_csv_name(cls, csv_path):
+        """从输出文件名中解析来源文件名和模型名（文件名中含有'-'时只能尽量拆分）"""
+        stem = os.path.splitext(os.path.basename(csv_path))[0]
+        if stem.endswith(cls.CSV_SUFFIX):
+            stem = stem[:-len(cls.CSV_SUFFIX)]
+            source, sep, model = stem.partition('-')
+            if sep:
+                return source, model
+        return stem, ''
+
+    def ingest_csv(self, csv_path):
+        """导入一个CSV文件，文件大小和修改时间未变时跳过
+
+        正在由处理任务写入的CSV（CsvCardSink.is_open）也跳过：其卡片连同片段哈希和模型已直接写入卡片库，
+        重新导入会用从文件名解析的信息覆盖它们。
+
+        Returns:
+            {"path": 路径, "cards": 导入的卡片数, "skipped": 是否跳过} 或 {"error": ...}
+        """
+        csv_path = os.path.abspath(csv_path)
+        skipped = {"path": csv_path, "cards": 0, "skipped": True}
+        if CsvCardSink.is_open(csv_path):
+            return skipped
+        try:
+            stat = os.stat(csv_path)
+            conn = self._connection()
+            row = conn.execute('SELECT size, mtime FROM ingested_files WHERE path = ?', (csv_path,)).fetchone()
+            if row is not None and row[0] == stat.st_size and row[1] == stat.st_mtime:
+                return skipped
+
+            source_file, model = self.parse_csv_name(csv_path)
+            with open(csv_path, 'r', newline='', encoding='utf-8', errors='replace') as f:
+                reader = csv.reader(f)
+                rows = ((r[0], r[1], source_file, '', model, stat.st_mtime, csv_path, self.card_hash(r[0], r[1]))
+                        for r in reader
+                        if len(r) >= 2 and r[0].strip() and not (r[0] == '问题' and r[1] == '答案'))
+                with conn:
+                    # 文件每次生成都会整体重写，先删除旧卡片再导入
+                    conn.execute('BEGIN IMMEDIATE')
+                    # 处理任务在打开文件之后才清除旧卡片（需要等待本事务的写锁），
+                    # 取得写锁时文件仍未打开，之后打开时本次导入的卡片会被清除
+                    if CsvCardSink.is_open(csv_path):
+                        return skipped
+                    conn.execute('DELETE FROM cards WHERE csv_path = ?', (csv_path,))
+                    inserted = self._insert_rows(conn, rows)
+                    conn.execute(
+                        'INSERT OR REPLACE INTO ingested_files (path, size, mtime, cards) VALUES (?, ?, ?, ?)',
+                        (csv_path, stat.st_size, stat.st_mtime, inserted),
+                    )
+            self._count_deletion()
+            return {"path": csv_path, "cards": inserted, "skipped": False}
+        except Exception as e:
+            return {"error": f"导入 {os.path.basename(csv_path)} 失败: {str(e)}"}
+
+    def ingest_directory(self, directory, should_stop=None):
+        """增量导入目录中的所有CSV文件
+
+        Returns:
+            {"files": CSV文件数, "ingested": 实际导入的文件数, "cards": 导入的卡片数, "errors": [错误信息]}
+        """
+        stats = {"files": 0, "ingested": 0, "cards": 0, "errors": []}
+        if not os.path.isdir(directory):
+            return stats
+        for name in sorted(os.listdir(directory)):
+            if should_stop is not None and should_stop():
+                break
+            if not name.lower().endswith('.csv'):
+                continue
+            stats["files"] += 1
+            result = self.ingest_csv(os.path.join(directory, name))
+            if 'error' in result:
+                stats["errors"].append(result['error'])
+            elif not result['skipped']:
+                stats["ingested"] += 1
+                stats["cards"] += result['cards']
+        return stats
+
+    @staticmethod
+    def _csv_filter(exclude_csv_paths=(), directory=None):
+        """按CSV文件筛选卡片的WHERE子句和参数"""
+        conditions, params = [], []
+        excluded = [os.path.abspath(path) for path in exclude_csv_paths]
+        if excluded:
+            conditions.append(f"c.csv_path NOT IN ({', '.join('?' for _ in excluded)})")
+            params.extend(excluded)
+        if directory:
+            prefix = os.path.join(os.path.abspath(directory), '')
+            conditions.append("substr(c.csv_path, 1, ?) = ?")
+            params.extend([len(prefix), prefix])
+        where = f"WHERE {' AND '.join(conditions)} " if conditions else ''
+        return where, params
+
+    def iter_card_signatures(self, scheme, exclude_csv_paths=(), directory=None):
+        """逐行返回 (卡片哈希, 问题, 缓存的签名或None)，内容相同的卡片只返回一次
+
+        Args:
+            scheme: 签名参数标识，只返回相同参数计算的缓存签名
+            exclude_csv_paths: 不需要返回的CSV文件（例如即将重新生成的文件）
+            directory: 只返回来自该目录中CSV文件的卡片
+        """
+        where, params = self._csv_filter(exclude_csv_paths, directory)
+        cursor = self._connection().execute(
+            'SELECT c.card_hash, MIN(c.question), s.signature FROM cards c '
+            'LEFT JOIN card_signatures s ON s.card_hash = c.card_hash AND s.scheme = ? '
+            f'{where}GROUP BY c.card_hash',
+            [scheme, *params],
+        )
+        yield from cursor
+
+    def _count_deletion(self):
+        path = os.path.abspath(self.path)
+        with self._default_lock:
+            self._deletions[path] = self._deletions.get(path, 0) + 1
+
+    def change_marker(self):
+        """返回 (本进程中的删除次数, 当前最大卡片id)
+
+        删除次数不变时，id大于上次最大id的卡片就是之后新写入的全部卡片。
+        """
+        with self._default_lock:
+            deletions = self._deletions.get(os.path.abspath(self.path), 0)
+        row = self._connection().execute('SELECT MAX(id) FROM cards').fetchone()
+        return deletions, row[0] or 0
+
+    def iter_unique_cards(self, exclude_csv_paths=(), directory=None, min_id=None):
+        """逐行返回 (卡片哈希, 问题, 答案)，内容相同的卡片只返回一次，参数同 iter_card_signatures
+
+        Args:
+            min_id: 只返回id不小于该值的卡片（增量处理新写入的卡片）
+        """
+        where, params = self._csv_filter(exclude_csv_paths, directory)
+        if min_id is not None:
+            where = f"{where}AND c.id >= ? " if where else "WHERE c.id >= ? "
+            params.append(min_id)
+        # 与MIN()一起查询时，SQLite返回的其他列取自id最小的那一行
+        cursor = self._connection().execute(
+            f'SELECT c.card_hash, c.question, c.answer, MIN(c.id) FROM cards c {where}GROUP BY c.card_hash',
+            params,
+        )
+        for card_hash, question, answer, _ in cursor:
+            yield card_hash, question, answer
+
+    def cards_by_hash(self, card_hashes):
+        """按卡片哈希取卡片（内容相同时取最早的一张）
+
+        Returns:
+            {卡片哈希: 卡片字典}，卡片库中已不存在的哈希不包含在内
+        """
+        card_hashes = list(dict.fromkeys(card_hashes))
+        columns = ', '.join(f'c.{name}' for name in _RESULT_COLUMNS)
+        conn = self._connection()
+        cards = {}
+        # SQLite默认最多999个参数，分批查询
+        for start in range(0, len(card_hashes), 500):
+            batch = card_hashes[start:start + 500]
+            rows = conn.execute(
+                f"SELECT c.card_hash, {columns} FROM cards c WHERE c.card_hash IN ({', '.join('?' for _ in batch)}) "
+                'ORDER BY c.id DESC',
+                batch,
+            )
+            for row in rows:
+                cards[row[0]] = dict(zip(_RESULT_COLUMNS, row[1:]))
+        return cards
+
+    def save_card_signatures(self, scheme, items):
+        """缓存卡片的相似度签名，items为 (卡片哈希, 签名字节) 序列"""
+        conn = self._connection()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.executemany(
+                'INSERT OR REPLACE INTO card_signatures (card_hash, scheme, signature) VALUES (?, ?, ?)',
+                ((card_hash, scheme, blob) for card_hash, blob in items),
+            )
+
+    def count(self):
+        return self._connection().execute('SELECT COUNT(*) FROM cards').fetchone()[0]
+
+    def search(self, query, limit=50, offset=0):
+        """全文检索卡片，按相关度排序；空查询返回最新的卡片
+
+        Returns:
+            卡片字典列表（id, question, answer, source_file, model, created_at, csv_path）
+        """
+        conn = self._connection()
+        terms = query.split()
+        columns = ', '.join(f'c.{name}' for name in _RESULT_COLUMNS)
+        if not terms:
+            rows = conn.execute(
+                f'SELECT {columns} FROM cards c ORDER BY c.created_at DESC, c.id DESC LIMIT ? OFFSET ?',
+                (limit, offset),
+            ).fetchall()
+        elif self.tokenizer == 'trigram' and any(len(term) < 3 for term in terms):
+            # trigram索引无法匹配少于3个字符的词，退回LIKE逐行匹配
+            conditions, params = [], []
+            for term in terms:
+                pattern = '%' + term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+                conditions.append("(c.question LIKE ? ESCAPE '\\' OR c.answer LIKE ? ESCAPE '\\')")
+                params.extend([pattern, pattern])
+            rows = conn.execute(
+                f'SELECT {columns} FROM cards c WHERE {" AND ".join(conditions)} '
+                'ORDER BY c.created_at DESC, c.id DESC LIMIT ? OFFSET ?',
+                (*params, limit, offset),
+            ).fetchall()
+        else:
+            # 每个词作为短语加引号，避免用户输入被解析成FTS语法
+            match = ' '.join('"' + term.replace('"', '""') + '"' for term in terms)
+            rows = conn.execute(
+                f'SELECT {columns} FROM cards_fts JOIN cards c ON c.id = cards_fts.rowid '
+                'WHERE cards_fts MATCH ? ORDER BY cards_fts.rank LIMIT ? OFFSET ?',
+                (match, limit, offset),
+            ).fetchall()
+        return [dict(zip(_RESULT_COLUMNS, row)) for row in rows]
+
+    def search_passages(self, query, limit=20):
+        """按BM25相关度检索卡片和原文分块，查询中的任意检索词命中即可
+
+        Returns:
+            按相关度降序的字典列表（kind为'card'或'source'，id, text, source_file, score）
+        """
+        terms = list(dict.fromkeys(index_terms(query)))
+        if not terms:
+            return []
+        conn = self._connection()
+        match = ' OR '.join('"' + term.replace('"', '""') + '"' for term in terms)
+        ranked = conn.execute(
+            'SELECT rowid, bm25(passages_fts) AS score FROM passages_fts WHERE passages_fts MATCH ? '
+            'ORDER BY score LIMIT ?',
+            (match, limit),
+        ).fetchall()
+        card_ids = [rowid // 2 for rowid, _ in ranked if rowid % 2 == 0]
+        chunk_ids = [rowid // 2 for rowid, _ in ranked if rowid % 2 == 1]
+        texts = {}
+        if card_ids:
+            rows = conn.execute(
+                f"SELECT id, question, answer, source_file FROM cards WHERE id IN ({', '.join('?' for _ in card_ids)})",
+                card_ids,
+            )
+            for card_id, question, answer, source_file in rows:
+                texts[card_id * 2] = (f"问：{question}\n答：{answer}", source_file)
+        if chunk_ids:
+            rows = conn.execute(
+                f"SELECT id, content, source_file FROM source_chunks WHERE id IN ({', '.join('?' for _ in chunk_ids)})",
+                chunk_ids,
+            )
+            for chunk_id, content, source_file in rows:
+                texts[chunk_id * 2 + 1] = (content, source_file)
+
+        results = []
+        for rowid, score in ranked:
+            if rowid in texts:
+                text, source_file = texts[rowid]
+                results.append({
+                    "kind": 'card' if rowid % 2 == 0 else 'source',
+                    "id": rowid // 2,
+                    "text": text,
+                    "source_file": source_file,
+                    # bm25()越小越相关，取反后越大越相关
+                    "score": -score,
+                })
+        return results
@@ -0,0 +1,167 @@
+"""
+对话会话存储模块
+每条消息在SQLite中占一行，只追加不改写：
+
+- 发送和收到消息时各写入一行，程序退出或崩溃都不会丢失对话
+- 会话记录滚动摘要及其覆盖的消息数，重新打开时只需载入摘要之后的消息
+- 界面按页读取消息（按 (会话, 序号) 索引），打开几千条消息的会话也不需要全部读取
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+from core.paths import app_data_dir
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL DEFAULT '',
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    message_count INTEGER NOT NULL DEFAULT 0,
+    summary TEXT NOT NULL DEFAULT '',
+    summarized_upto INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS messages (
+    session_id INTEGER NOT NULL REFERENCES sessions (id) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    tokens INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (session_id, seq)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS ix_sessions_updated_at ON sessions (updated_at);
+"""
+
+_MESSAGE_COLUMNS = ('seq', 'role', 'content', 'tokens', 'created_at')
+# 序号上限，用于表示"不限"
+_MAX_SEQ = 2 ** 62
+_SESSION_COLUMNS = ('id', 'title', 'created_at', 'updated_at', 'message_count', 'summary', 'summarized_upto')
+
+
+class ChatStore:
+    """保存对话会话的SQLite数据库（每个线程使用自己的连接）"""
+
+    DEFAULT_PATH = app_data_dir("chats.db")
+    TITLE_LENGTH = 30
+
+    _default = None
+    _default_lock = threading.Lock()
+
+    @classmethod
+    def default(cls):
+        """获取默认位置的会话库"""
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls(cls.DEFAULT_PATH)
+            return cls._default
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode = WAL')
+            conn.execute('PRAGMA synchronous = NORMAL')
+            conn.execute('PRAGMA foreign_keys = ON')
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        """关闭当前线程的连接"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def create_session(self, title=''):
+        """新建会话，返回会话id"""
+        now = time.time()
+        conn = self._connection()
+        with conn:
+            cursor = conn.execute(
+                'INSERT INTO sessions (title, created_at, updated_at) VALUES (?, ?, ?)',
+                (title, now, now),
+            )
+        return cursor.lastrowid
+
+    def list_sessions(self, limit=100):
+        """按最近更新时间列出会话"""
+        rows = self._connection().execute(
+            f'SELECT {", ".join(_SESSION_COLUMNS)} FROM sessions ORDER BY updated_at DESC, id DESC LIMIT ?',
+            (limit,),
+        ).fetchall()
+        return [dict(zip(_SESSION_COLUMNS, row)) for row in rows]
+
+    def get_session(self, session_id):
+        row = self._connection().execute(
+            f'SELECT {", ".join(_SESSION_COLUMNS)} FROM sessions WHERE id = ?', (session_id,)
+        ).fetchone()
+        return dict(zip(_SESSION_COLUMNS, row)) if row else None
+
+    def delete_session(self, session_id):
+        conn = self._connection()
+        with conn:
+            conn.execute('DELETE FROM sessions WHERE id = ?', (session_id,))
+
+    def append_message(self, session_id, role, content, tokens=0):
+        """追加一条消息，会话还没有标题时用第一条用户消息作为标题
+
+        Returns:
+            消息在会话中的序号（从0开始）
+        """
+        now = time.time()
+        conn = self._connection()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            seq, title = conn.execute(
+                'SELECT message_count, title FROM sessions WHERE id = ?', (session_id,)
+            ).fetchone()
+            conn.execute(
+                'INSERT INTO messages (session_id, seq, role, content, tokens, created_at) VALUES (?, ?, ?, ?, ?, ?)',
+                (session_id, seq, role, content, tokens, now),
+            )
+            if not title and role == 'user':
+                title = ' '.join(content.split())[:self.TITLE_LENGTH]
+            conn.execute(
+                'UPDATE sessions SET message_count = ?, updated_at = ?, title = ? WHERE id = ?',
+                (seq + 1, now, title, session_id),
+            )
+        return seq
+
+    def save_summary(self, session_id, summary, summarized_upto):
+        """保存滚动摘要及其覆盖的消息数"""
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                'UPDATE sessions SET summary = ?, summarized_upto = ? WHERE id = ?',
+                (summary, summarized_upto, session_id),
+            )
+
+    def load_messages(self, session_id, start=0, end=None):
+        """按序号读取 [start, end) 范围内的消息（升序）"""
+        rows = self._connection().execute(
+            f'SELECT {", ".join(_MESSAGE_COLUMNS)} FROM messages '
+            'WHERE session_id = ? AND seq >= ? AND seq < ? ORDER BY seq',
+            (session_id, max(start, 0), _MAX_SEQ if end is None else end),
+        ).fetchall()
+        return [dict(zip(_MESSAGE_COLUMNS, row)) for row in rows]
+
+    def load_page(self, session_id, before=None, limit=50):
+        """读取序号小于 before 的最近 limit 条消息（升序），before为None时读取最新的一页"""
+        rows = self._connection().execute(
+            f'SELECT {", ".join(_MESSAGE_COLUMNS)} FROM messages '
+            'WHERE session_id = ? AND seq < ? ORDER BY seq DESC LIMIT ?',
+            (session_id, _MAX_SEQ if before is None else before, limit),
+        ).fetchall()
+        return [dict(zip(_MESSAGE_COLUMNS, row)) for row in reversed(rows)]
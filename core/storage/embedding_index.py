@@ -0,0 +1,284 @@
+"""
+向量索引模块
+把卡片的嵌入向量以float16保存在只追加的二进制文件中，检索时用numpy memmap分块扫描，
+不需要把全部向量读入内存（100万张768维卡片约1.5GB磁盘、每块只占几十MB内存）。
+
+- 向量写入前做L2归一化，内积即余弦相似度
+- 平铺（flat）索引：精确检索，批量查询时一次扫描同时服务多个查询向量
+- 每行以卡片内容哈希（sha1，20字节）为键，CSV重新生成后卡片的向量仍可复用
+- 按键查找使用内存中排好序的键副本（np.searchsorted），追加时增量插入，不需要每次重新排序
+- numpy是可选依赖，未安装时 available() 返回False，调用方应跳过相关功能
+"""
+
+import json
+import os
+import threading
+
+try:
+    import numpy as np
+except ImportError:  # numpy是可选依赖
+    np = None
+
+
+class EmbeddingIndex:
+    """float16 memmap 平铺向量索引
+
+    目录结构:
+        vectors.f16  N x dim 的float16矩阵（行优先）
+        keys.sha1    N 个20字节的卡片哈希，与向量逐行对应
+        meta.json    维度、模型名和行数
+
+    同一目录应通过 shared() 获取，进程内的所有使用者共用一个实例和一把锁。
+    """
+
+    # 每次扫描的行数
+    CHUNK_ROWS = 65536
+    KEY_BYTES = 20
+
+    _shared = {}
+    _shared_lock = threading.Lock()
+
+    @classmethod
+    def shared(cls, directory, model=''):
+        """获取目录对应的共享索引（例如文件处理和卡片搜索同时使用同一个嵌入模型时）"""
+        key = os.path.normcase(os.path.abspath(directory))
+        with cls._shared_lock:
+            index = cls._shared.get(key)
+            if index is None:
+                index = cls._shared[key] = cls(directory, model)
+            return index
+
+    def __init__(self, directory, model=''):
+        self.directory = directory
+        self.model = model
+        self.dim = None
+        self.count = 0
+        self._lock = threading.Lock()
+        # 排好序的键及其行号（只在需要按键查找时加载，追加时增量更新）
+        self._sorted_keys = None
+        self._sorted_rows = None
+        self._load_meta()
+
+    @staticmethod
+    def available():
+        return np is not None
+
+    @property
+    def vectors_path(self):
+        return os.path.join(self.directory, 'vectors.f16')
+
+    @property
+    def keys_path(self):
+        return os.path.join(self.directory, 'keys.sha1')
+
+    @property
+    def meta_path(self):
+        return os.path.join(self.directory, 'meta.json')
+
+    def _load_meta(self):
+        try:
+            with open(self.meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            self.dim = meta.get('dim')
+            self.model = meta.get('model', self.model)
+        except (OSError, ValueError):
+            return
+        if self.dim:
+            self.count = self._rows_on_disk()
+
+    def _rows_on_disk(self):
+        """以文件实际大小为准的完整行数，写入中断时不完整的末尾行不计入"""
+        rows_by_vectors = os.path.getsize(self.vectors_path) // (2 * self.dim) if os.path.exists(self.vectors_path) else 0
+        rows_by_keys = os.path.getsize(self.keys_path) // self.KEY_BYTES if os.path.exists(self.keys_path) else 0
+        return min(rows_by_vectors, rows_by_keys)
+
+    def _save_meta(self):
+        from core.config_store import atomic_write_text
+        atomic_write_text(self.meta_path, json.dumps({'dim': self.dim, 'model': self.model, 'count': self.count}))
+
+    def __len__(self):
+        return self.count
+
+    @classmethod
+    def encode_keys(cls, keys):
+        """十六进制卡片哈希 -> S20 数组"""
+        data = b''.join(bytes.fromhex(key) for key in keys)
+        return np.frombuffer(data, dtype=f'S{cls.KEY_BYTES}')
+
+    @staticmethod
+    def decode_key(keys, index):
+        # 直接取元素会去掉末尾的0字节，按原始字节切片
+        return keys[index:index + 1].tobytes().hex()
+
+    @staticmethod
+    def normalize(vectors):
+        """转换为float32矩阵并做L2归一化"""
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if matrix.ndim == 1:
+            matrix = matrix[None, :]
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    def add(self, keys, vectors):
+        """追加向量，keys（卡片哈希）与vectors逐行对应"""
+        matrix = self.normalize(vectors)
+        encoded = self.encode_keys(keys)
+        if len(encoded) != len(matrix):
+            raise ValueError("键数量与向量数量不一致")
+        if not len(encoded):
+            return
+        with self._lock:
+            if self.dim is None:
+                self.dim = int(matrix.shape[1])
+            elif matrix.shape[1] != self.dim:
+                raise ValueError(f"向量维度不一致: 索引为{self.dim}，新向量为{matrix.shape[1]}")
+            os.makedirs(self.directory, exist_ok=True)
+            # 行数以磁盘上的文件为准：只截掉两个文件中没有对应的不完整末尾，
+            # 已经完整写入的行（包括其他实例写入的）不会被删除
+            count = self._rows_on_disk()
+            if count != self.count:
+                self.count = count
+                self._sorted_keys = self._sorted_rows = None
+            for path, row_bytes in ((self.vectors_path, 2 * self.dim), (self.keys_path, self.KEY_BYTES)):
+                if os.path.exists(path) and os.path.getsize(path) != count * row_bytes:
+                    with open(path, 'r+b') as f:
+                        f.truncate(count * row_bytes)
+            with open(self.vectors_path, 'ab') as f:
+                f.write(matrix.astype(np.float16).tobytes())
+            with open(self.keys_path, 'ab') as f:
+                f.write(encoded.tobytes())
+            if self._sorted_keys is not None:
+                self._insert_sorted(encoded, self.count)
+            self.count += len(encoded)
+            self._save_meta()
+
+    def _open(self):
+        """以只读memmap打开当前的向量和键"""
+        count = self.count
+        if not count:
+            return None, None
+        vectors = np.memmap(self.vectors_path, dtype=np.float16, mode='r', shape=(count, self.dim))
+        keys = np.memmap(self.keys_path, dtype=f'S{self.KEY_BYTES}', mode='r', shape=(count,))
+        return vectors, keys
+
+    def _insert_sorted(self, encoded, first_row):
+        """把从 first_row 行开始追加的键插入排好序的副本"""
+        order = np.argsort(encoded, kind='stable')
+        positions = np.searchsorted(self._sorted_keys, encoded[order])
+        self._sorted_keys = np.insert(self._sorted_keys, positions, encoded[order])
+        self._sorted_rows = np.insert(self._sorted_rows, positions, first_row + order)
+
+    def _lookup(self):
+        """排好序的全部键和对应行号（100万条约28MB），首次使用时读入内存并排序"""
+        with self._lock:
+            if self._sorted_keys is None or len(self._sorted_keys) != self.count:
+                if self.count:
+                    keys = np.fromfile(self.keys_path, dtype=f'S{self.KEY_BYTES}', count=self.count)
+                else:
+                    keys = np.zeros(0, dtype=f'S{self.KEY_BYTES}')
+                self._sorted_rows = np.argsort(keys, kind='stable')
+                self._sorted_keys = keys[self._sorted_rows]
+            return self._sorted_keys, self._sorted_rows
+
+    def rows(self, keys):
+        """按卡片哈希（十六进制序列或S20数组）查找行号，不存在的为-1"""
+        if not isinstance(keys, np.ndarray):
+            keys = self.encode_keys(keys)
+        sorted_keys, sorted_rows = self._lookup()
+        result = np.full(len(keys), -1, dtype=np.int64)
+        if not len(sorted_keys) or not len(keys):
+            return result
+        positions = np.minimum(np.searchsorted(sorted_keys, keys), len(sorted_keys) - 1)
+        found = sorted_keys[positions] == keys
+        result[found] = sorted_rows[positions[found]]
+        return result
+
+    def rows_mask(self, keys):
+        """返回长度为当前行数的布尔数组，keys 所在的行为True，可作为 search_many 的 allowed_rows"""
+        mask = np.zeros(self.count, dtype=bool)
+        rows = self.rows(keys)
+        rows = rows[(rows >= 0) & (rows < len(mask))]
+        mask[rows] = True
+        return mask
+
+    def missing(self, keys):
+        """返回尚未建立索引的卡片哈希"""
+        keys = list(keys)
+        if not keys:
+            return []
+        rows = self.rows(keys)
+        return [key for key, row in zip(keys, rows) if row < 0]
+
+    def search_many(self, queries, k=10, min_score=None, allowed_keys=None, exclude_keys=None, allowed_rows=None):
+        """批量检索，一次扫描同时计算所有查询向量的相似度
+
+        Args:
+            queries: M x dim 的查询向量
+            k: 每个查询返回的最多条数
+            min_score: 只返回相似度不低于该值的结果
+            allowed_keys: 只在这些卡片哈希中检索（S20数组或哈希序列），None表示全部
+            exclude_keys: 不返回的卡片哈希（例如查询卡片本身）
+            allowed_rows: 只在这些行中检索（rows_mask() 返回的布尔数组，超出其长度的行不参与），
+                反复用同一组卡片检索时应缓存该数组，而不是每次传入 allowed_keys
+
+        Returns:
+            M 个列表，每个为按相似度降序的 [(卡片哈希, 相似度)]
+        """
+        queries = self.normalize(queries)
+        results = [[] for _ in range(len(queries))]
+        vectors, keys = self._open()
+        if vectors is None or not len(queries):
+            return results
+        if queries.shape[1] != self.dim:
+            raise ValueError(f"查询向量维度不一致: 索引为{self.dim}，查询为{queries.shape[1]}")
+        if allowed_rows is None and allowed_keys is not None:
+            allowed_rows = self.rows_mask(allowed_keys)
+        if allowed_rows is not None and not allowed_rows.any():
+            return results
+        excluded = self.encode_keys(exclude_keys) if exclude_keys else None
+
+        # 每个查询维护当前最好的 k 个候选
+        best_scores = np.full((len(queries), 0), -np.inf, dtype=np.float32)
+        best_keys = np.zeros((len(queries), 0), dtype=keys.dtype)
+        for start in range(0, len(vectors), self.CHUNK_ROWS):
+            chunk = np.asarray(vectors[start:start + self.CHUNK_ROWS], dtype=np.float32)
+            chunk_keys = np.asarray(keys[start:start + self.CHUNK_ROWS])
+            scores = queries @ chunk.T
+            if allowed_rows is not None:
+                allowed = np.zeros(len(chunk), dtype=bool)
+                part = allowed_rows[start:start + len(chunk)]
+                allowed[:len(part)] = part
+                scores[:, ~allowed] = -np.inf
+            if excluded is not None:
+                # 排除的键只有少数几个，逐个比较
+                for key in excluded:
+                    scores[:, chunk_keys == key] = -np.inf
+            take = min(k, scores.shape[1])
+            top = np.argpartition(-scores, take - 1, axis=1)[:, :take]
+            best_scores = np.concatenate([best_scores, np.take_along_axis(scores, top, axis=1)], axis=1)
+            best_keys = np.concatenate([best_keys, chunk_keys[top]], axis=1)
+            if best_scores.shape[1] > k:
+                keep = np.argpartition(-best_scores, k - 1, axis=1)[:, :k]
+                best_scores = np.take_along_axis(best_scores, keep, axis=1)
+                best_keys = np.take_along_axis(best_keys, keep, axis=1)
+
+        for row in range(len(queries)):
+            for col in np.argsort(-best_scores[row]):
+                score = float(best_scores[row, col])
+                if score == -np.inf or (min_score is not None and score < min_score):
+                    break
+                results[row].append((self.decode_key(best_keys[row], col), score))
+        return results
+
+    def search(self, query, k=10, min_score=None, allowed_keys=None, exclude_keys=None):
+        """检索与单个向量最相似的条目"""
+        return self.search_many([query], k, min_score, allowed_keys, exclude_keys)[0]
+
+    def get_vector(self, key):
+        """按卡片哈希取出向量（float32），不存在时返回None"""
+        row = self.rows([key])[0]
+        if row < 0:
+            return None
+        vectors, _ = self._open()
+        return np.asarray(vectors[row], dtype=np.float32)
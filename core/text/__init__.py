@@ -0,0 +1,25 @@
+"""
+文本处理模块
+切分待处理的文件，清理从文档和模型响应中提取的文本
+"""
+
+from core import _load_lazy_export
+
+_LAZY_EXPORTS = {
+    'clean_pdf_text': 'core.text.cleaning',
+    'RepeatedLineFilter': 'core.text.cleaning',
+    'strip_think': 'core.text.cleaning',
+    'strip_code_blocks': 'core.text.cleaning',
+    'extract_qa_pairs': 'core.text.cleaning',
+    'iter_docx_lines': 'core.text.documents',
+    'iter_epub_lines': 'core.text.documents',
+    'MarkdownTokenizer': 'core.text.markdown',
+    'Section': 'core.text.splitters',
+    'iter_sections': 'core.text.splitters',
+}
+
+__all__ = ['clean_pdf_text', 'RepeatedLineFilter', 'strip_think', 'strip_code_blocks', 'extract_qa_pairs', 'iter_docx_lines', 'iter_epub_lines', 'MarkdownTokenizer', 'Section', 'iter_sections']
+
+
+def __getattr__(name):
+    return _load_lazy_export(globals(), _LAZY_EXPORTS, name)
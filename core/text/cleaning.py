@@ -0,0 +1,181 @@
+"""
+文本清理模块
+正则表达式在模块导入时编译一次，每页、每次响应都直接复用：
+
+- clean_pdf_text 逐行扫描一次去掉页码和页眉页脚，再合并空白、按句末标点分段，不再逐行跑正则
+- RepeatedLineFilter 跨页统计重复出现的行，找出书名、章节名等页眉页脚
+- strip_think 去掉推理模型输出的 <think> 段，不含该标签时直接返回
+- extract_qa_pairs 在JSON解析失败时从纯文本中提取问答对
+"""
+
+import re
+
+# 合并空白后，句末标点后的空格
+_SENTENCE_BREAK_PATTERN = re.compile(r'(?<=[.!?。！？]) ')
+
+# 单独成行的页码，如 "12"、"- 12 -"、"Page 3"、"3 / 120"、"第 5 页"
+_PAGE_NUMBER_PATTERN = re.compile(
+    r'[\W_]*(?:page|p\.|第)?\s*\d+\s*(?:页|(?:/|of)\s*\d+)?[\W_]*$',
+    re.IGNORECASE,
+)
+# 超过该长度的行不可能是页码，不再匹配
+_PAGE_NUMBER_MAX_LENGTH = 20
+
+_DIGITS_PATTERN = re.compile(r'\d+')
+
+_THINK_PATTERN = re.compile(r'<think>.*?</think>', re.DOTALL)
+
+_CODE_BLOCK_PATTERN = re.compile(r'```[^`]*```')
+
+_QA_PATTERN = re.compile(
+    r'(问题\d*[:：]?\s*|q[:：]?\s*)(?P<question>.+?)\n'
+    r'(答案\d*[:：]?\s*|a[:：]?\s*)(?P<answer>.+?)(?=\n\s*(问题|q|$))',
+    re.DOTALL | re.IGNORECASE,
+)
+
+_EDGE_QUOTE_PATTERN = re.compile(r'^["\']|["\']$')
+
+
+def clean_pdf_text(text, boilerplate=None):
+    """清理从PDF提取的一页文本
+
+    逐行去掉空行、页码和重复的页眉页脚，合并空白，句末标点后换成空行作为段落分隔。
+
+    Args:
+        text: 一页文本
+        boilerplate: 由整份文档得到的 RepeatedLineFilter，为None时只去掉页码
+    """
+    if not text:
+        return ""
+    lines = [line for line in map(str.strip, text.splitlines()) if line]
+    if boilerplate:
+        lines = boilerplate.strip_lines(lines)
+    kept = [
+        line for line in lines
+        if len(line) > _PAGE_NUMBER_MAX_LENGTH or not _PAGE_NUMBER_PATTERN.match(line)
+    ]
+    return _SENTENCE_BREAK_PATTERN.sub('\n\n', ' '.join(' '.join(kept).split()))
+
+
+def _line_key(line):
+    """比较重复行用的键：合并空白、数字串替换为#、转小写，页码不同的页眉视为同一行"""
+    key = ' '.join(line.split()).lower()
+    return _DIGITS_PATTERN.sub('#', key) if _DIGITS_PATTERN.search(key) else key
+
+
+class RepeatedLineFilter:
+    """跨页检测重复的页眉页脚
+
+    - 位置：出现在每页开头或结尾几行、且在足够多页上重复的行（书名、章节名、页码行）
+    - 频率：在大多数页上都出现的短行，不论位置（水印、版权声明）
+    """
+
+    # 每页开头和结尾参与位置统计的行数
+    EDGE_LINES = 3
+    # 页首/页尾的行至少在这么多页（且不少于总页数的 EDGE_RATIO）上重复才算页眉页脚
+    MIN_REPEATS = 3
+    EDGE_RATIO = 0.05
+    # 任意位置的行在超过该比例的页上出现时算作固定文字
+    BODY_RATIO = 0.5
+    # 超过该长度的行视为正文
+    MAX_LINE_LENGTH = 80
+    # 不论位置的频率统计只看更短的行
+    MAX_BODY_LINE_LENGTH = 40
+
+    def __init__(self, head_keys=(), tail_keys=(), body_keys=()):
+        self.head_keys = frozenset(head_keys)
+        self.tail_keys = frozenset(tail_keys)
+        self.body_keys = frozenset(body_keys)
+
+    def __bool__(self):
+        return bool(self.head_keys or self.tail_keys or self.body_keys)
+
+    @classmethod
+    def from_pages(cls, pages):
+        """统计整份文档的每页文本，找出重复的页眉页脚"""
+        head_counts, tail_counts, body_counts = {}, {}, {}
+        page_count = 0
+        for text in pages:
+            page_count += 1
+            lines = [line for line in map(str.strip, (text or '').splitlines()) if line]
+            edge = lines[:cls.EDGE_LINES], lines[-cls.EDGE_LINES:]
+            short = [line for line in lines if len(line) <= cls.MAX_BODY_LINE_LENGTH]
+            for counts, group in zip((head_counts, tail_counts, body_counts), edge + (short,)):
+                for key in {_line_key(line) for line in group if len(line) <= cls.MAX_LINE_LENGTH}:
+                    counts[key] = counts.get(key, 0) + 1
+
+        if page_count < cls.MIN_REPEATS:
+            return cls()
+        edge_threshold = max(cls.MIN_REPEATS, page_count * cls.EDGE_RATIO)
+        body_threshold = max(cls.MIN_REPEATS, page_count * cls.BODY_RATIO)
+        return cls(
+            (key for key, count in head_counts.items() if count >= edge_threshold),
+            (key for key, count in tail_counts.items() if count >= edge_threshold),
+            (key for key, count in body_counts.items() if count > body_threshold),
+        )
+
+    def is_repeated(self, line, head=False, tail=False):
+        """判断一行是否为重复的页眉页脚
+
+        Args:
+            line: 去掉首尾空白的行
+            head: 该行是否在页首的 EDGE_LINES 行内
+            tail: 该行是否在页尾的 EDGE_LINES 行内
+        """
+        length = len(line)
+        if length > self.MAX_LINE_LENGTH or not (head or tail or length <= self.MAX_BODY_LINE_LENGTH):
+            return False
+        key = _line_key(line)
+        return (
+            key in self.body_keys
+            or (head and key in self.head_keys)
+            or (tail and key in self.tail_keys)
+        )
+
+    def strip_lines(self, lines):
+        """去掉一页（非空、已去掉首尾空白的）行中的重复页眉页脚"""
+        edge = self.EDGE_LINES
+        count = len(lines)
+        if count <= edge * 2:
+            return [
+                line for i, line in enumerate(lines)
+                if not self.is_repeated(line, i < edge, i >= count - edge)
+            ]
+        middle = lines[edge:-edge]
+        if self.body_keys:
+            # 中间的行只需检查不论位置的固定文字
+            middle = [line for line in middle if not self.is_repeated(line)]
+        return (
+            [line for line in lines[:edge] if not self.is_repeated(line, head=True)]
+            + middle
+            + [line for line in lines[-edge:] if not self.is_repeated(line, tail=True)]
+        )
+
+
+def strip_think(text):
+    """去掉模型响应中的 <think>...</think> 推理内容"""
+    if not text:
+        return ""
+    if '<think>' in text:
+        text = _THINK_PATTERN.sub('', text)
+    return text.strip()
+
+
+def strip_code_blocks(text):
+    """去掉文本中的代码块及剩余的代码块标记"""
+    return _CODE_BLOCK_PATTERN.sub('', text).replace('```', '')
+
+
+def extract_qa_pairs(text):
+    """从"问题…/答案…"或"Q…/A…"格式的文本中提取问答对
+
+    Returns:
+        (问题, 答案) 列表，去掉了首尾引号
+    """
+    pairs = []
+    for match in _QA_PATTERN.finditer(text):
+        question = _EDGE_QUOTE_PATTERN.sub('', match.group('question').strip())
+        answer = _EDGE_QUOTE_PATTERN.sub('', match.group('answer').strip())
+        if question and answer:
+            pairs.append((question, answer))
+    return pairs
@@ -0,0 +1,354 @@
+"""
+DOCX / EPUB 读取模块
+把文档按阅读顺序转换成Markdown格式的行，交给与Markdown相同的切分流程：
+
+- DOCX 用 zipfile + iterparse 逐段读取 word/document.xml，段落处理完即从树中移除，不载入整个文档
+- 标题级别来自段落样式（样式的大纲级别，或名为"Heading N"/"标题 N"的样式），列表段落转为"- "开头，表格转为"|"分隔的行
+- EPUB 按OPF中spine的顺序逐章读取，每章的XHTML分块送入增量的HTML解析器，章与章之间产出 SECTION_BREAK
+
+产出 (行, 已读取部分占文档的比例)；章节边界处产出 SECTION_BREAK。
+"""
+
+import io
+import posixpath
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+from html.parser import HTMLParser
+from urllib.parse import unquote
+
+# 章节边界标记，切分时在此处结束当前片段并清空标题层级
+SECTION_BREAK = None
+
+_W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+_HEADING_STYLE_PATTERN = re.compile(r'(?:heading|标题)\s*(\d)', re.IGNORECASE)
+# 段首的这些字符在Markdown中有特殊含义（标题、代码围栏），需要转义
+_MARKDOWN_SPECIAL = ('#', '`', '~')
+
+# EPUB 每次送入HTML解析器的字符数
+_EPUB_CHUNK_CHARS = 64 * 1024
+
+
+def _paragraph_line(text, prefix=''):
+    """把一段纯文本转换为一行Markdown，段首的特殊字符加反斜杠转义"""
+    text = text.strip()
+    if not text:
+        return None
+    if text.startswith(_MARKDOWN_SPECIAL):
+        text = '\\' + text
+    return f"{prefix}{text}\n"
+
+
+def _heading_line(level, text):
+    text = ' '.join(text.split())
+    return f"{'#' * min(max(level, 1), 6)} {text}\n" if text else None
+
+
+def _table_lines(rows):
+    """把表格的行（单元格文本列表）转换为Markdown表格"""
+    rows = [row for row in rows if any(cell for cell in row)]
+    if not rows:
+        return []
+    width = max(len(row) for row in rows)
+    lines = []
+    for i, row in enumerate(rows):
+        cells = [cell.replace('|', '\\|') for cell in row] + [''] * (width - len(row))
+        lines.append(f"| {' | '.join(cells)} |\n")
+        if i == 0:
+            lines.append(f"|{'---|' * width}\n")
+    return lines
+
+
+# ---------------------------------------------------------------- DOCX
+
+def _docx_styles(archive):
+    """读取 styles.xml
+
+    Returns:
+        ({样式id: 标题级别}, 列表样式id集合)，标题级别和编号沿 basedOn 继承
+    """
+    try:
+        root = ET.fromstring(archive.read('word/styles.xml'))
+    except KeyError:
+        return {}, frozenset()
+
+    styles = {}
+    for style in root.iter(f'{_W}style'):
+        if style.get(f'{_W}type') != 'paragraph':
+            continue
+        style_id = style.get(f'{_W}styleId')
+        name = style.find(f'{_W}name')
+        based_on = style.find(f'{_W}basedOn')
+        outline = style.find(f'{_W}pPr/{_W}outlineLvl')
+        level = None
+        if outline is not None and outline.get(f'{_W}val', '').isdigit():
+            value = int(outline.get(f'{_W}val'))
+            level = value + 1 if value < 9 else None
+        name = name.get(f'{_W}val', '') if name is not None else ''
+        if level is None:
+            match = _HEADING_STYLE_PATTERN.search(name)
+            if match:
+                level = int(match.group(1))
+            elif name.lower() == 'title':
+                level = 1
+        numbered = style.find(f'{_W}pPr/{_W}numPr') is not None
+        styles[style_id] = (level, numbered, based_on.get(f'{_W}val') if based_on is not None else None)
+
+    levels, list_styles = {}, set()
+    for style_id in styles:
+        current, seen = style_id, set()
+        while current in styles and current not in seen:
+            seen.add(current)
+            level, numbered, parent = styles[current]
+            if level is not None:
+                levels[style_id] = level
+                break
+            if numbered:
+                list_styles.add(style_id)
+                break
+            current = parent
+    return levels, frozenset(list_styles)
+
+
+def _docx_text(paragraph):
+    parts = []
+    for node in paragraph.iter():
+        tag = node.tag
+        if tag == f'{_W}t':
+            parts.append(node.text or '')
+        elif tag in (f'{_W}tab', f'{_W}br', f'{_W}cr'):
+            parts.append(' ')
+    return ''.join(parts)
+
+
+def iter_docx_lines(path):
+    """按顺序读取DOCX的段落、标题和表格，产出Markdown格式的行"""
+    with zipfile.ZipFile(path) as archive:
+        heading_levels, list_styles = _docx_styles(archive)
+        info = archive.getinfo('word/document.xml')
+        total = info.file_size or 1
+
+        with archive.open(info) as stream:
+            body = None
+            depth = 0
+            table_depth = 0
+            in_list = False
+            rows, row, cell = [], [], []
+
+            for event, element in ET.iterparse(stream, events=('start', 'end')):
+                tag = element.tag
+                if event == 'start':
+                    depth += 1
+                    if tag == f'{_W}body':
+                        body = element
+                    elif tag == f'{_W}tbl':
+                        table_depth += 1
+                    continue
+
+                depth -= 1
+                if tag == f'{_W}p':
+                    text = _docx_text(element)
+                    if table_depth:
+                        cell.append(' '.join(text.split()))
+                    else:
+                        properties = element.find(f'{_W}pPr')
+                        level = None
+                        is_list = False
+                        if properties is not None:
+                            style = properties.find(f'{_W}pStyle')
+                            style_id = style.get(f'{_W}val') if style is not None else None
+                            level = heading_levels.get(style_id)
+                            outline = properties.find(f'{_W}outlineLvl')
+                            if outline is not None and outline.get(f'{_W}val', '').isdigit():
+                                value = int(outline.get(f'{_W}val'))
+                                level = value + 1 if value < 9 else level
+                            is_list = style_id in list_styles or properties.find(f'{_W}numPr') is not None
+                        line = _heading_line(level, text) if level else _paragraph_line(text, '- ' if is_list else '')
+                        if line:
+                            progress = stream.tell() / total
+                            if in_list and not is_list:
+                                yield '\n', progress
+                            in_list = is_list
+                            yield line, progress
+                            if not is_list:
+                                yield '\n', progress
+                elif tag == f'{_W}tc' and table_depth:
+                    row.append(' '.join(part for part in cell if part))
+                    cell = []
+                elif tag == f'{_W}tr' and table_depth:
+                    rows.append(row)
+                    row = []
+                elif tag == f'{_W}tbl':
+                    table_depth -= 1
+                    if not table_depth:
+                        progress = stream.tell() / total
+                        for line in _table_lines(rows):
+                            yield line, progress
+                        yield '\n', progress
+                        rows = []
+
+                # 正文的直接子元素处理完后从树中移除，内存占用与文档大小无关
+                if body is not None and depth == 2:
+                    body.remove(element)
+
+
+# ---------------------------------------------------------------- EPUB
+
+def _epub_spine(archive):
+    """按阅读顺序返回EPUB各章在压缩包中的路径"""
+    container = ET.fromstring(archive.read('META-INF/container.xml'))
+    rootfile = container.find('.//{*}rootfile')
+    if rootfile is None:
+        return []
+    opf_path = rootfile.get('full-path')
+    opf = ET.fromstring(archive.read(opf_path))
+    base = posixpath.dirname(opf_path)
+
+    manifest = {}
+    for item in opf.iterfind('{*}manifest/{*}item'):
+        if 'html' in item.get('media-type', ''):
+            manifest[item.get('id')] = posixpath.normpath(posixpath.join(base, unquote(item.get('href', ''))))
+
+    names = set(archive.namelist())
+    spine = []
+    for itemref in opf.iterfind('{*}spine/{*}itemref'):
+        if itemref.get('linear') == 'no':
+            continue
+        name = manifest.get(itemref.get('idref'))
+        if name in names:
+            spine.append(name)
+    return spine
+
+
+class _HtmlToMarkdown(HTMLParser):
+    """增量把XHTML章节转换为Markdown格式的行"""
+
+    _BLOCKS = frozenset((
+        'p', 'div', 'section', 'article', 'blockquote', 'dt', 'dd', 'figcaption',
+        'caption', 'aside', 'header', 'footer', 'li', 'ul', 'ol', 'dl', 'table', 'body',
+    ))
+    _SKIP = frozenset(('head', 'script', 'style', 'svg', 'math'))
+    _HEADINGS = {'h1': 1, 'h2': 2, 'h3': 3, 'h4': 4, 'h5': 5, 'h6': 6}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.lines = []
+        self._text = []
+        self._skip = 0
+        self._pre = 0
+        self._heading = 0
+        self._list_item = False
+        self._rows, self._row, self._cell = [], None, None
+
+    def _flush(self):
+        text = ' '.join(''.join(self._text).split())
+        self._text = []
+        if not text:
+            return
+        if self._heading:
+            line = _heading_line(self._heading, text)
+        else:
+            line = _paragraph_line(text, '- ' if self._list_item else '')
+        self.lines.append(line)
+        if not self._list_item:
+            self.lines.append('\n')
+        self._list_item = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self._SKIP:
+            self._skip += 1
+        if self._skip:
+            return
+        if tag in self._HEADINGS:
+            self._flush()
+            self._heading = self._HEADINGS[tag]
+        elif tag == 'pre':
+            self._flush()
+            self._pre += 1
+            self.lines.append('```\n')
+        elif tag in ('td', 'th') and self._row is not None:
+            self._cell = []
+        elif tag == 'tr':
+            self._row = []
+        elif tag == 'br':
+            self._text.append('\n' if self._pre else ' ')
+        elif tag in self._BLOCKS and not self._pre:
+            self._flush()
+            if tag == 'li':
+                self._list_item = True
+
+    def handle_endtag(self, tag):
+        if tag in self._SKIP:
+            self._skip = max(self._skip - 1, 0)
+            return
+        if self._skip:
+            return
+        if tag in self._HEADINGS:
+            self._flush()
+            self._heading = 0
+        elif tag == 'pre' and self._pre:
+            self._pre -= 1
+            code = ''.join(self._text).strip('\n')
+            self._text = []
+            if code:
+                self.lines.extend(line + '\n' for line in code.split('\n'))
+            self.lines.extend(('```\n', '\n'))
+        elif tag in ('td', 'th') and self._cell is not None:
+            self._row.append(' '.join(''.join(self._cell).split()))
+            self._cell = None
+        elif tag == 'tr' and self._row is not None:
+            self._rows.append(self._row)
+            self._row = None
+        elif tag == 'table':
+            self.lines.extend(_table_lines(self._rows))
+            self.lines.append('\n')
+            self._rows = []
+        elif tag in ('ul', 'ol', 'dl'):
+            # 列表结束后空一行，后面的段落不会被当作列表项的延续
+            self._flush()
+            self.lines.append('\n')
+        elif tag in self._BLOCKS and not self._pre:
+            self._flush()
+
+    def handle_data(self, data):
+        if self._skip:
+            return
+        if self._cell is not None:
+            self._cell.append(data)
+        else:
+            self._text.append(data)
+
+    def close(self):
+        super().close()
+        self._flush()
+
+    def pop_lines(self):
+        lines, self.lines = [line for line in self.lines if line], []
+        return lines
+
+
+def iter_epub_lines(path):
+    """按spine顺序逐章读取EPUB，产出Markdown格式的行，每章之前产出 SECTION_BREAK"""
+    with zipfile.ZipFile(path) as archive:
+        spine = _epub_spine(archive)
+        sizes = [archive.getinfo(name).file_size for name in spine]
+        total = sum(sizes) or 1
+        done = 0
+
+        for name, size in zip(spine, sizes):
+            yield SECTION_BREAK
+            parser = _HtmlToMarkdown()
+            with archive.open(name) as stream:
+                reader = io.TextIOWrapper(stream, encoding='utf-8', errors='replace')
+                while True:
+                    chunk = reader.read(_EPUB_CHUNK_CHARS)
+                    if not chunk:
+                        break
+                    parser.feed(chunk)
+                    progress = (done + stream.tell()) / total
+                    for line in parser.pop_lines():
+                        yield line, progress
+                parser.close()
+            done += size
+            for line in parser.pop_lines():
+                yield line, done / total
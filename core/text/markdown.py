@@ -0,0 +1,111 @@
+"""
+Markdown 块级扫描
+按 CommonMark 的块结构规则逐行判断每一行的类型，供切分时使用：
+
+- 只有 # 后跟空格（或行尾）、缩进不超过3格的行才是ATX标题，#include、#5 之类不算
+- 围栏代码块（``` 或 ~~~）内的内容原样保留，其中的 # 注释不会被当作标题
+- 支持Setext标题（文本下一行是 === 或 ---）、列表项、缩进行、YAML front matter 和链接定义
+- 每行只做首字符判断和至多一次预编译正则匹配，不构建语法树，适合大文档
+"""
+
+import re
+
+_ATX_HEADING_PATTERN = re.compile(r' {0,3}(#{1,6})(?:[ \t]+(.*?))?(?:[ \t]+#+)?[ \t]*$')
+_FENCE_OPEN_PATTERN = re.compile(r' {0,3}(`{3,}(?=[^`]*$)|~{3,})')
+_FENCE_CLOSE_PATTERN = re.compile(r' {0,3}(`{3,}|~{3,})[ \t]*$')
+_SETEXT_PATTERN = re.compile(r' {0,3}(=+|-+)[ \t]*$')
+_LIST_ITEM_PATTERN = re.compile(r' {0,3}(?:[-+*]|\d{1,9}[.)])(?:[ \t]|$)')
+_LINK_DEFINITION_PATTERN = re.compile(r' {0,3}\[[^\]]+\]:[ \t]*\S+')
+# 行内链接和图片：保留文字，去掉地址
+_INLINE_LINK_PATTERN = re.compile(r'!?\[([^\]\n]*)\]\([^)\s]*(?:[ \t]+"[^"\n]*")?\)')
+
+# 行的类型
+HEADING = 'heading'
+SETEXT = 'setext'  # Setext标题的下划线，标题文字是前面的段落
+CODE = 'code'  # 围栏代码块内的行（含围栏本身）
+BLANK = 'blank'
+LIST_ITEM = 'list'
+INDENT = 'indent'  # 缩进4格以上：列表的后续内容或缩进代码
+TEXT = 'text'
+META = 'meta'  # front matter 和链接定义，切分时丢弃
+
+_CODE_LINE = (CODE, 0, '')
+_BLANK_LINE = (BLANK, 0, '')
+_INDENT_LINE = (INDENT, 0, '')
+_LIST_ITEM_LINE = (LIST_ITEM, 0, '')
+_TEXT_LINE = (TEXT, 0, '')
+_META_LINE = (META, 0, '')
+
+
+def strip_link_targets(line):
+    """把行内链接和图片替换为其文字，地址对生成卡片没有用处"""
+    if '](' not in line:
+        return line
+    return _INLINE_LINK_PATTERN.sub(r'\1', line)
+
+
+class MarkdownTokenizer:
+    """逐行判断Markdown的块类型，需要按顺序喂入整个文件的每一行"""
+
+    def __init__(self):
+        self.line_number = 0
+        self.previous = BLANK
+        # 当前围栏代码块的 (围栏字符, 长度)
+        self._fence = None
+        self._front_matter = False
+
+    def feed(self, line):
+        """判断一行的类型
+
+        Returns:
+            (类型, 标题级别, 标题文字)，非标题行的级别为0
+        """
+        self.line_number += 1
+        if self._fence is not None:
+            match = _FENCE_CLOSE_PATTERN.match(line)
+            if match:
+                fence = match.group(1)
+                if fence[0] == self._fence[0] and len(fence) >= self._fence[1]:
+                    self._fence = None
+            self.previous = CODE
+            return _CODE_LINE
+        if self._front_matter:
+            if line.rstrip() in ('---', '...'):
+                self._front_matter = False
+            return _META_LINE
+
+        stripped = line.lstrip(' ')
+        if not stripped or stripped.isspace():
+            self.previous = BLANK
+            return _BLANK_LINE
+        if self.line_number == 1 and line.rstrip() == '---':
+            self._front_matter = True
+            return _META_LINE
+        if len(line) - len(stripped) >= 4 or stripped[0] == '\t':
+            self.previous = INDENT
+            return _INDENT_LINE
+
+        first = stripped[0]
+        if first == '#':
+            match = _ATX_HEADING_PATTERN.match(line)
+            if match:
+                self.previous = HEADING
+                return HEADING, len(match.group(1)), (match.group(2) or '').strip()
+        elif first in '`~':
+            match = _FENCE_OPEN_PATTERN.match(line)
+            if match:
+                fence = match.group(1)
+                self._fence = (fence[0], len(fence))
+                self.previous = CODE
+                return _CODE_LINE
+        elif first in '=-' and self.previous == TEXT and _SETEXT_PATTERN.match(line):
+            self.previous = SETEXT
+            return SETEXT, 1 if first == '=' else 2, ''
+        elif first == '[' and self.previous != TEXT and _LINK_DEFINITION_PATTERN.match(line):
+            return _META_LINE
+
+        if first in '-+*0123456789' and _LIST_ITEM_PATTERN.match(line):
+            self.previous = LIST_ITEM
+            return _LIST_ITEM_LINE
+        self.previous = TEXT
+        return _TEXT_LINE
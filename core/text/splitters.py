@@ -0,0 +1,340 @@
+"""
+文件切分模块
+把待处理的文件切成发送给模型的片段，以生成器的形式边读边产出：
+
+- Markdown和TXT按行增量读取，内存占用与文件大小无关，读到第一个片段就可以开始请求
+- DOCX和EPUB先流式转换成Markdown格式的行（见 documents 模块），再走Markdown的切分流程
+- 片段直接以 Section 交给调用方，不再写入临时目录
+- Section.progress 记录片段结束位置占整个文件的比例，用于显示进度（事先不需要知道片段总数）
+"""
+
+import os
+from typing import NamedTuple
+
+from core.text import documents, markdown
+from core.text.cleaning import RepeatedLineFilter, clean_pdf_text
+
+
+class Section(NamedTuple):
+    """文件中的一个片段"""
+    index: int  # 从1开始的序号
+    text: str
+    title: str = ''
+    progress: float = 0.0  # 片段结束位置占整个文件的比例
+    breadcrumb: tuple = ()  # 所在的各级标题，从一级标题到片段自身的标题
+    starts_document: bool = False  # 是否为 SECTION_BREAK 之后（新文档，如EPUB新的一章）的第一个片段
+
+
+# Markdown 按该级别及以上的标题切分，更深的标题留在片段内
+MARKDOWN_SPLIT_LEVEL = 3
+# Markdown 片段非空行数不足该值时与后续片段合并
+MIN_MARKDOWN_LINES = 20
+# 超长的Markdown片段达到该字符数后，在下一个段落开头（空行之后）切开
+MAX_MARKDOWN_CHARS = 20000
+# 一直没有可切分位置（如超长代码块）时，达到该字符数强制切开
+HARD_MAX_MARKDOWN_CHARS = MAX_MARKDOWN_CHARS * 4
+
+# TXT 每个片段的行数，以及末尾合并到前一片段的最小行数
+TXT_LINES_PER_SECTION = 50
+TXT_MIN_SECTION_LINES = 10
+
+# PDF 每个片段的大约字符数，以及最小有效字符数
+PDF_CHARS_PER_SECTION = 3000
+PDF_MIN_CHARS = 500
+
+
+def _iter_lines(path):
+    """按行读取UTF-8文本，返回 (行, 已读取部分占文件的比例)
+
+    进度取自底层缓冲区的读取位置，精度为一个缓冲块，足够显示进度。
+    """
+    total = os.path.getsize(path) or 1
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        raw = f.buffer
+        for line in f:
+            yield line, raw.tell() / total
+
+
+def _join_markdown_lines(lines):
+    """拼接片段的行，连续的空行只保留一个"""
+    parts = []
+    blank = True
+    for line in lines:
+        line = line.rstrip()
+        if not line:
+            if blank:
+                continue
+            blank = True
+        else:
+            blank = False
+        parts.append(line)
+    return '\n'.join(parts).strip()
+
+
+def iter_markdown_sections(path, split_level=MARKDOWN_SPLIT_LEVEL, max_chars=MAX_MARKDOWN_CHARS):
+    """按标题切分Markdown文件"""
+    return split_markdown_lines(_iter_lines(path), split_level, max_chars)
+
+
+def split_markdown_lines(items, split_level=MARKDOWN_SPLIT_LEVEL, max_chars=MAX_MARKDOWN_CHARS):
+    """按标题切分Markdown格式的行，每个片段带有所在的各级标题
+
+    围栏代码块、表格和列表不会被切开：标题只在代码块之外识别，
+    超长片段只在空行之后的普通段落开头切开。
+
+    Args:
+        items: (行, 进度) 的迭代器；遇到 documents.SECTION_BREAK 时结束当前片段，
+            并作为一个新文档重新开始（清空标题层级）
+    """
+    tokenizer = markdown.MarkdownTokenizer()
+    feed = tokenizer.feed
+    HEADING, SETEXT, TEXT, BLANK, META = (
+        markdown.HEADING, markdown.SETEXT, markdown.TEXT, markdown.BLANK, markdown.META,
+    )
+    index = 0
+    # 当前的各级标题 [(级别, 标题)]
+    headings = []
+    breadcrumb = ()
+    lines, chars = [], 0
+    has_content = False
+    # 当前段落在 lines 中的起始位置，Setext标题需要把整段作为标题
+    paragraph_start = 0
+    # 当前段落开始之前片段是否已有正文，段落变成Setext标题时据此判断前面的片段是否为空
+    content_before_paragraph = False
+    # 下一个产出的片段是否开始一个新文档
+    new_document = False
+    previous = BLANK
+    progress = 0.0
+
+    def flush():
+        nonlocal index, new_document
+        if not has_content:
+            return None
+        text = _join_markdown_lines(lines)
+        if not text:
+            return None
+        index += 1
+        section = Section(index, text, breadcrumb[-1] if breadcrumb else '', progress, breadcrumb, new_document)
+        new_document = False
+        return section
+
+    def enter_heading(level, title):
+        while headings and headings[-1][0] >= level:
+            headings.pop()
+        headings.append((level, title))
+        return tuple(title for _, title in headings)
+
+    for item in items:
+        if item is documents.SECTION_BREAK:
+            section = flush()
+            if section:
+                yield section
+            tokenizer = markdown.MarkdownTokenizer()
+            feed = tokenizer.feed
+            headings.clear()
+            breadcrumb = ()
+            lines, chars, has_content = [], 0, False
+            paragraph_start, content_before_paragraph = 0, False
+            previous = BLANK
+            new_document = True
+            continue
+
+        line, position = item
+        kind, level, title = feed(line)
+        if kind is META:
+            continue
+        previous, kind_before = kind, previous
+
+        if kind is SETEXT:
+            paragraph = lines[paragraph_start:]
+            del lines[paragraph_start:]
+            has_content = content_before_paragraph
+            section = flush()
+            if section:
+                yield section
+            title = ' '.join(part.strip() for part in paragraph)
+            breadcrumb = enter_heading(level, title)
+            lines, chars, has_content = paragraph, sum(map(len, paragraph)), False
+            paragraph_start, content_before_paragraph = 0, False
+        elif kind is HEADING and level <= split_level:
+            section = flush()
+            if section:
+                yield section
+            breadcrumb = enter_heading(level, title)
+            lines, chars, has_content = [], 0, False
+            paragraph_start, content_before_paragraph = 0, False
+        elif (
+            chars >= max_chars
+            and ((kind is TEXT or kind is HEADING) and kind_before is BLANK or chars >= HARD_MAX_MARKDOWN_CHARS)
+        ):
+            # 过长时在新段落开头续接一个同标题的片段
+            section = flush()
+            if section:
+                yield section
+            lines, chars, has_content = [], 0, False
+            paragraph_start, content_before_paragraph = 0, False
+
+        if kind is TEXT:
+            if kind_before is not TEXT:
+                paragraph_start = len(lines)
+                content_before_paragraph = has_content
+            has_content = True
+            if '](' in line:
+                line = markdown.strip_link_targets(line)
+        elif kind is HEADING:
+            if level > split_level:
+                enter_heading(level, title)
+            if '](' in line:
+                line = markdown.strip_link_targets(line)
+        elif kind is not BLANK and kind is not SETEXT:
+            has_content = True
+            if kind is markdown.LIST_ITEM and '](' in line:
+                line = markdown.strip_link_targets(line)
+        lines.append(line)
+        chars += len(line)
+        progress = position
+
+    section = flush()
+    if section:
+        yield section._replace(progress=1.0)
+
+
+def merge_short_sections(sections, min_lines=MIN_MARKDOWN_LINES):
+    """把非空行数不足 min_lines 的片段与后续片段合并，重新编号
+
+    不跨越文档边界合并：starts_document 的片段之前先产出已累积的片段。
+    """
+    index = 0
+    pending = None
+    line_count = 0
+    for section in sections:
+        text = section.text.strip()
+        if pending is not None and section.starts_document:
+            index += 1
+            yield pending._replace(index=index)
+            pending = None
+        if pending is None:
+            pending = section._replace(text=text)
+            line_count = 0
+        else:
+            pending = pending._replace(text=pending.text + "\n\n" + text, progress=section.progress)
+        line_count += sum(1 for line in text.split('\n') if line.strip())
+        if line_count >= min_lines:
+            index += 1
+            yield pending._replace(index=index)
+            pending = None
+    if pending is not None:
+        index += 1
+        yield pending._replace(index=index)
+
+
+def iter_text_sections(path, lines_per_section=TXT_LINES_PER_SECTION, min_lines=TXT_MIN_SECTION_LINES):
+    """按固定行数切分TXT，去掉空行；末尾不足 min_lines 行时并入前一个片段"""
+    index = 0
+    pending = None
+    chunk = []
+
+    def take(chunk, progress):
+        nonlocal index, pending
+        if len(chunk) < min_lines:
+            # 只有最后一块会不足，并入前一个片段
+            if pending is not None:
+                pending = pending._replace(text=pending.text + "\n" + ''.join(chunk), progress=progress)
+            return None
+        filtered = [line for line in chunk if line.strip()]
+        if not filtered:
+            return None
+        ready = pending
+        index += 1
+        pending = Section(index, ''.join(filtered), '', progress)
+        return ready
+
+    for line, position in _iter_lines(path):
+        chunk.append(line)
+        if len(chunk) == lines_per_section:
+            ready = take(chunk, position)
+            chunk = []
+            if ready is not None:
+                yield ready
+    if chunk:
+        ready = take(chunk, 1.0)
+        if ready is not None:
+            yield ready
+    if pending is not None:
+        yield pending
+
+
+def iter_pdf_sections(path, chars_per_section=PDF_CHARS_PER_SECTION, min_chars=PDF_MIN_CHARS):
+    """按页累积PDF文本，约 chars_per_section 字符一个片段
+
+    跨页检测重复的页眉页脚需要先提取全部页面，PDF的文本通常远小于文件本身。
+    """
+    from PyPDF2 import PdfReader
+
+    reader = PdfReader(path)
+    page_texts = [page.extract_text() for page in reader.pages]
+    total_pages = len(page_texts) or 1
+    boilerplate = RepeatedLineFilter.from_pages(page_texts)
+
+    index = 0
+    current, current_chars = [], 0
+    for page_number, page_text in enumerate(page_texts, 1):
+        cleaned = clean_pdf_text(page_text, boilerplate)
+        if current_chars >= min_chars and current_chars + len(cleaned) > chars_per_section:
+            index += 1
+            yield Section(index, "\n\n".join(current), '', (page_number - 1) / total_pages)
+            current, current_chars = [], 0
+        current.append(cleaned)
+        current_chars += len(cleaned)
+
+    # 最后不足 min_chars 的内容只在整份文档都很短时单独成段
+    if current_chars >= min_chars or (index == 0 and current_chars > 0):
+        yield Section(index + 1, "\n\n".join(current), '', 1.0)
+
+
+def iter_docx_sections(path):
+    """按标题样式切分DOCX"""
+    return split_markdown_lines(documents.iter_docx_lines(path))
+
+
+def iter_epub_sections(path):
+    """按章节和标题切分EPUB"""
+    return split_markdown_lines(documents.iter_epub_lines(path))
+
+
+_SPLITTERS = {
+    '.md': lambda path: merge_short_sections(iter_markdown_sections(path)),
+    '.txt': iter_text_sections,
+    '.pdf': iter_pdf_sections,
+    '.docx': lambda path: merge_short_sections(iter_docx_sections(path)),
+    '.epub': lambda path: merge_short_sections(iter_epub_sections(path)),
+}
+
+# 可以直接按文本读取的类型，切不出片段时整个文件作为一个片段
+_PLAIN_TEXT_EXTENSIONS = ('.md', '.txt')
+
+
+def get_splitter(path):
+    """按扩展名获取切分函数，不支持的类型返回None"""
+    return _SPLITTERS.get(os.path.splitext(path)[1].lower())
+
+
+def iter_sections(path):
+    """切分文件，逐个产出 Section
+
+    文本文件没有切出任何片段（内容太短或只有标题）时，整个文件作为一个片段。
+    """
+    splitter = get_splitter(path)
+    if splitter is None:
+        raise ValueError(f"不支持的文件类型: {os.path.splitext(path)[1]}")
+
+    count = 0
+    for section in splitter(path):
+        count += 1
+        yield section
+
+    if count == 0 and path.lower().endswith(_PLAIN_TEXT_EXTENSIONS):
+        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+            content = f.read().strip()
+        if content:
+            yield Section(1, content, '', 1.0)
@@ -0,0 +1,52 @@
+"""
+Token数量估算
+不依赖具体模型的分词器，用于进度统计和上下文预算
+"""
+
+import re
+
+# CJK统一表意文字、假名和韩文音节，按每字约1个token计
+_CJK_PATTERN = re.compile(r'[぀-ヿ㐀-䶿一-鿿가-힯豈-﫿]')
+
+
+def estimate_tokens(text):
+    """估算文本的token数量：CJK字符每字1个，其余字符约每4个1个"""
+    if not text:
+        return 0
+    cjk_count = len(_CJK_PATTERN.findall(text))
+    other_count = len(text) - cjk_count
+    return cjk_count + (other_count + 3) // 4
+
+
+def completion_tokens(response, text):
+    """获取一次生成的输出token数，优先使用API返回的统计，没有时按文本估算
+
+    Args:
+        response: API返回的原始响应（OpenAI格式的usage或Ollama的eval_count）
+        text: 提取出的响应文本
+    """
+    if isinstance(response, dict):
+        usage = response.get('usage')
+        if isinstance(usage, dict) and isinstance(usage.get('completion_tokens'), int):
+            return usage['completion_tokens']
+        if isinstance(response.get('eval_count'), int):
+            return response['eval_count']
+    return estimate_tokens(text)
+
+
+# 检索用的词：连续的CJK字符按相邻两字切分，其余按字母数字串切分
+_TERM_PATTERN = re.compile(r'[぀-ヿ㐀-䶿一-鿿가-힯豈-﫿]+|[^\W_぀-ヿ㐀-䶿一-鿿가-힯豈-﫿]+')
+
+
+def index_terms(text):
+    """把文本切分为检索词：CJK文本取相邻两字（单字保留），其他文字取小写的字母数字串"""
+    terms = []
+    for run in _TERM_PATTERN.findall(text.lower()):
+        if _CJK_PATTERN.match(run):
+            if len(run) == 1:
+                terms.append(run)
+            else:
+                terms.extend(run[i:i + 2] for i in range(len(run) - 1))
+        else:
+            terms.append(run)
+    return terms
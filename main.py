@@ -1,27 +1,43 @@
 import sys
+
+from core.profiling import StartupProfiler
+
+# --profile-startup: 按阶段输出启动耗时（到主窗口首次绘制为止）
+profiler = StartupProfiler(enabled='--profile-startup' in sys.argv)
+
 # PyQt5相关导入
 from PyQt5.QtWidgets import (
     QApplication
 )
 
+from core.config import Config
 from core.logging import Logger
 from core.error_handler import ErrorHandler
 from ui.main_window import MainWindow
 
+profiler.mark('导入模块')
+
 if __name__ == '__main__':
     # 初始化日志系统
     Logger.get_instance()
     Logger.info("应用程序启动")
-    import resources
     # 安装全局异常处理器
     ErrorHandler.install_handler()
+    profiler.mark('初始化日志')
+    
+    # 加载配置
+    Config.ensure_loaded()
+    profiler.mark('加载配置')
     
     try:
-        app = QApplication(sys.argv)
-        window = MainWindow()
+        app = QApplication([arg for arg in sys.argv if arg != '--profile-startup'])
+        profiler.mark('创建QApplication')
+        window = MainWindow(profiler)
+        window.first_painted.connect(profiler.report)
         window.show()
+        profiler.mark('显示主窗口')
         Logger.info("主窗口显示")
         sys.exit(app.exec_())
     except Exception as e:
         Logger.error(f"应用程序启动失败: {str(e)}")
-        sys.exit(1)
\ No newline at end of file
+        sys.exit(1)
@@ -0,0 +1,158 @@
+"""
+Markdown切分基准测试
+
+在一个文档目录（递归查找 .md）上对比旧的按行切分（行首为#且#不超过3个即视为标题，跳过含链接的行）
+和 core.text.splitters 的块级扫描切分，输出耗时、片段数，以及旧实现误切分的情况：
+- 代码块中被当作标题的行（# 注释、#include 等）
+- 因为含链接被整行丢掉的行
+
+用法:
+    python tools/bench_markdown_split.py                # 合成 300 个文档
+    python tools/bench_markdown_split.py ~/src/docs     # 真实的文档目录
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from core.text import markdown  # noqa: E402
+from core.text.splitters import iter_markdown_sections  # noqa: E402
+
+_WORDS = ("install", "config", "server", "token", "cache", "index", "request", "handler",
+          "安装", "配置", "缓存", "索引", "请求", "模型", "卡片", "检索")
+
+
+def _legacy_clean(lines):
+    """旧实现的 clean_content：去掉空行，只有标题时返回空"""
+    cleaned = [line.rstrip() + '\n' for line in lines if line.strip()]
+    has_content = any(not line.lstrip().startswith('#') for line in cleaned)
+    return ''.join(cleaned) if has_content else ''
+
+
+def legacy_split(path):
+    """旧实现（FileProcessingTab.split_md_by_title）的切分规则，不写临时文件，返回片段数"""
+    sections = []
+    current = []
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            if line.strip().startswith("#include"):
+                continue
+            if "https://" in line or "http://" in line:
+                continue
+            if line.startswith('#') and line.count('#') in [1, 2, 3]:
+                text = _legacy_clean(current)
+                if text:
+                    sections.append(text)
+                current = [line]
+            else:
+                current.append(line)
+    text = _legacy_clean(current)
+    if text:
+        sections.append(text)
+    return len(sections)
+
+
+def legacy_mistakes(path):
+    """统计旧规则在代码块内误判的标题行，以及因含链接被丢掉的行"""
+    tokenizer = markdown.MarkdownTokenizer()
+    false_headings = dropped_links = 0
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            kind, _, _ = tokenizer.feed(line)
+            if "https://" in line or "http://" in line:
+                dropped_links += kind != markdown.META
+            elif kind == markdown.CODE and line.startswith('#') and line.count('#') in [1, 2, 3]:
+                false_headings += 1
+    return false_headings, dropped_links
+
+
+def _paragraph(rng):
+    words = [rng.choice(_WORDS) for _ in range(rng.randint(8, 40))]
+    if rng.random() < 0.3:
+        words.append(f"[文档](https://example.com/{rng.choice(_WORDS)})")
+    return ' '.join(words) + '.'
+
+
+def synthetic_tree(directory, count, seed=0):
+    """生成类似项目文档的Markdown：多级标题、带注释的代码块、表格、列表和链接"""
+    rng = random.Random(seed)
+    for n in range(count):
+        parts = [f"---\ntitle: doc {n}\n---", f"# Document {n}"]
+        for chapter in range(rng.randint(3, 8)):
+            parts.append(f"## Chapter {chapter}")
+            for _ in range(rng.randint(2, 6)):
+                r = rng.random()
+                if r < 0.15:
+                    parts.append(f"### Topic {rng.choice(_WORDS)}")
+                elif r < 0.35:
+                    body = '\n'.join(f"# step {i}\nrun --{rng.choice(_WORDS)}" for i in range(rng.randint(3, 12)))
+                    parts.append(f"```bash\n{body}\n```")
+                elif r < 0.45:
+                    rows = '\n'.join(f"| {rng.choice(_WORDS)} | {i} |" for i in range(rng.randint(3, 10)))
+                    parts.append(f"| name | value |\n|------|-------|\n{rows}")
+                elif r < 0.55:
+                    parts.append('\n'.join(f"- {_paragraph(rng)}" for _ in range(rng.randint(2, 6))))
+                else:
+                    parts.append(_paragraph(rng))
+        path = os.path.join(directory, f"section{n % 10}", f"doc_{n:04d}.md")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('\n\n'.join(parts) + '\n')
+
+
+def markdown_files(directory):
+    for root, _, files in os.walk(directory):
+        for name in sorted(files):
+            if name.lower().endswith('.md'):
+                yield os.path.join(root, name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Markdown切分基准测试")
+    parser.add_argument('directory', nargs='?', help="文档目录，默认生成合成文档")
+    parser.add_argument('--docs', type=int, default=300, help="合成文档数量")
+    args = parser.parse_args()
+
+    temp_dir = None
+    directory = args.directory
+    if directory is None:
+        temp_dir = directory = tempfile.mkdtemp(prefix='md_bench_')
+        synthetic_tree(directory, args.docs)
+
+    try:
+        files = list(markdown_files(directory))
+        total_bytes = sum(os.path.getsize(path) for path in files)
+        print(f"{len(files)} 个文档，{total_bytes / 1e6:.1f}MB")
+
+        start = time.perf_counter()
+        legacy_sections = sum(legacy_split(path) for path in files)
+        legacy_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        new_sections = sum(1 for path in files for _ in iter_markdown_sections(path))
+        new_time = time.perf_counter() - start
+
+        for name, elapsed, sections in (("旧实现", legacy_time, legacy_sections), ("块级扫描", new_time, new_sections)):
+            print(f"{name}: {elapsed * 1000:.0f}ms ({total_bytes / elapsed / 1e6:.1f}MB/秒)，{sections} 个片段")
+
+        false_headings = dropped_links = 0
+        for path in files:
+            headings, links = legacy_mistakes(path)
+            false_headings += headings
+            dropped_links += links
+        print(f"旧实现误判: 代码块内被当作标题的行 {false_headings}，因含链接被丢掉的行 {dropped_links}")
+    finally:
+        if temp_dir:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""
+PDF文本清理基准测试
+
+对比旧的逐行清理实现（每页两次全文替换，再逐行匹配）和 core.text.cleaning 的逐行单遍实现，
+以及先用 RepeatedLineFilter 跨页去掉重复页眉页脚后的输出大小。
+默认用合成的大页数文本（带页码、页眉和中英文句子），也可以传入真实的PDF文件。
+
+用法:
+    python tools/bench_text_cleaning.py                 # 合成 2000 页
+    python tools/bench_text_cleaning.py --pages 10000
+    python tools/bench_text_cleaning.py book.pdf        # 需要 PyPDF2
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from core.text.cleaning import RepeatedLineFilter, clean_pdf_text  # noqa: E402
+
+_WORDS = ("memory", "review", "interval", "card", "learning", "recall", "spacing", "effect",
+          "记忆", "复习", "间隔", "卡片", "学习", "回忆", "遗忘曲线", "知识点")
+
+
+def legacy_clean_pdf_text(text):
+    """旧实现（FileProcessingTab._clean_pdf_text），仅用于对比"""
+    if not text:
+        return ""
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'(?<=[.!?。！？])\s+', '\n\n', text)
+    lines = text.split('\n')
+    cleaned_lines = []
+    for line in lines:
+        if re.match(r'^\s*\d+\s*$', line):
+            continue
+        if len(line.strip()) < 10 and any(char.isdigit() for char in line):
+            continue
+        cleaned_lines.append(line)
+    return '\n'.join(cleaned_lines)
+
+
+def synthetic_pages(count, seed=0):
+    """生成类似PDF提取结果的页面：页眉、按版面折行的句子、页码"""
+    rng = random.Random(seed)
+    pages = []
+    for number in range(1, count + 1):
+        # 奇数页页眉是章节名，偶数页是书名
+        lines = [f"Chapter {number // 20 + 1}: Memory" if number % 2 else "Spaced Repetition Handbook"]
+        for _ in range(rng.randint(25, 40)):
+            sentence = ' '.join(rng.choice(_WORDS) for _ in range(rng.randint(6, 18)))
+            lines.append(sentence + rng.choice('..。!?？'))
+            if rng.random() < 0.3:
+                lines.append('   ')
+        lines.append("Copyright 2024 Example Press")
+        lines.append(f"  {number}  ")
+        pages.append('\n'.join(lines))
+    return pages
+
+
+def pdf_pages(path):
+    from PyPDF2 import PdfReader
+    return [page.extract_text() or '' for page in PdfReader(path).pages]
+
+
+def measure(func, pages, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = [func(page) for page in pages]
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, output
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PDF文本清理基准测试")
+    parser.add_argument('pdf', nargs='?', help="要测试的PDF文件，默认使用合成文本")
+    parser.add_argument('--pages', type=int, default=2000, help="合成文本的页数")
+    parser.add_argument('--repeat', type=int, default=3, help="重复次数，取最快的一次")
+    args = parser.parse_args()
+
+    pages = pdf_pages(args.pdf) if args.pdf else synthetic_pages(args.pages)
+    total_chars = sum(len(page) for page in pages)
+    print(f"{len(pages)} 页，{total_chars / 1e6:.1f}M 字符")
+
+    legacy_time, legacy_output = measure(legacy_clean_pdf_text, pages, args.repeat)
+    new_time, new_output = measure(clean_pdf_text, pages, args.repeat)
+
+    def clean_with_boilerplate(all_pages):
+        boilerplate = RepeatedLineFilter.from_pages(all_pages)
+        return [clean_pdf_text(page, boilerplate) for page in all_pages]
+
+    filtered_time, filtered_output = measure(clean_with_boilerplate, [pages], args.repeat)
+    filtered_output = filtered_output[0]
+
+    for name, elapsed, output in (
+        ("旧实现", legacy_time, legacy_output),
+        ("逐行单遍", new_time, new_output),
+        ("逐行单遍+跨页页眉页脚", filtered_time, filtered_output),
+    ):
+        chars = sum(len(page) for page in output)
+        print(f"{name}: {elapsed * 1000:.0f}ms ({total_chars / elapsed / 1e6:.1f}M 字符/秒)，输出 {chars} 字符")
+    print(f"加速: {legacy_time / new_time:.2f}x，含跨页检测 {legacy_time / filtered_time:.2f}x")
+
+    # 两种实现都按句末标点分段，段落内容只在页码、页眉页脚的处理上不同
+    legacy_paragraphs = sum(len([p for p in page.split('\n\n') if p.strip()]) for page in legacy_output)
+    new_paragraphs = sum(len(page.split('\n\n')) for page in new_output if page)
+    print(f"段落数: 旧实现 {legacy_paragraphs}，逐行单遍 {new_paragraphs}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""
+导入耗时检查脚本
+
+用 ``python -X importtime`` 在全新的解释器中导入核心模块，检查两件事：
+1. 累计导入耗时不超过预算（毫秒）
+2. 没有加载PyQt5、requests、ollama等重量级依赖
+
+用法:
+    python tools/check_import_time.py            # 检查默认模块
+    python tools/check_import_time.py --budget 80 core.config
+
+任一模块超出预算或加载了禁止的依赖时返回非零退出码，可以放在打包前执行。
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+# 项目根目录
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 需要保持轻量的模块：模块名 -> 累计导入耗时预算（毫秒）
+DEFAULT_BUDGETS = {
+    'core': 30,
+    'core.config': 50,
+    'core.logging': 50,
+    'core.api': 50,
+    'core.api.remote_api_handler': 80,
+    'core.api.ollama_api_handler': 80,
+    'core.services.prompt_registry': 50,
+    'core.services.ollama_supervisor': 80,
+    'core.services.model_downloads': 80,
+}
+
+# 这些模块不应在导入核心模块时被加载
+FORBIDDEN_MODULES = ('PyQt5', 'requests', 'ollama', 'httpx')
+
+
+def measure_import(module_name):
+    """在子进程中导入模块，返回 (累计耗时毫秒, 已加载的顶层模块集合)"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module_name}'],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"导入 {module_name} 失败:\n{result.stderr}")
+
+    cumulative_us = None
+    loaded = set()
+    # 每行格式: "import time:  self [us] | cumulative | imported package"
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name = parts[2].strip()
+        loaded.add(name.split('.')[0])
+        if name == module_name:
+            cumulative_us = int(parts[1])
+
+    # 模块已被其依赖提前导入时不会单独出现，此时视为0
+    return (cumulative_us or 0) / 1000.0, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description="检查核心模块的导入耗时")
+    parser.add_argument('modules', nargs='*', help="要检查的模块，默认检查内置列表")
+    parser.add_argument('--budget', type=float, help="统一的耗时预算（毫秒），覆盖默认值")
+    args = parser.parse_args()
+
+    modules = args.modules or list(DEFAULT_BUDGETS)
+    failed = False
+
+    for module_name in modules:
+        budget = args.budget or DEFAULT_BUDGETS.get(module_name, 80)
+        elapsed, loaded = measure_import(module_name)
+        forbidden = sorted(m for m in FORBIDDEN_MODULES if m in loaded)
+
+        status = "OK"
+        if elapsed > budget or forbidden:
+            status = "FAIL"
+            failed = True
+
+        print(f"[{status}] {module_name}: {elapsed:.1f}ms (预算 {budget:.0f}ms)")
+        if forbidden:
+            print(f"       加载了重量级依赖: {', '.join(forbidden)}")
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,5 +4,6 @@
 """
 
 from ui.components.file_drop_zone import FileDropZone
+from ui.components.log_console import LogConsole
 
-__all__ = ['FileDropZone']
\ No newline at end of file
+__all__ = ['FileDropZone', 'LogConsole']
\ No newline at end of file
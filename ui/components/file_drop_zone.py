@@ -1,23 +1,193 @@
-from PyQt5.QtWidgets import QWidget, QLabel, QVBoxLayout, QListWidget, QListWidgetItem, QPushButton, QHBoxLayout
-from PyQt5.QtCore import Qt, pyqtSignal
-from PyQt5.QtGui import QDragEnterEvent, QDropEvent
+from PyQt5.QtWidgets import QWidget, QLabel, QVBoxLayout, QListView, QStyledItemDelegate, QStyle
+from PyQt5.QtCore import (Qt, pyqtSignal, QAbstractListModel, QModelIndex, QEvent, QRect, QSize,
+                          QObject, QRunnable, QThreadPool)
+from PyQt5.QtGui import QDragEnterEvent, QDropEvent, QColor, QFont, QPen
 import os
 
+# 拖入文件夹时收集的文件类型
+SUPPORTED_EXTENSIONS = ('.md', '.txt', '.pdf', '.docx', '.epub')
+
+
+class FileListModel(QAbstractListModel):
+    """文件列表模型，追加和按行删除都只通知变化的行"""
+
+    PathRole = Qt.UserRole + 1
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._files = []
+        self._file_set = set()  # 用于O(1)去重
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._files)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or not 0 <= index.row() < len(self._files):
+            return None
+        file = self._files[index.row()]
+        if role == Qt.DisplayRole:
+            return os.path.basename(file)
+        if role in (Qt.ToolTipRole, self.PathRole):
+            return file
+        return None
+
+    def files(self):
+        return self._files
+
+    def add_files(self, files):
+        """追加新文件并去重，返回实际添加的文件"""
+        new_files = []
+        for f in files:
+            if f not in self._file_set:
+                self._file_set.add(f)
+                new_files.append(f)
+        if new_files:
+            start = len(self._files)
+            self.beginInsertRows(QModelIndex(), start, start + len(new_files) - 1)
+            self._files.extend(new_files)
+            self.endInsertRows()
+        return new_files
+
+    def remove_row(self, row):
+        """删除指定行，返回被删除的文件"""
+        if not 0 <= row < len(self._files):
+            return None
+        self.beginRemoveRows(QModelIndex(), row, row)
+        file = self._files.pop(row)
+        self._file_set.discard(file)
+        self.endRemoveRows()
+        return file
+
+    def clear(self):
+        self.beginResetModel()
+        self._files = []
+        self._file_set = set()
+        self.endResetModel()
+
+
+class FileItemDelegate(QStyledItemDelegate):
+    """绘制文件名、路径和删除按钮，不为每一行创建控件"""
+
+    remove_requested = pyqtSignal(int)
+
+    ROW_HEIGHT = 48
+    BUTTON_WIDTH = 32
+
+    def button_rect(self, option_rect):
+        return QRect(option_rect.right() - self.BUTTON_WIDTH, option_rect.top(),
+                     self.BUTTON_WIDTH, option_rect.height())
+
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), self.ROW_HEIGHT)
+
+    def paint(self, painter, option, index):
+        painter.save()
+        rect = option.rect
+        hovered = bool(option.state & QStyle.State_MouseOver)
+        if hovered:
+            painter.fillRect(rect, QColor(33, 150, 243, 25))
+
+        # 分隔线
+        painter.setPen(QPen(QColor('#eee')))
+        painter.drawLine(rect.bottomLeft(), rect.bottomRight())
+
+        text_rect = rect.adjusted(8, 4, -self.BUTTON_WIDTH - 4, -4)
+        name_font = QFont(option.font)
+        name_font.setBold(True)
+        painter.setFont(name_font)
+        painter.setPen(option.palette.text().color())
+        name = painter.fontMetrics().elidedText(index.data(Qt.DisplayRole), Qt.ElideMiddle, text_rect.width())
+        painter.drawText(text_rect, Qt.AlignLeft | Qt.AlignTop, name)
+
+        path_font = QFont(option.font)
+        path_font.setPixelSize(11)
+        painter.setFont(path_font)
+        painter.setPen(QColor('#666'))
+        path = painter.fontMetrics().elidedText(index.data(FileListModel.PathRole), Qt.ElideMiddle, text_rect.width())
+        painter.drawText(text_rect, Qt.AlignLeft | Qt.AlignBottom, path)
+
+        # 删除按钮
+        button_rect = self.button_rect(rect)
+        if hovered:
+            painter.fillRect(button_rect, QColor(244, 67, 54, 25))
+        button_font = QFont(option.font)
+        button_font.setBold(True)
+        button_font.setPixelSize(18)
+        painter.setFont(button_font)
+        painter.setPen(QColor('#f44336'))
+        painter.drawText(button_rect, Qt.AlignCenter, '×')
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if (event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton
+                and self.button_rect(option.rect).contains(event.pos())):
+            self.remove_requested.emit(index.row())
+            return True
+        return super().editorEvent(event, model, option, index)
+
+
+class DirectoryScanWorker(QRunnable):
+    """在后台线程中展开拖入的文件夹，分批返回支持的文件
+
+    每批文件带上开始扫描时的批次号，列表清空后迟到的旧批次会被丢弃。
+    """
+
+    class Signals(QObject):
+        batch = pyqtSignal(int, list)
+        finished = pyqtSignal()
+
+    BATCH_SIZE = 200
+
+    def __init__(self, directories, generation=0):
+        super().__init__()
+        self.signals = self.Signals()
+        self.directories = directories
+        self.generation = generation
+        self.cancelled = False
+        self.done = False
+
+    def run(self):
+        batch = []
+        try:
+            for directory in self.directories:
+                for root, dirs, names in os.walk(directory):
+                    if self.cancelled:
+                        return
+                    dirs.sort()  # 保持章节文件的顺序
+                    for name in sorted(names):
+                        if name.lower().endswith(SUPPORTED_EXTENSIONS):
+                            batch.append(os.path.join(root, name))
+                    if len(batch) >= self.BATCH_SIZE:
+                        self.signals.batch.emit(self.generation, batch)
+                        batch = []
+            if batch and not self.cancelled:
+                self.signals.batch.emit(self.generation, batch)
+        except Exception as e:
+            print(f"扫描文件夹失败: {str(e)}")
+        finally:
+            self.done = True
+            self.signals.finished.emit()
+
+
 class FileDropZone(QWidget):
     files_dropped = pyqtSignal(list)
-    
+    file_removed = pyqtSignal(str)
+
     def __init__(self):
         super().__init__()
-        self.files = []
+        self.model = FileListModel(self)
+        self.scan_workers = []
+        # 清空列表时递增，用于丢弃已取消扫描的迟到批次
+        self.scan_generation = 0
         self.init_ui()
-        
+
     def init_ui(self):
         self.setAcceptDrops(True)
         layout = QVBoxLayout(self)
         layout.setContentsMargins(0, 0, 0, 0)
-        
+
         # 添加提示标签
-        self.label = QLabel('拖放文件到这里，目前支持文件：md，txt')
+        self.label = QLabel('拖放文件或文件夹到这里，目前支持文件：md，txt，pdf，docx，epub')
         self.label.setAlignment(Qt.AlignCenter)
         self.label.setStyleSheet("""
             QLabel {
@@ -28,35 +198,39 @@ class FileDropZone(QWidget):
                 background: rgba(0, 0, 0, 0.02);
             }
         """)
-        
-        # 添加文件列表显示区域
-        self.file_list = QListWidget()
+
+        # 添加文件列表显示区域（模型/视图，只绘制可见行）
+        self.file_list = QListView()
+        self.file_list.setModel(self.model)
+        self.delegate = FileItemDelegate(self.file_list)
+        self.delegate.remove_requested.connect(self.remove_row)
+        self.file_list.setItemDelegate(self.delegate)
+        self.file_list.setUniformItemSizes(True)
+        self.file_list.setMouseTracking(True)
+        self.file_list.setSelectionMode(QListView.NoSelection)
         self.file_list.setStyleSheet("""
-            QListWidget {
+            QListView {
                 border: 1px solid #ddd;
                 border-radius: 4px;
                 background: transparent;
                 padding: 4px;
             }
-            QListWidget::item {
-                padding: 8px;
-                border-bottom: 1px solid #eee;
-            }
-            QListWidget::item:hover {
-                background: rgba(33, 150, 243, 0.1);
-            }
         """)
         self.file_list.setMinimumHeight(150)
         self.file_list.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOn)
         self.file_list.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-        
+
         # 将两个组件添加到布局中，它们会重叠显示
         layout.addWidget(self.label)
         layout.addWidget(self.file_list)
-        
+
         # 初始时隐藏文件列表
         self.file_list.hide()
-        
+
+    @property
+    def files(self):
+        return self.model.files()
+
     def dragEnterEvent(self, event: QDragEnterEvent):
         if event.mimeData().hasUrls():
             event.acceptProposedAction()
@@ -69,7 +243,7 @@ class FileDropZone(QWidget):
                     background: rgba(33, 150, 243, 0.1);
                 }
             """)
-    
+
     def dragLeaveEvent(self, event):
         self.label.setStyleSheet("""
             QLabel {
@@ -80,11 +254,16 @@ class FileDropZone(QWidget):
                 background: rgba(0, 0, 0, 0.02);
             }
         """)
-    
+
     def dropEvent(self, event: QDropEvent):
-        files = [url.toLocalFile() for url in event.mimeData().urls()]
-        self.add_files(files)
-        self.files_dropped.emit(files)
+        paths = [url.toLocalFile() for url in event.mimeData().urls()]
+        # 文件直接添加，文件夹交给后台线程展开
+        files = [p for p in paths if not os.path.isdir(p)]
+        directories = [p for p in paths if os.path.isdir(p)]
+        if files:
+            self.files_dropped.emit(self.add_files(files))
+        if directories:
+            self.scan_directories(directories)
         self.label.setStyleSheet("""
             QLabel {
                 color: #666;
@@ -94,79 +273,64 @@ class FileDropZone(QWidget):
                 background: rgba(0, 0, 0, 0.02);
             }
         """)
-    
+
+    def scan_directories(self, directories):
+        """在后台展开文件夹，找到的文件分批加入列表"""
+        worker = DirectoryScanWorker(directories, self.scan_generation)
+        worker.signals.batch.connect(self.on_scan_batch)
+        worker.signals.finished.connect(self.on_scan_finished)
+        self.scan_workers.append(worker)
+        QThreadPool.globalInstance().start(worker)
+
+    def on_scan_batch(self, generation, files):
+        if generation != self.scan_generation:
+            return
+        added = self.add_files(files)
+        if added:
+            self.files_dropped.emit(added)
+
+    def on_scan_finished(self):
+        self.scan_workers = [w for w in self.scan_workers if not w.done]
+
     def add_files(self, files):
-        """添加文件到列表中"""
-        # 追加新文件并去重
-        existing_files = set(self.files)
-        new_files = [f for f in files if f not in existing_files]
-        self.files += new_files
+        """添加文件到列表中，返回实际新增的文件"""
+        added = self.model.add_files(files)
         self.update_file_list()
-    
+        return added
+
     def get_files(self):
-        """获取当前文件列表"""
-        return self.files
-    
+        """获取当前文件列表（副本）"""
+        return list(self.model.files())
+
     def remove_file(self, file):
         """从列表中移除文件"""
-        if file in self.files:
-            self.files.remove(file)
+        files = self.model.files()
+        if file in files:
+            self.remove_row(files.index(file))
+
+    def remove_row(self, row):
+        """移除指定行的文件"""
+        file = self.model.remove_row(row)
+        if file is not None:
             self.update_file_list()
-    
+            self.file_removed.emit(file)
+
     def update_file_list(self):
-        """更新文件列表显示"""
-        self.file_list.clear()
-        
-        if self.files:
-            # 如果有文件，显示文件列表并隐藏提示标签
-            self.label.hide()
-            self.file_list.show()
-            
-            for file in self.files:
-                item = QListWidgetItem()
-                item_widget = QWidget()
-                layout = QHBoxLayout(item_widget)
-                layout.setContentsMargins(0, 0, 0, 0)
-                
-                # 文件名和路径标签
-                file_label = QLabel(f"<b>{os.path.basename(file)}</b><br><span style='color:#666;font-size:11px;'>{file}</span>")
-                file_label.setStyleSheet("""
-                    QLabel {
-                        padding: 8px;
-                        border-bottom: 1px solid #eee;
-                    }
-                """)
-                file_label.setTextFormat(Qt.RichText)
-                layout.addWidget(file_label, 1)
-                
-                # 删除按钮
-                delete_btn = QPushButton('×')
-                delete_btn.setStyleSheet("""
-                    QPushButton {
-                        color: #f44336;
-                        font: bold 18px;
-                        border: none;
-                        min-width: 32px;
-                        max-width: 32px;
-                        padding: 0;
-                    }
-                    QPushButton:hover {
-                        background: rgba(244,67,54,0.1);
-                    }
-                """)
-                delete_btn.clicked.connect(lambda checked, f=file: self.remove_file(f))
-                layout.addWidget(delete_btn)
-                
-                item_widget.setLayout(layout)
-                item.setSizeHint(item_widget.sizeHint())
-                self.file_list.addItem(item)
-                self.file_list.setItemWidget(item, item_widget)
-        else:
-            # 如果没有文件，显示提示标签并隐藏文件列表
-            self.label.show()
-            self.file_list.hide()
-    
+        """根据是否有文件切换提示标签和文件列表"""
+        has_files = self.model.rowCount() > 0
+        self.label.setVisible(not has_files)
+        self.file_list.setVisible(has_files)
+
     def clear_files(self):
-        """清空文件列表"""
-        self.files = []
-        self.update_file_list()
\ No newline at end of file
+        """清空文件列表，并取消正在进行的文件夹扫描"""
+        self.scan_generation += 1
+        for worker in self.scan_workers:
+            worker.cancelled = True
+            for signal in (worker.signals.batch, worker.signals.finished):
+                try:
+                    signal.disconnect()
+                except TypeError:
+                    pass
+        self.scan_workers = []
+        self.model.clear()
+        self.update_file_list()
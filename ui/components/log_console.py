@@ -0,0 +1,188 @@
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPlainTextEdit, QLineEdit, QCheckBox, QLabel
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal
+from PyQt5.QtGui import QTextCursor
+from collections import deque
+
+
+class LogConsole(QWidget):
+    """大批量日志输出控件
+
+    - 新消息先进入缓冲区，由定时器批量写入 QPlainTextEdit，避免每条消息触发一次排版
+    - 视图通过 maximumBlockCount 限制显示行数，完整历史保存在有界的 deque 中
+    - 支持查找（回车跳到下一处）和只显示匹配行的过滤
+
+    对外接口与原来的 QTextEdit 输出区兼容：append / clear / setText / setPlainText / toPlainText。
+    """
+
+    # 历史记录保留的最大行数（用于过滤和查找）
+    MAX_HISTORY_LINES = 100000
+    # 视图中最多显示的行数
+    MAX_VIEW_LINES = 20000
+    # 批量刷新间隔（毫秒）
+    FLUSH_INTERVAL_MS = 100
+    # 过滤输入停顿多久后重新筛选（毫秒）
+    FILTER_DELAY_MS = 200
+
+    # 内部信号：用于从任意线程唤醒刷新定时器
+    _pending_added = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._history = deque(maxlen=self.MAX_HISTORY_LINES)
+        # 待写入的消息：其他线程只 append，GUI线程用 popleft 取出，deque的这两个操作是线程安全的
+        self._pending = deque()
+        self._filter_text = ''  # 当前视图使用的过滤词（小写），空表示不过滤
+        self.init_ui()
+
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(self.FLUSH_INTERVAL_MS)
+        self._flush_timer.timeout.connect(self.flush)
+        self._pending_added.connect(self._schedule_flush)
+
+        self._filter_timer = QTimer(self)
+        self._filter_timer.setSingleShot(True)
+        self._filter_timer.setInterval(self.FILTER_DELAY_MS)
+        self._filter_timer.timeout.connect(self.apply_filter)
+
+    def init_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(4)
+
+        # 查找/过滤栏
+        search_layout = QHBoxLayout()
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText('查找日志（回车查找下一处）')
+        self.search_input.setClearButtonEnabled(True)
+        self.search_input.returnPressed.connect(self.find_next)
+        self.search_input.textChanged.connect(self.on_search_text_changed)
+
+        self.filter_checkbox = QCheckBox('仅显示匹配行')
+        self.filter_checkbox.toggled.connect(self.on_search_text_changed)
+
+        self.line_count_label = QLabel()
+        self.line_count_label.setStyleSheet("color: #666; font-size: 11px;")
+
+        search_layout.addWidget(self.search_input, 1)
+        search_layout.addWidget(self.filter_checkbox)
+        search_layout.addWidget(self.line_count_label)
+        layout.addLayout(search_layout)
+
+        # 日志视图
+        self.view = QPlainTextEdit()
+        self.view.setReadOnly(True)
+        self.view.setUndoRedoEnabled(False)
+        self.view.setMaximumBlockCount(self.MAX_VIEW_LINES)
+        layout.addWidget(self.view)
+
+    # ---- 与QTextEdit兼容的接口 ----
+
+    def append(self, text):
+        """追加一条消息（可以包含多行），可在任意线程调用"""
+        self._pending.append(str(text))
+        self._pending_added.emit()
+
+    def setText(self, text):
+        self.setPlainText(text)
+
+    def setPlainText(self, text):
+        """清空后显示指定内容"""
+        self.clear()
+        self._history.extend(str(text).split('\n'))
+        self._refresh_view()
+
+    def clear(self):
+        self._pending.clear()
+        self._history.clear()
+        self.view.clear()
+        self._update_line_count()
+
+    def toPlainText(self):
+        self.flush()
+        return '\n'.join(self._history)
+
+    def setPlaceholderText(self, text):
+        self.view.setPlaceholderText(text)
+
+    # ---- 批量刷新 ----
+
+    def _schedule_flush(self):
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def flush(self):
+        """将缓冲区中的消息一次性写入视图"""
+        if not self._pending:
+            return
+        # 逐条取出而不是替换整个缓冲区，取出期间其他线程追加的消息不会丢失
+        pending = []
+        popleft = self._pending.popleft
+        while True:
+            try:
+                pending.append(popleft())
+            except IndexError:
+                break
+        lines = '\n'.join(pending).split('\n')
+        self._history.extend(lines)
+
+        if self._is_filtering():
+            lines = [line for line in lines if self._matches(line)]
+        # 超出视图容量的行写入后也会立即被丢弃
+        lines = lines[-self.MAX_VIEW_LINES:]
+        if lines:
+            scrollbar = self.view.verticalScrollBar()
+            at_bottom = scrollbar.value() >= scrollbar.maximum() - 4
+            self.view.appendPlainText('\n'.join(lines))
+            if at_bottom:
+                scrollbar.setValue(scrollbar.maximum())
+        self._update_line_count()
+
+    # ---- 查找和过滤 ----
+
+    def _is_filtering(self):
+        return bool(self._filter_text)
+
+    def _matches(self, line):
+        return self._filter_text in line.lower()
+
+    def on_search_text_changed(self, *args):
+        self._filter_timer.start()
+
+    def apply_filter(self):
+        """按查找内容重新筛选显示的行"""
+        filter_text = ''
+        if self.filter_checkbox.isChecked():
+            filter_text = self.search_input.text().strip().lower()
+        self.flush()
+        # 只在显示的行集合变化时重建视图，单纯查找不需要
+        if filter_text != self._filter_text:
+            self._filter_text = filter_text
+            self._refresh_view()
+
+    def _refresh_view(self):
+        if self._is_filtering():
+            lines = [line for line in self._history if self._matches(line)]
+        else:
+            lines = self._history
+        # 视图只能容纳MAX_VIEW_LINES行，只写入最后一部分
+        lines = list(lines)[-self.MAX_VIEW_LINES:]
+        self.view.setPlainText('\n'.join(lines))
+        self.view.verticalScrollBar().setValue(self.view.verticalScrollBar().maximum())
+        self._update_line_count()
+
+    def find_next(self):
+        """查找下一处匹配，到达末尾后从头开始"""
+        text = self.search_input.text().strip()
+        if not text:
+            return
+        self.flush()
+        if not self.view.find(text):
+            cursor = self.view.textCursor()
+            cursor.movePosition(QTextCursor.Start)
+            self.view.setTextCursor(cursor)
+            self.view.find(text)
+
+    def _update_line_count(self):
+        shown = 0 if self.view.document().isEmpty() else self.view.blockCount()
+        self.line_count_label.setText(f"显示 {shown} / 共 {len(self._history)} 行")
@@ -3,9 +3,11 @@
 """
 
 from ui.dialogs.api_config import ApiConfigDialog
+from ui.dialogs.card_search import CardSearchDialog
 # 添加其他对话框导入...
 
 __all__ = [
     'ApiConfigDialog',
+    'CardSearchDialog',
     # 其他对话框...
 ]
\ No newline at end of file
@@ -226,11 +226,9 @@ class ApiConfigDialog(QDialog):
         
         try:
             handler = RemoteAPIHandler()
-            # 测试模型列表API是否可访问
-            if "deepseek.com" in url.lower():
-                response = handler._get_request("/v1/models")
-            else:
-                response = handler._get_request("/models")
+            # 测试模型列表API是否可访问，结果同时写入模型目录缓存
+            from core.services.model_catalog import ModelCatalog
+            response = ModelCatalog.refresh_remote(handler, url)
             
             # 恢复旧配置
             Config.REMOTE_API_URL = old_url
@@ -244,13 +242,7 @@ class ApiConfigDialog(QDialog):
                 self.connection_status.setStyleSheet("color: green;")
                 
                 # 如果能解析出模型列表，自动填充第一个模型
-                available_models = []
-                if "data" in response and isinstance(response["data"], list):
-                    # OpenAI格式
-                    available_models = [m.get("id") for m in response["data"] if m.get("id")]
-                elif "models" in response and isinstance(response["models"], list):
-                    # 通用格式
-                    available_models = [m.get("name") for m in response["models"] if m.get("name")]
+                available_models = response.get("models", [])
                     
                 if available_models:
                     # 只填充第一个模型
@@ -0,0 +1,226 @@
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit,
+    QListWidget, QListWidgetItem, QDialogButtonBox, QPushButton
+)
+from PyQt5.QtCore import Qt, QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+from datetime import datetime
+import os
+
+from core.config import Config
+from core.storage.card_store import CardStore
+
+
+class CardIngestWorker(QRunnable):
+    """在后台增量导入输出目录中的CSV文件"""
+
+    class Signals(QObject):
+        finished = pyqtSignal(dict)
+
+    def __init__(self, store, directory):
+        super().__init__()
+        self.signals = self.Signals()
+        self.store = store
+        self.directory = directory
+        self.cancelled = False
+
+    def run(self):
+        try:
+            stats = self.store.ingest_directory(self.directory, should_stop=lambda: self.cancelled)
+        except Exception as e:
+            stats = {"error": str(e)}
+        finally:
+            self.store.close()
+        self.signals.finished.emit(stats)
+
+
+class RelatedCardsWorker(QRunnable):
+    """在后台用嵌入模型检索与某张卡片语义相关的卡片"""
+
+    class Signals(QObject):
+        finished = pyqtSignal(dict)
+
+    def __init__(self, store, model, card, limit):
+        super().__init__()
+        self.signals = self.Signals()
+        self.store = store
+        self.model = model
+        self.card = card
+        self.limit = limit
+
+    def run(self):
+        try:
+            from core.services.card_embeddings import CardEmbeddings
+            embeddings = CardEmbeddings(self.model)
+            # 为还没有向量的卡片补齐向量（只检查上次之后写入卡片库的新卡片）
+            embeddings.index_store(self.store)
+            matches = embeddings.related(self.card, k=self.limit)
+            cards = self.store.cards_by_hash(card_hash for card_hash, _ in matches)
+            # 卡片库中已删除的卡片不再显示
+            result = {"cards": [(cards[card_hash], score) for card_hash, score in matches if card_hash in cards]}
+        except Exception as e:
+            result = {"error": str(e)}
+        finally:
+            self.store.close()
+        self.signals.finished.emit(result)
+
+
+class CardSearchDialog(QDialog):
+    """在卡片库中全文检索所有生成过的卡片"""
+
+    # 输入停顿多久后开始检索（毫秒）
+    SEARCH_DELAY_MS = 250
+    RESULT_LIMIT = 200
+    RELATED_LIMIT = 20
+
+    def __init__(self, parent=None, output_dir=None, store=None):
+        super().__init__(parent)
+        self.store = store or CardStore.default()
+        self.output_dir = output_dir
+        self.ingest_worker = None
+        self.related_worker = None
+        self.cards = []
+        self.setWindowTitle("搜索卡片库")
+        self.setMinimumSize(640, 480)
+
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(self.SEARCH_DELAY_MS)
+        self.search_timer.timeout.connect(self.run_search)
+
+        self.init_ui()
+        self.start_ingest()
+        self.run_search()
+
+    def init_ui(self):
+        layout = QVBoxLayout(self)
+
+        search_layout = QHBoxLayout()
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("输入关键词搜索问题和答案（多个词用空格分隔）")
+        self.search_input.setClearButtonEnabled(True)
+        self.search_input.textChanged.connect(lambda: self.search_timer.start())
+        search_layout.addWidget(self.search_input)
+        # 配置了嵌入模型时可以按语义查找相关卡片
+        self.related_btn = QPushButton("查找相关卡片")
+        self.related_btn.setToolTip(
+            f"用嵌入模型 {Config.EMBEDDING_MODEL} 检索与选中卡片语义相近的卡片"
+            if Config.EMBEDDING_MODEL else "需要先在文件处理页填写嵌入模型"
+        )
+        self.related_btn.setEnabled(False)
+        self.related_btn.clicked.connect(self.find_related)
+        search_layout.addWidget(self.related_btn)
+        layout.addLayout(search_layout)
+
+        self.status_label = QLabel("")
+        self.status_label.setStyleSheet("color: #666; font-size: 11px;")
+        layout.addWidget(self.status_label)
+
+        self.result_list = QListWidget()
+        self.result_list.setWordWrap(True)
+        self.result_list.setStyleSheet('''
+            QListWidget::item {
+                padding: 6px;
+                border-bottom: 1px solid #eee;
+            }
+        ''')
+        self.result_list.currentRowChanged.connect(self.update_related_button)
+        layout.addWidget(self.result_list)
+
+        button_box = QDialogButtonBox(QDialogButtonBox.Close)
+        button_box.rejected.connect(self.reject)
+        layout.addWidget(button_box)
+
+    def start_ingest(self):
+        """先在后台导入输出目录中新增或修改过的CSV"""
+        if not self.output_dir:
+            return
+        self.status_label.setText("正在更新卡片库...")
+        self.ingest_worker = CardIngestWorker(self.store, self.output_dir)
+        self.ingest_worker.signals.finished.connect(self.on_ingest_finished)
+        QThreadPool.globalInstance().start(self.ingest_worker)
+
+    def on_ingest_finished(self, stats):
+        self.ingest_worker = None
+        if 'error' in stats:
+            self.status_label.setText(f"更新卡片库失败: {stats['error']}")
+            return
+        if stats.get('ingested'):
+            print(f"卡片库已导入 {stats['ingested']} 个CSV文件，共 {stats['cards']} 张卡片")
+        self.run_search()
+
+    def run_search(self):
+        query = self.search_input.text().strip()
+        try:
+            results = self.store.search(query, limit=self.RESULT_LIMIT)
+            total = self.store.count()
+        except Exception as e:
+            self.status_label.setText(f"搜索失败: {str(e)}")
+            return
+
+        self.show_cards(results)
+
+        if self.ingest_worker is not None:
+            return
+        if query:
+            more = "（仅显示前{}条）".format(self.RESULT_LIMIT) if len(results) >= self.RESULT_LIMIT else ""
+            self.status_label.setText(f"找到 {len(results)} 张卡片{more}，卡片库共 {total} 张")
+        else:
+            self.status_label.setText(f"卡片库共 {total} 张卡片，显示最新的 {len(results)} 张")
+
+    def show_cards(self, cards, scores=None):
+        """显示卡片列表，scores为对应的语义相似度"""
+        self.cards = cards
+        self.result_list.clear()
+        for i, card in enumerate(cards):
+            text = f"问：{card['question']}\n答：{card['answer']}"
+            if scores is not None:
+                text = f"[{scores[i]:.2f}] {text}"
+            item = QListWidgetItem(text)
+            created = datetime.fromtimestamp(card['created_at']).strftime('%Y-%m-%d %H:%M')
+            item.setToolTip(
+                f"来源: {os.path.basename(card['source_file']) or '-'}\n"
+                f"模型: {card['model'] or '-'}\n"
+                f"时间: {created}\n"
+                f"文件: {card['csv_path']}"
+            )
+            item.setData(Qt.UserRole, card['id'])
+            self.result_list.addItem(item)
+        self.update_related_button()
+
+    def update_related_button(self, *args):
+        self.related_btn.setEnabled(
+            bool(Config.EMBEDDING_MODEL) and self.related_worker is None and self.result_list.currentRow() >= 0
+        )
+
+    def find_related(self):
+        row = self.result_list.currentRow()
+        if row < 0 or row >= len(self.cards):
+            return
+        from core.services.card_embeddings import CardEmbeddings
+        if not CardEmbeddings.available():
+            self.status_label.setText("查找相关卡片需要安装numpy")
+            return
+        card = self.cards[row]
+        self.status_label.setText(f"正在查找与「{card['question'][:30]}」相关的卡片（首次使用需要为卡片库生成向量）...")
+        self.related_worker = RelatedCardsWorker(self.store, Config.EMBEDDING_MODEL, card, self.RELATED_LIMIT)
+        self.related_worker.signals.finished.connect(lambda result: self.on_related_finished(card, result))
+        self.update_related_button()
+        QThreadPool.globalInstance().start(self.related_worker)
+
+    def on_related_finished(self, card, result):
+        self.related_worker = None
+        if 'error' in result:
+            self.status_label.setText(f"查找相关卡片失败: {result['error']}")
+            self.update_related_button()
+            return
+        matches = result['cards']
+        self.show_cards([card] + [match for match, _ in matches], [1.0] + [score for _, score in matches])
+        self.status_label.setText(
+            f"与「{card['question'][:30]}」语义相关的 {len(matches)} 张卡片（方括号中为相似度，修改搜索词返回检索结果）"
+        )
+
+    def done(self, result):
+        if self.ingest_worker is not None:
+            self.ingest_worker.cancelled = True
+        self.search_timer.stop()
+        super().done(result)
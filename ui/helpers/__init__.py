@@ -1,6 +1,8 @@
 from ui.helpers.ui_helper import UIHelper
+from ui.helpers.resource_loader import ResourceLoader
 
 __all__ = [
     'UIHelper',
+    'ResourceLoader',
 ]
 
@@ -0,0 +1,56 @@
+"""
+Qt资源加载模块
+按需注册应用内嵌资源（收款码图片等），避免启动时解析庞大的资源模块
+"""
+
+import os
+import sys
+
+from PyQt5.QtCore import QResource
+
+from core.logging import Logger
+
+
+class ResourceLoader:
+    """Qt资源的延迟加载器
+
+    优先注册编译好的二进制资源文件 resources/resources.rcc，
+    不存在时回退到导入 pyrcc5 生成的 resources.py 模块。
+    """
+
+    RCC_FILE_NAME = 'resources.rcc'
+
+    _loaded = False
+
+    @staticmethod
+    def get_resources_dir():
+        """获取资源目录的路径，兼容PyInstaller打包后的运行环境"""
+        base_dir = getattr(sys, '_MEIPASS', None)
+        if base_dir is None:
+            base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        return os.path.join(base_dir, 'resources')
+
+    @classmethod
+    def ensure_loaded(cls):
+        """确保Qt资源已注册，多次调用只会加载一次
+
+        Returns:
+            bool: 资源是否可用
+        """
+        if cls._loaded:
+            return True
+
+        rcc_path = os.path.join(cls.get_resources_dir(), cls.RCC_FILE_NAME)
+        if os.path.exists(rcc_path) and QResource.registerResource(rcc_path):
+            Logger.info(f"已注册二进制资源文件: {rcc_path}")
+            cls._loaded = True
+            return True
+
+        try:
+            # 导入时会自动调用 qInitResources() 完成注册
+            import resources  # noqa: F401
+            Logger.info("已加载内嵌资源模块 resources.py")
+            cls._loaded = True
+        except Exception as e:
+            Logger.error(f"加载Qt资源失败: {str(e)}")
+        return cls._loaded
@@ -12,7 +12,7 @@ from PyQt5.QtWidgets import (
     QDialogButtonBox, QApplication, QCheckBox
 )
 
-from PyQt5.QtCore import Qt, pyqtSignal, QObject, QThread, QUrl
+from PyQt5.QtCore import Qt, pyqtSignal, QObject, QThread, QUrl, QTimer
 from PyQt5.QtGui import QDesktopServices
 import core
 from core import Config
@@ -23,6 +23,9 @@ from ui.helpers import UIHelper
 # 导入对话框组件
 from ui.dialogs import ApiConfigDialog
 from core import ModelLoader
+from core.services.model_catalog import ModelCatalog
+from core.services.ollama_supervisor import OllamaSupervisor
+from ui.services.ollama_signals import OllamaSupervisorSignals
 # 导入核心组件
 from core.config_manager import ConfigManager
 from core.logging import Logger
@@ -32,8 +35,22 @@ from core.api import get_api_handler
 from core import OllamaModelManager
 
 class MainWindow(QMainWindow):
-    def __init__(self):
+    # 主窗口首次绘制完成后发出
+    first_painted = pyqtSignal()
+    
+    def __init__(self, profiler=None):
         super().__init__()
+        # 启动耗时分析器（可选）
+        self.profiler = profiler
+        # 首次绘制后才执行的后台任务
+        self.first_paint_done = False
+        self.post_paint_tasks = []
+        # 尚未构建的标签页：占位控件 -> (标签页类, 标题)
+        self.pending_tabs = {}
+        
+        # 确保配置已加载，避免后续保存时覆盖用户配置
+        Config.ensure_loaded()
+        
         # 初始化管理器和助手类
         self.model_manager = OllamaModelManager(self)
         # self.model_selector_helper = ModelSelectorHelper()
@@ -48,8 +65,9 @@ class MainWindow(QMainWindow):
         # 初始化API处理器
         self.api_handler = get_api_handler()
         
-        # 缓存本地模型列表
-        self.local_models_cache = []
+        # 缓存本地模型列表（先使用磁盘上的模型目录缓存，后台再刷新）
+        cached_models, self.local_models_fresh = ModelCatalog.get_cached(ModelCatalog.local_key())
+        self.local_models_cache = cached_models or []
         # 创建主布局
         main_widget = QWidget()
         self.setCentralWidget(main_widget)
@@ -62,6 +80,7 @@ class MainWindow(QMainWindow):
 
         # 顶部控制栏
         self.create_top_control_panel()
+        self.mark_startup_phase('创建顶部控制栏')
 
         # 初始化UI状态 - 根据当前模型来源设置标签和按钮可见性
         self.update_ui_for_model_source(Config.MODEL_SOURCE)
@@ -77,12 +96,14 @@ class MainWindow(QMainWindow):
 
         # 初始化选项卡
         self.create_tab_widget()
+        self.mark_startup_phase('创建选项卡')
         
         # 添加操作面板
         self.create_control_panel()
         
         # 根据当前模型来源初始化选择器
         self.initialize_model_selector()
+        self.mark_startup_phase('初始化模型选择器')
         
         # 如果当前是远程API模式，确保加载远程配置
         if Config.MODEL_SOURCE == '远程API模型':
@@ -99,14 +120,46 @@ class MainWindow(QMainWindow):
                 self.update_remote_config_selector()
                 self.update_remote_models()
             else:
-                # 如果没有远程配置，提示用户添加配置
-                QMessageBox.information(self, "远程API模型配置", 
-                                      "您需要先配置远程API连接信息才能使用远程模型。",
-                                      QMessageBox.Ok)
-                self.open_api_config_dialog(is_new_config=True)
+                # 如果没有远程配置，等主窗口显示后再提示用户添加配置
+                self.run_after_first_paint(self.prompt_for_remote_config)
         
 
     
+    def mark_startup_phase(self, phase):
+        """记录启动阶段耗时（仅在 --profile-startup 模式下生效）"""
+        if self.profiler is not None:
+            self.profiler.mark(phase)
+    
+    def run_after_first_paint(self, task):
+        """将任务推迟到主窗口首次绘制之后执行"""
+        if self.first_paint_done:
+            task()
+        else:
+            self.post_paint_tasks.append(task)
+    
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self.first_paint_done:
+            self.first_paint_done = True
+            # 让出事件循环，保证首帧先呈现再开始后台任务
+            QTimer.singleShot(0, self.on_first_paint)
+    
+    def on_first_paint(self):
+        """首次绘制完成后启动被推迟的后台任务"""
+        self.mark_startup_phase('首次绘制')
+        self.first_painted.emit()
+        
+        tasks, self.post_paint_tasks = self.post_paint_tasks, []
+        for task in tasks:
+            task()
+    
+    def prompt_for_remote_config(self):
+        """提示用户添加远程API配置"""
+        QMessageBox.information(self, "远程API模型配置", 
+                              "您需要先配置远程API连接信息才能使用远程模型。",
+                              QMessageBox.Ok)
+        self.open_api_config_dialog(is_new_config=True)
+    
     def create_top_control_panel(self):
         """创建顶部控制面板"""
         # 顶部控制栏 - 使用UIHelper创建带边框的面板
@@ -242,11 +295,13 @@ class MainWindow(QMainWindow):
                 # 显示加载状态并初始化加载器
                 self.model_selector.addItem('加载本地模型中...')
                 self.model_selector.setEnabled(False)
-                # 初始化模型加载器
-                self.init_model_loader()
+                # 首次绘制后再启动模型加载器
+                self.run_after_first_paint(self.init_model_loader)
             else:
-                # 使用缓存填充
+                # 使用缓存立即填充，缓存过期时在首次绘制后后台刷新
                 self.populate_model_selector_from_cache()
+                if not self.local_models_fresh:
+                    self.run_after_first_paint(self.init_model_loader)
         else:
             # 远程API模式，初始化配置选择器
             self.update_remote_config_selector()
@@ -294,8 +349,9 @@ class MainWindow(QMainWindow):
         if source == 'Ollama本地模型':
             # 检查是否有缓存
             if self.local_models_cache:
-                print("使用本地模型缓存，跳过加载过程")
+                print("使用本地模型缓存，后台刷新模型列表")
                 self.populate_model_selector_from_cache()
+                self.init_model_loader()
             else:
                 # 没有缓存，需要加载
                 self.model_selector.addItem('加载本地模型中...')
@@ -476,13 +532,11 @@ class MainWindow(QMainWindow):
             QMessageBox.information(self, "刷新模型", "只有在本地模型模式下才能刷新模型列表。", QMessageBox.Ok)
             return
             
-        # 清空缓存
-        self.local_models_cache = []
-        
-        # 显示加载状态
-        self.model_selector.clear()
-        self.model_selector.addItem('加载本地模型中...')
-        self.model_selector.setEnabled(False)
+        # 有缓存时保留当前列表可用，只在后台刷新；没有缓存时显示加载状态
+        if not self.local_models_cache:
+            self.model_selector.clear()
+            self.model_selector.addItem('加载本地模型中...')
+            self.model_selector.setEnabled(False)
         
         # 重新加载模型
         self.init_model_loader()
@@ -491,6 +545,9 @@ class MainWindow(QMainWindow):
         print("手动刷新本地模型列表")
 
     def init_model_loader(self):
+        # 已有刷新在进行时不重复启动
+        if hasattr(self, 'loader_thread') and self.loader_thread.isRunning():
+            return
         self.loader_thread = QThread()
         self.model_loader = ModelLoader(self.api_handler)
         self.model_loader.moveToThread(self.loader_thread)
@@ -498,32 +555,36 @@ class MainWindow(QMainWindow):
         self.model_loader.finished.connect(self.on_models_loaded)
         self.loader_thread.start()
 
-    def on_models_loaded(self, models):
-        self.model_selector.clear()
-        self.model_selector.setEnabled(True)  # 重新启用选择器
+    def on_models_loaded(self, models, changed=True):
+        self.loader_thread.quit()
+        self.loader_thread.wait()
         
         if models:
             # 更新缓存
             self.local_models_cache = models.copy()
+            self.local_models_fresh = True
             print(f"成功加载并缓存{len(models)}个本地模型")
             
-            self.model_selector.addItems(models)
+            # 模式已切换时只更新缓存
+            if Config.MODEL_SOURCE != 'Ollama本地模型':
+                return
             
-            # 如果有默认模型，选择它
-            if Config.SELECTED_MODEL in models:
-                self.model_selector.setCurrentText(Config.SELECTED_MODEL)
-            elif models:
-                # 否则选择第一个模型并更新配置
-                first_model = models[0]
-                self.model_selector.setCurrentText(first_model)
-                ConfigManager.select_model(first_model)
-        else:
+            # 列表没有变化且选择器已显示这些模型时不重建选择器
+            shown = [self.model_selector.itemText(i) for i in range(self.model_selector.count())]
+            if changed or shown != models:
+                self.populate_model_selector_from_cache()
+            self.model_selector.setEnabled(True)
+        elif self.local_models_cache:
+            # 刷新失败但有缓存，继续使用缓存的列表
+            print("刷新本地模型列表失败，继续使用缓存的模型列表")
+            if Config.MODEL_SOURCE == 'Ollama本地模型':
+                self.model_selector.setEnabled(True)
+        elif Config.MODEL_SOURCE == 'Ollama本地模型':
             # 加载失败时显示错误信息并提供解决方案
+            self.model_selector.clear()
+            self.model_selector.setEnabled(True)
             self.model_selector.addItem('模型加载失败')
             self.offer_ollama_solutions()
-            
-        self.loader_thread.quit()
-        self.loader_thread.wait()
     
     def offer_ollama_solutions(self):
         """当Ollama模型加载失败时提供解决方案选项"""
@@ -553,7 +614,7 @@ class MainWindow(QMainWindow):
             self.install_ollama()
     
     def start_ollama_service(self):
-        """尝试启动Ollama服务"""
+        """尝试启动Ollama服务（探测和启动在后台进行，对话框只显示进度）"""
         try:
             Logger.info("尝试启动Ollama服务")
             
@@ -571,6 +632,7 @@ class MainWindow(QMainWindow):
             
             # 添加状态文本
             status_label = QLabel("准备启动...")
+            status_label.setWordWrap(True)
             layout.addWidget(status_label)
             
             # 添加进度条
@@ -583,200 +645,63 @@ class MainWindow(QMainWindow):
             button_box.rejected.connect(dialog.reject)
             layout.addWidget(button_box)
             
-            # 显示对话框但不阻塞
-            dialog.show()
-            QApplication.processEvents()
-            
-            # 尝试启动Ollama服务
-            import platform
-            import subprocess
-            
-            system = platform.system().lower()
-            
-            if system == "windows":
-                # Windows系统
-                status_label.setText("在Windows上尝试启动Ollama服务...")
-                QApplication.processEvents()
+            def stop_progress():
+                progress.setRange(0, 100)
+                progress.setValue(100)
+            
+            def on_ready(model_count):
+                stop_progress()
+                if model_count:
+                    status_label.setText("Ollama服务已运行，检测到可用模型。")
+                    status_label.setStyleSheet("color: green;")
+                else:
+                    status_label.setText("Ollama服务已运行，但未检测到模型。")
+                    status_label.setStyleSheet("color: #FF8C00;")  # 橙色
                 
-                # 首先检查是否有模型
-                try:
-                    # 尝试访问Ollama API获取模型列表
-                    import requests
-                    response = requests.get("http://localhost:11434/api/tags", timeout=3)
-                    if response.status_code == 200:
-                        # 服务已经在运行，检查是否有模型
-                        models = response.json().get('models', [])
-                        if models:
-                            # 有模型，服务正常运行
-                            status_label.setText("Ollama服务已运行，检测到可用模型。")
-                            status_label.setStyleSheet("color: green;")
-                            
-                            # 添加刷新按钮
-                            refresh_btn = button_box.addButton("刷新模型列表", QDialogButtonBox.ActionRole)
-                            refresh_btn.clicked.connect(lambda: self.refresh_after_service_start(dialog))
-                            return
-                        else:
-                            # 服务运行但没有模型
-                            status_label.setText("Ollama服务已运行，但未检测到模型。")
-                            status_label.setStyleSheet("color: #FF8C00;")  # 橙色
-                            
-                            # 添加安装模型按钮
-                            install_btn = button_box.addButton("安装模型", QDialogButtonBox.ActionRole)
-                            install_btn.clicked.connect(lambda: self.install_model_from_dialog(dialog))
-                    else:
-                        # 服务未运行或返回错误
-                        status_label.setText("Ollama服务未运行，尝试启动...")
-                        QApplication.processEvents()
-                except requests.exceptions.ConnectionError:
-                    # 服务未运行
-                    status_label.setText("Ollama服务未运行，尝试启动...")
-                    QApplication.processEvents()
+                # 添加安装模型和刷新按钮
+                install_btn = button_box.addButton("安装模型", QDialogButtonBox.ActionRole)
+                install_btn.clicked.connect(lambda: self.install_model_from_dialog(dialog))
+                refresh_btn = button_box.addButton("刷新模型列表", QDialogButtonBox.ActionRole)
+                refresh_btn.clicked.connect(lambda: self.refresh_after_service_start(dialog))
                 
-                # 尝试静默启动服务
-                try:
-                    # 使用subprocess.Popen静默启动服务
-                    startupinfo = subprocess.STARTUPINFO()
-                    startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-                    startupinfo.wShowWindow = subprocess.SW_HIDE
-                    
-                    # 使用shell=True但隐藏窗口
-                    process = subprocess.Popen(
-                        ["ollama", "serve"],
-                        startupinfo=startupinfo,
-                        shell=True,
-                        stdout=subprocess.PIPE,
-                        stderr=subprocess.PIPE,
-                        creationflags=subprocess.CREATE_NO_WINDOW
-                    )
-                    
-                    status_label.setText("Ollama服务启动命令已执行，正在检查服务是否运行...")
-                    QApplication.processEvents()
-                    
-                    # 等待几秒让服务有时间启动
-                    import time
-                    time.sleep(2)
-                    
-                    # 检查服务是否启动成功
-                    try:
-                        response = requests.get("http://localhost:11434/api/tags", timeout=3)
-                        if response.status_code == 200:
-                            # 服务已经启动成功
-                            status_label.setText("Ollama服务已成功启动，您现在可以安装或使用模型。")
-                            status_label.setStyleSheet("color: green;")
-                            
-                            # 添加安装模型和刷新按钮
-                            install_btn = button_box.addButton("安装模型", QDialogButtonBox.ActionRole)
-                            install_btn.clicked.connect(lambda: self.install_model_from_dialog(dialog))
-                            
-                            refresh_btn = button_box.addButton("刷新模型列表", QDialogButtonBox.ActionRole)
-                            refresh_btn.clicked.connect(lambda: self.refresh_after_service_start(dialog))
-                        else:
-                            # 服务启动但返回错误状态码
-                            status_label.setText(f"服务启动但返回错误状态码: {response.status_code}")
-                            status_label.setStyleSheet("color: red;")
-                            
-                            # 添加手动启动指南按钮
-                            manual_btn = button_box.addButton("手动启动指南", QDialogButtonBox.ActionRole)
-                            manual_btn.clicked.connect(self.show_manual_windows_start_guide)
-                    except requests.exceptions.ConnectionError:
-                        # 服务可能未成功启动
-                        status_label.setText("无法连接到Ollama服务，请检查是否安装了Ollama。")
-                        status_label.setStyleSheet("color: red;")
-                        
-                        # 尝试检查Ollama是否已安装
-                        check_result = subprocess.run(["where", "ollama"], capture_output=True, text=True, shell=True)
-                        if "ollama.exe" in check_result.stdout:
-                            # Ollama已安装但启动失败
-                            status_label.setText("Ollama已安装但服务启动失败。请尝试手动启动Ollama或重启电脑后再试。")
-                            status_label.setStyleSheet("color: #FF8C00;")  # 深橙色
-                            
-                            # 添加手动启动指南按钮
-                            manual_btn = button_box.addButton("手动启动指南", QDialogButtonBox.ActionRole)
-                            manual_btn.clicked.connect(self.show_manual_windows_start_guide)
-                        else:
-                            # Ollama可能未安装
-                            status_label.setText("未检测到Ollama安装，请先安装Ollama。")
-                            status_label.setStyleSheet("color: red;")
-                            
-                            # 添加安装Ollama按钮
-                            install_btn = button_box.addButton("安装Ollama", QDialogButtonBox.ActionRole)
-                            install_btn.clicked.connect(lambda: self.install_ollama_from_dialog(dialog))
-                except Exception as e:
-                    # 启动命令执行失败
-                    status_label.setText(f"启动Ollama服务出错: {str(e)}")
-                    status_label.setStyleSheet("color: red;")
-                    Logger.error(f"启动Ollama服务出错: {str(e)}")
-                    
-                    # 添加手动启动指南和安装Ollama按钮
-                    manual_btn = button_box.addButton("手动启动指南", QDialogButtonBox.ActionRole)
-                    manual_btn.clicked.connect(self.show_manual_windows_start_guide)
-                    
-                    install_btn = button_box.addButton("安装Ollama", QDialogButtonBox.ActionRole)
-                    install_btn.clicked.connect(lambda: self.install_ollama_from_dialog(dialog))
-            
-            elif system == "darwin":
-                # macOS系统
-                status_label.setText("在macOS上尝试启动Ollama服务...")
-                QApplication.processEvents()
+                # 本地模型模式下自动刷新模型列表
+                if Config.MODEL_SOURCE == 'Ollama本地模型':
+                    self.refresh_local_models()
                 
-                try:
-                    # 检查Ollama服务状态
-                    result = subprocess.run(["pgrep", "ollama"], capture_output=True, text=True)
-                    if result.returncode != 0:
-                        # 服务未运行，尝试启动
-                        subprocess.Popen(["open", "-a", "Ollama"])
-                        status_label.setText("Ollama应用已启动，请等待服务初始化...")
-                        refresh_btn = button_box.addButton("刷新模型列表", QDialogButtonBox.ActionRole)
-                        refresh_btn.clicked.connect(lambda: self.refresh_after_service_start(dialog))
-                    else:
-                        status_label.setText("Ollama服务已在运行。您可以安装或使用模型。")
-                        status_label.setStyleSheet("color: green;")
-                        
-                        # 添加安装模型和刷新按钮
-                        install_btn = button_box.addButton("安装模型", QDialogButtonBox.ActionRole)
-                        install_btn.clicked.connect(lambda: self.install_model_from_dialog(dialog))
-                        
-                        refresh_btn = button_box.addButton("刷新模型列表", QDialogButtonBox.ActionRole)
-                        refresh_btn.clicked.connect(lambda: self.refresh_after_service_start(dialog))
-                except Exception as e:
-                    status_label.setText(f"启动服务时出错: {str(e)}")
-                    Logger.error(f"启动Ollama服务出错: {str(e)}")
+                # 服务可用后继续上次未完成的模型下载
+                self.model_manager.resume_pending_downloads()
             
-            elif system == "linux":
-                # Linux系统
-                status_label.setText("在Linux上尝试启动Ollama服务...")
-                QApplication.processEvents()
+            def on_failed(reason, message):
+                stop_progress()
+                status_label.setText(message)
+                status_label.setStyleSheet("color: red;")
                 
-                try:
-                    # 尝试启动服务
-                    result = subprocess.run(["systemctl", "is-active", "ollama"], capture_output=True, text=True)
-                    if "inactive" in result.stdout:
-                        # 服务未激活，尝试启动
-                        subprocess.run(["systemctl", "start", "ollama"])
-                        status_label.setText("已尝试启动Ollama服务，请等待服务初始化...")
-                        
-                        refresh_btn = button_box.addButton("刷新模型列表", QDialogButtonBox.ActionRole)
-                        refresh_btn.clicked.connect(lambda: self.refresh_after_service_start(dialog))
-                    else:
-                        status_label.setText("Ollama服务已在运行。您可以安装或使用模型。")
-                        status_label.setStyleSheet("color: green;")
-                        
-                        # 添加安装模型和刷新按钮
-                        install_btn = button_box.addButton("安装模型", QDialogButtonBox.ActionRole)
-                        install_btn.clicked.connect(lambda: self.install_model_from_dialog(dialog))
-                        
-                        refresh_btn = button_box.addButton("刷新模型列表", QDialogButtonBox.ActionRole)
-                        refresh_btn.clicked.connect(lambda: self.refresh_after_service_start(dialog))
-                except Exception as e:
-                    status_label.setText(f"启动服务时出错: {str(e)}")
-                    Logger.error(f"启动Ollama服务出错: {str(e)}")
+                # 添加手动启动指南和安装Ollama按钮
+                if reason != 'not_installed':
+                    manual_btn = button_box.addButton("手动启动指南", QDialogButtonBox.ActionRole)
+                    manual_btn.clicked.connect(self.show_manual_windows_start_guide)
+                install_btn = button_box.addButton("安装Ollama", QDialogButtonBox.ActionRole)
+                install_btn.clicked.connect(lambda: self.install_ollama_from_dialog(dialog))
+            
+            supervisor = OllamaSupervisorSignals.instance()
+            supervisor.status_changed.connect(status_label.setText)
+            supervisor.ready.connect(on_ready)
+            supervisor.failed.connect(on_failed)
+            
+            def disconnect_supervisor(*args):
+                # 对话框关闭后不再接收监管器的通知
+                for signal, slot in ((supervisor.status_changed, status_label.setText),
+                                     (supervisor.ready, on_ready),
+                                     (supervisor.failed, on_failed)):
+                    try:
+                        signal.disconnect(slot)
+                    except TypeError:
+                        pass
+            dialog.finished.connect(disconnect_supervisor)
             
-            else:
-                status_label.setText(f"不支持的操作系统: {system}")
-                
-            # 停止进度条
-            progress.setRange(0, 100)
-            progress.setValue(100)
+            # 显示对话框但不阻塞，服务状态通过信号更新
+            dialog.show()
+            supervisor.start()
             
         except Exception as e:
             Logger.error(f"启动Ollama服务过程中出错: {str(e)}")
@@ -912,18 +837,46 @@ class MainWindow(QMainWindow):
     # 重构到model_manager.py
     
     def init_ui_components(self):
-        '''初始化各个功能界面组件'''
+        '''初始化各个功能界面组件，标签页在首次显示时才构建'''
         from ui.tabs import FileProcessingTab, ChatTab, SupportTab
         
-        self.tabs.addTab(FileProcessingTab(self.api_handler), '文件处理')
-        self.tabs.addTab(ChatTab(self.api_handler), '对话')
-        self.tabs.addTab(SupportTab(self.api_handler), '帮助与支持')    
+        self.add_deferred_tab(FileProcessingTab, '文件处理')
+        self.add_deferred_tab(ChatTab, '对话')
+        self.add_deferred_tab(SupportTab, '帮助与支持')
+        
+        self.tabs.currentChanged.connect(self.ensure_tab_built)
+        # 当前显示的标签页立即构建
+        self.ensure_tab_built(self.tabs.currentIndex())
         
         # 移除模型管理标签页
         # model_manager = ModelManagerTab(self.api_handler)
         # model_manager.set_main_window(self)  # 设置主窗口引用
         # self.tabs.addTab(model_manager, '模型管理')
 
+    def add_deferred_tab(self, tab_class, title):
+        """添加一个占位标签页，真正的标签页在首次显示时构建"""
+        placeholder = QWidget()
+        self.pending_tabs[placeholder] = (tab_class, title)
+        self.tabs.addTab(placeholder, title)
+    
+    def ensure_tab_built(self, index):
+        """如果指定位置还是占位标签页，则构建真正的标签页并替换"""
+        placeholder = self.tabs.widget(index)
+        if placeholder not in self.pending_tabs:
+            return
+        
+        tab_class, title = self.pending_tabs.pop(placeholder)
+        tab = tab_class(self.api_handler)
+        
+        # 替换占位标签页时不触发currentChanged，避免重入
+        self.tabs.blockSignals(True)
+        self.tabs.removeTab(index)
+        self.tabs.insertTab(index, tab, title)
+        self.tabs.setCurrentIndex(index)
+        self.tabs.blockSignals(False)
+        placeholder.deleteLater()
+        Logger.info(f"已构建标签页: {title}")
+    
     def generate_output_path(self, original_path):
         '''生成带时间戳的输出文件路径'''
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
@@ -1017,6 +970,9 @@ class MainWindow(QMainWindow):
     def closeEvent(self, event):
         """程序关闭时的处理"""
         try:
+            # 写入尚未落盘的配置修改
+            Config.flush_config()
+            
             # 关闭所有模型加载线程
             if hasattr(self, 'loader_thread') and self.loader_thread.isRunning():
                 print("[程序关闭] 正在终止模型加载线程...")
@@ -1033,39 +989,16 @@ class MainWindow(QMainWindow):
                     print(f"[程序关闭] 正在清理标签页 {i} 的资源...")
                     tab.cleanup_resources()
             
-            # 如果当前使用的是Ollama本地模型，关闭服务
-            if Config.MODEL_SOURCE == 'Ollama本地模型' and hasattr(self, 'api_handler'):
-                # 不再卸载模型，直接关闭服务
-                print("[程序关闭] 正在关闭Ollama服务...")
-                import platform
-                import subprocess
-                
-                system = platform.system().lower()
-                
-                if system == "windows":
-                    # Windows系统使用taskkill命令关闭ollama进程
-                    subprocess.run(["taskkill", "/F", "/IM", "ollama.exe"], 
-                                 capture_output=True, 
-                                 text=True)
-                elif system == "darwin":
-                    # macOS系统使用pkill命令关闭ollama进程
-                    subprocess.run(["pkill", "ollama"], 
-                                 capture_output=True, 
-                                 text=True)
-                elif system == "linux":
-                    # Linux系统使用systemctl停止ollama服务
-                    subprocess.run(["systemctl", "stop", "ollama"], 
-                                 capture_output=True, 
-                                 text=True)
-                
-                print("[程序关闭] Ollama服务已关闭")
-                
             # 关闭所有可能的子进程
             if hasattr(self, 'model_manager'):
                 if hasattr(self.model_manager, 'cleanup'):
                     print("[程序关闭] 正在清理模型管理器资源...")
                     self.model_manager.cleanup()
             
+            # 只关闭由本程序启动的Ollama服务，用户自行运行的服务不受影响
+            if OllamaSupervisor.shutdown():
+                print("[程序关闭] 已关闭由本程序启动的Ollama服务")
+                
             # 释放API处理器资源
             if hasattr(self, 'api_handler'):
                 if hasattr(self.api_handler, 'close') and callable(self.api_handler.close):
@@ -0,0 +1,10 @@
+"""
+界面服务模块
+把 core.services 中不依赖PyQt5的服务接入Qt：目录监听、定时采样和跨线程信号
+"""
+
+from ui.services.download_signals import ModelDownloadSignals
+from ui.services.ollama_signals import OllamaSupervisorSignals
+from ui.services.prompt_watcher import SystemPromptWatcher
+
+__all__ = ['ModelDownloadSignals', 'OllamaSupervisorSignals', 'SystemPromptWatcher']
@@ -0,0 +1,54 @@
+"""
+模型下载信号模块
+把 ModelDownloadManager 的回调转换为Qt信号，下载进行中按固定频率通知界面采样进度
+"""
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+from core.services.model_downloads import ModelDownloadManager
+
+
+class ModelDownloadSignals(QObject):
+    """ModelDownloadManager 的Qt信号适配器"""
+
+    # 任务列表或进度变化（进度按 UPDATE_INTERVAL_MS 合并通知）
+    jobs_changed = pyqtSignal()
+    # 任务结束：模型名称、是否成功、描述
+    job_finished = pyqtSignal(str, bool, str)
+
+    UPDATE_INTERVAL_MS = 250
+
+    _instance = None
+
+    @classmethod
+    def instance(cls):
+        """获取全局信号适配器（需在GUI线程中首次调用）"""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self):
+        super().__init__()
+        self.downloads = ModelDownloadManager.instance()
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(self.UPDATE_INTERVAL_MS)
+        self._timer.timeout.connect(self.jobs_changed.emit)
+        # 回调可能来自下载线程，定时器只在GUI线程中启停
+        self.jobs_changed.connect(self._update_timer)
+
+        self.downloads.add_listener(self._on_event)
+        self._update_timer()
+
+    def _on_event(self, event, *args):
+        if event == ModelDownloadManager.JOBS_CHANGED:
+            self.jobs_changed.emit()
+        elif event == ModelDownloadManager.JOB_FINISHED:
+            self.job_finished.emit(*args)
+
+    def _update_timer(self):
+        if self.downloads.active:
+            if not self._timer.isActive():
+                self._timer.start()
+        elif self._timer.isActive():
+            self._timer.stop()
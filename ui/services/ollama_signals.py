@@ -0,0 +1,48 @@
+"""
+Ollama服务状态信号模块
+把 OllamaSupervisor 在后台线程中的状态回调转换为Qt信号，由GUI线程中的槽函数处理
+"""
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from core.services.ollama_supervisor import OllamaSupervisor
+
+
+class OllamaSupervisorSignals(QObject):
+    """OllamaSupervisor 的Qt信号适配器"""
+
+    # 状态描述更新
+    status_changed = pyqtSignal(str)
+    # 服务就绪，参数为已安装的模型数量
+    ready = pyqtSignal(int)
+    # 启动失败，参数为原因代码和描述
+    failed = pyqtSignal(str, str)
+
+    _instance = None
+
+    @classmethod
+    def instance(cls):
+        """获取全局信号适配器（需在GUI线程中首次调用）"""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self):
+        super().__init__()
+        self.supervisor = OllamaSupervisor.instance()
+        self._signals = {
+            OllamaSupervisor.STATUS_CHANGED: self.status_changed,
+            OllamaSupervisor.READY: self.ready,
+            OllamaSupervisor.FAILED: self.failed,
+        }
+        self.supervisor.add_listener(self._on_event)
+
+    def start(self):
+        """在后台启动服务，结果通过 ready / failed 信号通知"""
+        self.supervisor.start()
+
+    def _on_event(self, event, *args):
+        # 在后台线程中调用，信号以队列方式送达GUI线程
+        signal = self._signals.get(event)
+        if signal is not None:
+            signal.emit(*args)
@@ -0,0 +1,70 @@
+"""
+系统提示词目录监听模块
+监听提示词目录和文件的变化，刷新 SystemPromptRegistry 并通知界面
+"""
+
+from PyQt5.QtCore import QObject, QFileSystemWatcher, QTimer, pyqtSignal
+
+from core.services.prompt_registry import SystemPromptRegistry
+
+
+class SystemPromptWatcher(QObject):
+    """提示词目录监听器
+
+    目录内容变化时延迟一小段时间后重新扫描，合并编辑器保存时的多次通知；
+    提示词文件被修改时丢弃该文件的内容缓存。
+    """
+
+    # 提示词列表发生变化
+    prompts_changed = pyqtSignal()
+
+    # 目录变化后等待多久再重新扫描（毫秒）
+    RESCAN_DELAY_MS = 200
+
+    _instance = None
+
+    @classmethod
+    def instance(cls):
+        """获取全局监听器实例（需在GUI线程中首次调用）"""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self):
+        super().__init__()
+        self.registry = SystemPromptRegistry.instance()
+
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(self._schedule_rescan)
+        self._watcher.fileChanged.connect(self._on_file_changed)
+
+        self._rescan_timer = QTimer(self)
+        self._rescan_timer.setSingleShot(True)
+        self._rescan_timer.setInterval(self.RESCAN_DELAY_MS)
+        self._rescan_timer.timeout.connect(self.refresh)
+
+        self._update_watched_paths()
+
+    def refresh(self):
+        """重新扫描提示词目录并通知界面更新"""
+        self.registry.refresh()
+        self._update_watched_paths()
+        self.prompts_changed.emit()
+
+    def _update_watched_paths(self):
+        wanted = self.registry.watched_paths()
+        watched = set(self._watcher.files()) | set(self._watcher.directories())
+        stale = watched - wanted
+        if stale:
+            self._watcher.removePaths(list(stale))
+        missing = wanted - watched
+        if missing:
+            self._watcher.addPaths(list(missing))
+
+    def _on_file_changed(self, path):
+        self.registry.invalidate(path)
+        # 部分编辑器以替换文件的方式保存，监听会被移除，需要重新扫描
+        self._schedule_rescan()
+
+    def _schedule_rescan(self, *args):
+        self._rescan_timer.start()
@@ -21,4 +21,71 @@ class BaseTab(QWidget):
 
     def update_model_list(self, models):
         self.model_selector.clear()
-        self.model_selector.addItems([model['name'] for model in models])
\ No newline at end of file
+        self.model_selector.addItems([model['name'] for model in models])
+
+
+class SystemPromptMixin:
+    """系统提示词选择功能
+
+    使用该功能的标签页需要提供 self.system_prompt_selector 下拉框，
+    并在创建下拉框后调用 connect_system_prompts()。
+    提示词列表和内容由全局的 SystemPromptRegistry 提供，目录变化由 SystemPromptWatcher 通知。
+    """
+
+    # 当前选择不可用时是否默认选中第一个提示词
+    SELECT_FIRST_PROMPT_BY_DEFAULT = False
+
+    def connect_system_prompts(self):
+        """加载提示词列表，并在提示词目录变化时自动刷新"""
+        from ui.services.prompt_watcher import SystemPromptWatcher
+        self.prompt_watcher = SystemPromptWatcher.instance()
+        self.prompt_registry = self.prompt_watcher.registry
+        self.prompt_watcher.prompts_changed.connect(self.load_system_prompts)
+        self.load_system_prompts()
+
+    def refresh_system_prompts(self):
+        """重新扫描提示词目录（列表通过prompts_changed信号更新）"""
+        self.prompt_watcher.refresh()
+
+    def load_system_prompts(self):
+        """用注册表中的提示词填充下拉框，尽量保留当前选择"""
+        self.system_prompt_selector.blockSignals(True)
+        current_selection = self.system_prompt_selector.currentText()
+
+        # 清除当前列表，保留"无"选项
+        self.system_prompt_selector.clear()
+        self.system_prompt_selector.addItem('无')
+        self.system_prompt_selector.addItems(self.prompt_registry.names())
+
+        # 恢复之前的选择(如果存在)
+        if current_selection and self.system_prompt_selector.findText(current_selection) >= 0:
+            self.system_prompt_selector.setCurrentText(current_selection)
+        elif self.SELECT_FIRST_PROMPT_BY_DEFAULT and self.system_prompt_selector.count() > 1:
+            # 默认选择第一个提示词(如果有)
+            self.system_prompt_selector.setCurrentIndex(1)
+
+        self.system_prompt_selector.blockSignals(False)
+
+    def open_system_prompts_folder(self):
+        """打开用户系统提示词文件夹"""
+        from PyQt5.QtGui import QDesktopServices
+        from PyQt5.QtCore import QUrl
+
+        user_prompts_dir = self.prompt_registry.ensure_user_dir()
+        if user_prompts_dir is None:
+            if hasattr(self, 'output_area'):
+                self.output_area.append("创建系统提示词文件夹失败")
+            return
+
+        QDesktopServices.openUrl(QUrl.fromLocalFile(user_prompts_dir))
+
+    def get_selected_system_prompt(self):
+        """获取选中的系统提示词内容（需在GUI线程中调用）"""
+        selected_prompt = self.system_prompt_selector.currentText()
+        if not selected_prompt or selected_prompt == '无':
+            return None
+
+        prompt_content = self.prompt_registry.get_prompt(selected_prompt)
+        if prompt_content is None and hasattr(self, 'output_area'):
+            self.output_area.append(f"系统提示词文件不存在: {selected_prompt}")
+        return prompt_content
@@ -3,54 +3,77 @@
 提供基于对话的交互功能
 """
 
+import os
+
 from PyQt5.QtCore import QObject, pyqtSignal
 from core import Config
-from ui.tabs.base import BaseTab
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QComboBox, QPushButton, QTextEdit, QLabel
+from core.chat_history import ChatHistoryManager
+from ui.tabs.base import BaseTab, SystemPromptMixin
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QComboBox, QPushButton, QTextEdit, QLabel, QCheckBox, QSpinBox
 from PyQt5.QtCore import Qt
 from PyQt5.QtCore import QThreadPool, QRunnable
+from PyQt5.QtGui import QTextCursor
+from core.logging import Logger
+from core.storage.chat_store import ChatStore
 
-class ChatTab(BaseTab):
+class ChatTab(SystemPromptMixin, BaseTab):
+    # 对话区域每次加载的消息数
+    PAGE_SIZE = 50
+    
     class ChatWorker(QRunnable):
+        # 信号都带有发出请求时的请求序号，清除对话后迟到的结果会被忽略
         class Signals(QObject):
-            finished = pyqtSignal(str)
-            error = pyqtSignal(str)
+            finished = pyqtSignal(str, int)
+            error = pyqtSignal(str, int)
+            retrieved = pyqtSignal(str, int)
             
-        def __init__(self, parent, chat_history):
+        def __init__(self, parent, messages, use_retrieval=False, request_id=0):
             super().__init__()
             self.signals = self.Signals()
             self.parent = parent
-            self.chat_history = chat_history
+            self.request_id = request_id
+            # 在GUI线程中按token预算整理好的消息（含系统提示词和对话摘要）
+            self.messages = messages
             self.api_handler = parent.api_handler
             self.model_name = Config.SELECTED_MODEL
+            self.use_retrieval = use_retrieval
+            
+        def add_retrieved_context(self, messages):
+            """检索与最后一个问题相关的资料，只替换本次发送的消息，不写入对话历史"""
+            if not messages or messages[-1].get('role') != 'user':
+                return messages
+            from core.retrieval import ContextRetriever
+            retriever = ContextRetriever()
+            try:
+                question = messages[-1]['content']
+                passages = retriever.retrieve(question)
+            except Exception as e:
+                self.signals.retrieved.emit(f"检索资料失败: {str(e)}", self.request_id)
+                return messages
+            finally:
+                retriever.store.close()
+            if not passages:
+                self.signals.retrieved.emit("未检索到相关资料", self.request_id)
+                return messages
+            sources = sorted({os.path.basename(p['source_file']) for p in passages if p['source_file']})
+            self.signals.retrieved.emit(
+                f"检索到 {len(passages)} 段资料（约 {sum(p['tokens'] for p in passages)} tokens）"
+                + (f"，来自: {', '.join(sources)}" if sources else ""),
+                self.request_id,
+            )
+            return messages[:-1] + [{"role": "user", "content": ContextRetriever.build_prompt(question, passages)}]
             
         def run(self):
             try:
-                # 获取系统提示词（如果选择了）
-                system_prompt = None
-                if hasattr(self.parent, 'get_selected_system_prompt'):
-                    system_prompt = self.parent.get_selected_system_prompt()
-                    if system_prompt:
-                        print(f"\n[系统提示词] {system_prompt[:100]}..." if len(system_prompt) > 100 else f"\n[系统提示词] {system_prompt}")
+                messages = self.messages
+                if self.use_retrieval:
+                    messages = self.add_retrieved_context(messages)
                 
-                # 准备消息列表
-                messages = []
-                if system_prompt:
-                    messages.append({"role": "system", "content": system_prompt})
-                messages.extend(self.chat_history)
-                
-                # 打印当前使用的模型
-                print(f"\n[模型信息] 当前使用模型: {self.model_name}")
-                
-                # 打印思考内容
-                print("\n[思考内容]")
-                for msg in messages:
-                    role = msg.get('role', 'unknown')
-                    content = msg.get('content', '')
-                    print(f"{role}: {content[:200]}..." if len(content) > 200 else f"{role}: {content}")
-                
-                # 调用API生成响应
-                print(f"\n[API调用] 正在调用API，使用模型: {self.model_name}")
+                # 调用API生成响应（只记录消息数量和长度，不输出完整内容）
+                Logger.debug(
+                    f"[Chat] 调用模型 {self.model_name}，{len(messages)} 条消息，"
+                    f"共 {sum(len(msg.get('content', '')) for msg in messages)} 字符"
+                )
                 response = self.api_handler.generate_completion(
                     model=self.model_name,
                     prompt=messages
@@ -58,7 +81,7 @@ class ChatTab(BaseTab):
                 
                 # 处理响应
                 if isinstance(response, dict) and 'error' in response:
-                    self.signals.error.emit(response['error'])
+                    self.signals.error.emit(response['error'], self.request_id)
                     return
                     
                 # 提取响应文本
@@ -68,34 +91,73 @@ class ChatTab(BaseTab):
                         choice = response['choices'][0]
                         if 'message' in choice and 'content' in choice['message']:
                             response_text = choice['message']['content']
-                            print(f"\n[模型响应] {response_text[:200]}..." if len(response_text) > 200 else f"\n[模型响应] {response_text}")
                         elif 'text' in choice:
                             response_text = choice['text']
-                            print(f"\n[模型响应] {response_text[:200]}..." if len(response_text) > 200 else f"\n[模型响应] {response_text}")
                         else:
                             response_text = str(choice)
-                            print(f"\n[模型响应] {response_text[:200]}..." if len(response_text) > 200 else f"\n[模型响应] {response_text}")
                 else:
                     response_text = response.get('response', '') if isinstance(response, dict) else str(response)
-                    print(f"\n[模型响应] {response_text[:200]}..." if len(response_text) > 200 else f"\n[模型响应] {response_text}")
+                Logger.debug(f"[Chat] 收到响应 {len(response_text)} 字符")
                 
                 if not response_text:
-                    self.signals.error.emit("未获取到有效响应")
+                    self.signals.error.emit("未获取到有效响应", self.request_id)
                     return
                     
-                self.signals.finished.emit(response_text)
+                self.signals.finished.emit(response_text, self.request_id)
                 
             except Exception as e:
                 import traceback
                 error_msg = f"生成响应时出错: {str(e)}\n{traceback.format_exc()}"
-                print(error_msg)
-                self.signals.error.emit(error_msg)
+                Logger.error(error_msg, exc_info=False)
+                self.signals.error.emit(error_msg, self.request_id)
+
+    class SummaryWorker(QRunnable):
+        """在后台让模型更新对话摘要"""
+
+        class Signals(QObject):
+            finished = pyqtSignal(str, int, int)
+
+        def __init__(self, api_handler, model_name, messages, upto, generation):
+            super().__init__()
+            self.signals = self.Signals()
+            self.api_handler = api_handler
+            self.model_name = model_name
+            self.messages = messages
+            self.upto = upto
+            self.generation = generation
+
+        def run(self):
+            summary = ''
+            try:
+                response = self.api_handler.generate_completion(model=self.model_name, prompt=self.messages)
+                if isinstance(response, dict) and 'error' in response:
+                    Logger.warning(f"更新对话摘要失败: {response['error']}")
+                elif isinstance(response, dict) and response.get('choices'):
+                    summary = response['choices'][0].get('message', {}).get('content', '')
+                elif isinstance(response, dict):
+                    summary = response.get('response', '')
+            except Exception as e:
+                Logger.warning(f"更新对话摘要失败: {str(e)}")
+            self.signals.finished.emit(summary, self.upto, self.generation)
 
     def __init__(self, api_handler):
         super().__init__(api_handler)
         self.setup_ui_components()
-        self.chat_history = []  # 存储对话历史
+        # 对话历史（按token预算发送，较早的内容由后台整理成摘要）
+        self.history = ChatHistoryManager(Config.CHAT_TOKEN_BUDGET)
+        self.summary_worker = None
         self.is_processing = False  # 处理状态标志
+        # 会话保存在本地数据库中，第一次发送消息时才创建
+        self.chat_store = ChatStore.default()
+        self.session_id = None
+        # 当前对话请求的序号，清除或切换对话时递增，旧请求的结果不再写入会话
+        self.request_id = 0
+        # 对话区域中已显示的最早一条消息的序号，向上滚动到顶部时继续加载更早的消息
+        self.first_loaded_seq = 0
+        self.load_sessions()
+        sessions = self.chat_store.list_sessions(limit=1)
+        if sessions:
+            self.open_session(sessions[0]['id'])
         
     def setup_ui_components(self):
         """设置UI组件"""
@@ -131,7 +193,7 @@ class ChatTab(BaseTab):
         # 刷新系统提示词按钮
         refresh_prompts_btn = QPushButton('刷新')
         refresh_prompts_btn.setToolTip('刷新系统提示词列表')
-        refresh_prompts_btn.clicked.connect(self.load_system_prompts)
+        refresh_prompts_btn.clicked.connect(self.refresh_system_prompts)
         refresh_prompts_btn.setStyleSheet("""
             QPushButton {
                 background-color: #00BCD4;
@@ -154,13 +216,42 @@ class ChatTab(BaseTab):
         system_prompt_layout.addWidget(self.system_prompt_selector)
         system_prompt_layout.addWidget(refresh_prompts_btn)
         system_prompt_layout.addWidget(open_prompts_folder_btn)
+        
+        # 检索已处理的原文和生成的卡片作为回答参考
+        self.retrieval_checkbox = QCheckBox('检索资料')
+        self.retrieval_checkbox.setToolTip('每次提问时从已处理的文件原文和学习卡片中检索相关内容一起发送给模型')
+        system_prompt_layout.addWidget(self.retrieval_checkbox)
+        
+        # 每次请求中历史消息的token预算
+        self.token_budget_spin = QSpinBox()
+        self.token_budget_spin.setRange(1000, 128000)
+        self.token_budget_spin.setSingleStep(1000)
+        self.token_budget_spin.setValue(Config.CHAT_TOKEN_BUDGET)
+        self.token_budget_spin.setToolTip('系统提示词、对话摘要和最近消息合计的token上限，超出部分由模型在后台整理成摘要')
+        self.token_budget_spin.valueChanged.connect(self.on_token_budget_changed)
+        system_prompt_layout.addWidget(QLabel('上下文预算：'))
+        system_prompt_layout.addWidget(self.token_budget_spin)
         system_prompt_layout.addStretch()
         
         # 添加系统提示词布局
         layout.addLayout(system_prompt_layout)
         
         # 加载系统提示词
-        self.load_system_prompts()
+        self.connect_system_prompts()
+        
+        # 会话选择行
+        session_layout = QHBoxLayout()
+        self.session_selector = QComboBox()
+        self.session_selector.setMinimumWidth(240)
+        self.session_selector.activated.connect(self.on_session_selected)
+        self.new_session_btn = QPushButton('新对话')
+        self.new_session_btn.setToolTip('开始新的对话，当前对话仍可从列表中打开')
+        self.new_session_btn.clicked.connect(self.new_session)
+        session_layout.addWidget(QLabel('会话：'))
+        session_layout.addWidget(self.session_selector)
+        session_layout.addWidget(self.new_session_btn)
+        session_layout.addStretch()
+        layout.addLayout(session_layout)
         
         # 创建对话历史区域
         self.chat_area = QTextEdit()
@@ -268,22 +359,104 @@ class ChatTab(BaseTab):
         # 连接系统提示词选择变化事件
         self.system_prompt_selector.currentTextChanged.connect(self.on_system_prompt_changed)
         
+        # 滚动到顶部时加载更早的消息
+        self.chat_area.verticalScrollBar().valueChanged.connect(self.on_chat_scrolled)
+        
     def on_system_prompt_changed(self, prompt_name):
-        """当系统提示词选择改变时，更新对话历史中的系统提示词"""
-        if not self.chat_history:
+        """系统提示词在每次发送时读取，不保存在对话历史中"""
+        Logger.debug(f"[Chat] 系统提示词切换为: {prompt_name}")
+    
+    def load_sessions(self):
+        """刷新会话列表，保持当前会话的选中状态"""
+        self.session_selector.blockSignals(True)
+        self.session_selector.clear()
+        if self.session_id is None:
+            self.session_selector.addItem('新对话', None)
+        for session in self.chat_store.list_sessions():
+            title = session['title'] or '新对话'
+            self.session_selector.addItem(f"{title}（{session['message_count']}条）", session['id'])
+        index = self.session_selector.findData(self.session_id)
+        self.session_selector.setCurrentIndex(max(index, 0))
+        self.session_selector.blockSignals(False)
+    
+    def on_session_selected(self, index):
+        session_id = self.session_selector.itemData(index)
+        if session_id is not None and session_id != self.session_id:
+            self.open_session(session_id)
+    
+    def new_session(self):
+        """开始新的对话（发送第一条消息时才写入数据库）"""
+        self.session_id = None
+        self.history.clear()
+        self.chat_area.clear()
+        self.first_loaded_seq = 0
+        self.load_sessions()
+    
+    def open_session(self, session_id):
+        """打开保存的会话：恢复摘要之后的消息用于请求，对话区域只显示最新一页"""
+        session = self.chat_store.get_session(session_id)
+        if session is None:
+            return
+        self.session_id = session_id
+        self.history.restore(
+            self.chat_store.load_messages(session_id, start=session['summarized_upto']),
+            session['summary'],
+            session['summarized_upto'],
+        )
+        page = self.chat_store.load_page(session_id, limit=self.PAGE_SIZE)
+        self.first_loaded_seq = page[0]['seq'] if page else 0
+        # 替换内容时滚动条会回到顶部，不能触发加载更早的消息
+        scrollbar = self.chat_area.verticalScrollBar()
+        scrollbar.blockSignals(True)
+        self.chat_area.setPlainText('\n'.join(self.format_message(m['role'], m['content']) for m in page))
+        # 光标放在末尾，排版完成后视图仍停在最新的消息
+        self.chat_area.moveCursor(QTextCursor.End)
+        self.scroll_to_bottom()
+        scrollbar.blockSignals(False)
+        self.load_sessions()
+        Logger.debug(f"[Chat] 打开会话 {session_id}，共 {session['message_count']} 条消息，显示最新 {len(page)} 条")
+    
+    @staticmethod
+    def format_message(role, content):
+        speaker = '用户' if role == 'user' else '助手'
+        return f"\n{speaker}: {content}\n"
+    
+    def on_chat_scrolled(self, value):
+        if value == self.chat_area.verticalScrollBar().minimum() and self.session_id is not None and self.first_loaded_seq > 0:
+            self.load_older_messages()
+    
+    def load_older_messages(self):
+        """在对话区域顶部插入更早的一页消息，保持当前阅读位置不动"""
+        page = self.chat_store.load_page(self.session_id, before=self.first_loaded_seq, limit=self.PAGE_SIZE)
+        if not page:
+            self.first_loaded_seq = 0
             return
+        self.first_loaded_seq = page[0]['seq']
+        scrollbar = self.chat_area.verticalScrollBar()
+        old_maximum, old_value = scrollbar.maximum(), scrollbar.value()
+        scrollbar.blockSignals(True)
+        cursor = QTextCursor(self.chat_area.document())
+        cursor.movePosition(QTextCursor.Start)
+        cursor.insertText('\n'.join(self.format_message(m['role'], m['content']) for m in page) + '\n')
+        scrollbar.setValue(old_value + scrollbar.maximum() - old_maximum)
+        scrollbar.blockSignals(False)
+    
+    def scroll_to_bottom(self):
+        self.chat_area.verticalScrollBar().setValue(self.chat_area.verticalScrollBar().maximum())
+    
+    def save_message(self, role, content, tokens):
+        """把消息写入当前会话，还没有会话时先创建"""
+        try:
+            if self.session_id is None:
+                self.session_id = self.chat_store.create_session()
+            self.chat_store.append_message(self.session_id, role, content, tokens)
+        except Exception as e:
+            Logger.error(f"保存对话消息失败: {str(e)}", exc_info=False)
             
-        # 获取新的系统提示词
-        new_system_prompt = self.get_selected_system_prompt()
-        
-        # 更新对话历史中的系统提示词
-        if self.chat_history and self.chat_history[0].get('role') == 'system':
-            if new_system_prompt:
-                self.chat_history[0]['content'] = new_system_prompt
-            else:
-                self.chat_history.pop(0)
-        elif new_system_prompt:
-            self.chat_history.insert(0, {'role': 'system', 'content': new_system_prompt})
+    def on_token_budget_changed(self, budget):
+        """更新对话的token预算"""
+        self.history.token_budget = budget
+        Config.update_chat_token_budget(budget)
             
     def handle_key_press(self, event):
         """处理按键事件"""
@@ -300,181 +473,120 @@ class ChatTab(BaseTab):
         if not message:
             return
             
-        # 添加调试信息
-        print(f"\n[调试] 发送消息:")
-        print(f"消息内容: {message}")
-        print(f"当前对话历史长度: {len(self.chat_history)}")
-        
-        # 禁用输入区域和发送按钮
-        self.input_area.setEnabled(False)
-        self.send_btn.setEnabled(False)
+        # 禁用输入区域、发送按钮和会话切换
+        self.set_input_enabled(False)
         
         # 清空输入区域
         self.input_area.clear()
         
-        # 添加用户消息到对话历史
-        self.chat_history.append({"role": "user", "content": message})
+        # 添加用户消息到对话历史并保存
+        is_new_session = self.session_id is None
+        tokens = self.history.append("user", message)
+        self.save_message("user", message, tokens)
+        if is_new_session:
+            self.load_sessions()
         
         # 更新对话显示
-        self.chat_area.append(f"\n用户: {message}\n")
+        self.chat_area.append(self.format_message("user", message))
+        
+        # 按预算选取本次发送的历史
+        messages, used_tokens = self.history.build_messages(self.get_selected_system_prompt())
+        Logger.debug(f"[Chat] 本次发送 {len(messages)} 条消息，约 {used_tokens} tokens（预算 {self.history.token_budget}）")
         
         # 创建并启动工作线程
-        worker = self.ChatWorker(self, self.chat_history)
+        self.request_id += 1
+        worker = self.ChatWorker(self, messages, self.retrieval_checkbox.isChecked(), self.request_id)
+        worker.signals.retrieved.connect(self.handle_retrieved)
         worker.signals.finished.connect(self.handle_response)
         worker.signals.error.connect(self.handle_error)
         QThreadPool.globalInstance().start(worker)
 
-    def handle_response(self, response_text):
+    def handle_retrieved(self, info, request_id):
+        if request_id == self.request_id:
+            self.chat_area.append(f"检索: {info}")
+
+    def handle_response(self, response_text, request_id):
         """处理模型响应"""
-        # 添加调试信息
-        print(f"\n[调试] 收到模型响应:")
-        print(f"响应内容: {response_text[:200]}...")  # 只显示前200个字符
-        print(f"响应长度: {len(response_text)}")
-        
-        # 添加助手消息到对话历史
-        self.chat_history.append({"role": "assistant", "content": response_text})
+        if request_id != self.request_id:
+            Logger.debug("[Chat] 对话已清除，忽略之前请求的响应")
+            return
+        # 添加助手消息到对话历史并保存
+        tokens = self.history.append("assistant", response_text)
+        self.save_message("assistant", response_text, tokens)
+        self.load_sessions()
         
         # 更新对话显示
-        self.chat_area.append(f"\n助手: {response_text}\n")
+        self.chat_area.append(self.format_message("assistant", response_text))
         
         # 重新启用输入区域和发送按钮
-        self.input_area.setEnabled(True)
-        self.send_btn.setEnabled(True)
+        self.set_input_enabled(True)
         
         # 滚动到底部
-        self.chat_area.verticalScrollBar().setValue(
-            self.chat_area.verticalScrollBar().maximum()
-        )
+        self.scroll_to_bottom()
         
-        # 添加调试信息
-        print(f"当前对话历史长度: {len(self.chat_history)}")
-        print(f"最后一条消息角色: {self.chat_history[-1]['role']}")
-        print(f"最后一条消息长度: {len(self.chat_history[-1]['content'])}")
+        # 历史接近预算时在后台更新摘要
+        self.start_summary()
+    
+    def start_summary(self):
+        """较早的消息超出预算时，让模型在后台把它们并入滚动摘要（同一时间只运行一个）"""
+        if self.summary_worker is not None:
+            return
+        request = self.history.summary_request(self.get_selected_system_prompt())
+        if request is None:
+            return
+        messages, upto, generation = request
+        Logger.debug(f"[Chat] 开始整理对话摘要，覆盖前 {upto} 条消息")
+        self.summary_worker = self.SummaryWorker(self.api_handler, Config.SELECTED_MODEL, messages, upto, generation)
+        self.summary_worker.signals.finished.connect(self.handle_summary)
+        QThreadPool.globalInstance().start(self.summary_worker)
+    
+    def handle_summary(self, summary, upto, generation):
+        """采用后台整理好的摘要"""
+        self.summary_worker = None
+        if self.history.apply_summary(summary, upto, generation):
+            Logger.debug(f"[Chat] 对话摘要已更新（约 {self.history.summary_tokens} tokens）")
+            if self.session_id is not None:
+                try:
+                    self.chat_store.save_summary(self.session_id, self.history.summary, self.history.summarized_upto)
+                except Exception as e:
+                    Logger.error(f"保存对话摘要失败: {str(e)}", exc_info=False)
+            # 摘要期间又有新消息时继续整理
+            self.start_summary()
 
-    def handle_error(self, error_message):
+    def handle_error(self, error_message, request_id):
         """处理错误"""
-        # 添加调试信息
-        print(f"\n[调试] 发生错误:")
-        print(f"错误信息: {error_message}")
-        print(f"当前对话历史长度: {len(self.chat_history)}")
-        
-        # 显示错误消息
+        if request_id != self.request_id:
+            return
+        # 显示错误消息（不保存到会话中）
         self.chat_area.append(f"\n错误: {error_message}\n")
         
         # 重新启用输入区域和发送按钮
-        self.input_area.setEnabled(True)
-        self.send_btn.setEnabled(True)
+        self.set_input_enabled(True)
         
         # 滚动到底部
-        self.chat_area.verticalScrollBar().setValue(
-            self.chat_area.verticalScrollBar().maximum()
-        )
+        self.scroll_to_bottom()
+    
+    def set_input_enabled(self, enabled):
+        """等待响应期间禁止输入和切换会话"""
+        self.input_area.setEnabled(enabled)
+        self.send_btn.setEnabled(enabled)
+        self.session_selector.setEnabled(enabled)
+        self.new_session_btn.setEnabled(enabled)
         
     def clear_chat(self):
-        """清除对话历史"""
+        """清除当前对话（同时从会话库中删除）"""
         # 取消当前的生成请求
         if hasattr(self.api_handler, 'cancel_generation'):
             self.api_handler.cancel_generation()
-            
-        # 清空对话历史
-        self.chat_history = []
-        self.chat_area.clear()
-        self.chat_area.append("对话已清除")
-    
-    def load_system_prompts(self):
-        """加载系统提示词文件夹中的提示词文件"""
-        import os
-        
-        self.system_prompt_selector.blockSignals(True)
-        current_selection = self.system_prompt_selector.currentText()
-        
-        # 清除当前列表，保留"无"选项
-        self.system_prompt_selector.clear()
-        self.system_prompt_selector.addItem('无')
-        
-        # 系统提示词文件夹路径
-        cwd = os.getcwd()
-        prompts_dir = os.path.join(cwd, 'system_prompts')
-        
-        # 确保文件夹存在
-        if not os.path.exists(prompts_dir):
-            try:
-                os.makedirs(prompts_dir)
-            except Exception as e:
-                print(f"创建系统提示词文件夹失败: {str(e)}")
-                self.system_prompt_selector.blockSignals(False)
-                return
-        
-        # 列出文件夹中的文本文件
-        try:
-            files = [f for f in os.listdir(prompts_dir) if f.endswith(('.txt', '.md'))]
-            files.sort()  # 按字母顺序排序
-            
-            for file in files:
-                # 添加文件名（不含扩展名）
-                prompt_name = os.path.splitext(file)[0]
-                self.system_prompt_selector.addItem(prompt_name)
-            
-            # 尝试恢复之前的选择
-            if current_selection and self.system_prompt_selector.findText(current_selection) >= 0:
-                self.system_prompt_selector.setCurrentText(current_selection)
-                
-        except Exception as e:
-            print(f"加载系统提示词失败: {str(e)}")
-        
-        self.system_prompt_selector.blockSignals(False)
-    
-    def open_system_prompts_folder(self):
-        """打开系统提示词文件夹"""
-        import os
-        import subprocess
         
-        # 系统提示词文件夹路径
-        cwd = os.getcwd()
-        prompts_dir = os.path.join(cwd, 'system_prompts')
-        
-        # 确保文件夹存在
-        if not os.path.exists(prompts_dir):
+        if self.session_id is not None:
             try:
-                os.makedirs(prompts_dir)
+                self.chat_store.delete_session(self.session_id)
             except Exception as e:
-                print(f"创建系统提示词文件夹失败: {str(e)}")
-                return
-        
-        # 打开文件夹
-        try:
-            if os.name == 'nt':  # Windows
-                os.startfile(prompts_dir)
-            elif os.name == 'posix':  # Linux, Mac OS X
-                if os.uname().sysname == 'Darwin':  # Mac OS X
-                    subprocess.call(['open', prompts_dir])
-                else:  # Linux
-                    subprocess.call(['xdg-open', prompts_dir])
-        except Exception as e:
-            print(f"打开系统提示词文件夹失败: {str(e)}")
-            
-    def get_selected_system_prompt(self):
-        """获取选中的系统提示词内容"""
-        import os
-        
-        selected_prompt = self.system_prompt_selector.currentText()
-        if selected_prompt == '无':
-            return None
+                Logger.error(f"删除会话失败: {str(e)}", exc_info=False)
             
-        # 系统提示词文件夹路径
-        cwd = os.getcwd()
-        prompts_dir = os.path.join(cwd, 'system_prompts')
-        
-        # 查找可能的文件扩展名
-        for ext in ['.txt', '.md']:
-            prompt_file = os.path.join(prompts_dir, selected_prompt + ext)
-            if os.path.exists(prompt_file):
-                try:
-                    with open(prompt_file, 'r', encoding='utf-8') as f:
-                        return f.read().strip()
-                except Exception as e:
-                    print(f"读取系统提示词文件失败: {str(e)}")
-                    return None
-        
-        print(f"系统提示词文件不存在: {selected_prompt}")
-        return None
+        # 清空对话历史（进行中的请求和摘要结果将被忽略）
+        self.request_id += 1
+        self.new_session()
+        self.set_input_enabled(True)
+        self.chat_area.append("对话已清除")
@@ -3,20 +3,29 @@
 提供文件处理和转换功能
 """
 
-from PyQt5.QtWidgets import QSplitter, QWidget, QVBoxLayout, QProgressBar, QLabel, QHBoxLayout, QComboBox, QPushButton, QTextEdit, QListWidget, QListWidgetItem
-from PyQt5.QtCore import Qt, QThreadPool, QRunnable, QObject, pyqtSignal
+from PyQt5.QtWidgets import QSplitter, QWidget, QVBoxLayout, QProgressBar, QLabel, QHBoxLayout, QComboBox, QPushButton, QTextEdit, QListWidget, QListWidgetItem, QCheckBox, QDoubleSpinBox, QLineEdit
+from PyQt5.QtCore import Qt, QThreadPool, QRunnable, QObject, QTimer, pyqtSignal
 import os
 import time
-import csv
 import json
 
 from ui.components.file_drop_zone import FileDropZone
-from core.logging import Logger  # 导入日志模块
+from ui.components.log_console import LogConsole
+from core.logging import Logger, PayloadLogPolicy  # 导入日志模块
 from core import Config
-from ui.tabs.base import BaseTab
+from core.progress import ProgressTracker
+from core.export.csv_sink import CsvCardSink
+from core.storage.card_store import CardStore
+from core.tokens import completion_tokens
+from core.text.cleaning import extract_qa_pairs, strip_code_blocks
+from core.text.splitters import get_splitter, iter_sections
+from ui.tabs.base import BaseTab, SystemPromptMixin
 
 
-class FileProcessingTab(BaseTab):
+class FileProcessingTab(SystemPromptMixin, BaseTab):
+    # 卡片生成默认使用第一个问答风格
+    SELECT_FIRST_PROMPT_BY_DEFAULT = True
+
     def __init__(self, api_handler):
         super().__init__(api_handler)
         self.setup_ui_components()
@@ -24,6 +33,11 @@ class FileProcessingTab(BaseTab):
         self.current_worker = None  # 添加对当前工作线程的引用
         self.output_files = []  # 存储生成的输出文件列表
         
+        # 以固定频率采样后台任务进度，代替每一步发送的进度信号
+        self.progress_timer = QTimer(self)
+        self.progress_timer.setInterval(250)
+        self.progress_timer.timeout.connect(self.sample_progress)
+        
         # 由于生成学习卡片是默认选择的功能，提前准备好输出目录
         # 使用安全的用户目录保存输出卡片，避免权限问题
         try:
@@ -62,6 +76,7 @@ class FileProcessingTab(BaseTab):
         # 添加文件拖放区域
         self.drop_zone = FileDropZone()
         self.drop_zone.files_dropped.connect(self.handle_files_update)
+        self.drop_zone.file_removed.connect(self.update_file_info)
         splitter.addWidget(self.drop_zone)
         
         # 添加处理方式选择
@@ -106,7 +121,7 @@ class FileProcessingTab(BaseTab):
         # 刷新系统提示词按钮
         refresh_prompts_btn = QPushButton('刷新')
         refresh_prompts_btn.setToolTip('刷新系统提示词列表')
-        refresh_prompts_btn.clicked.connect(self.load_system_prompts)
+        refresh_prompts_btn.clicked.connect(self.refresh_system_prompts)
         refresh_prompts_btn.setStyleSheet("""
             QPushButton {
                 background-color: #00BCD4;
@@ -135,7 +150,7 @@ class FileProcessingTab(BaseTab):
         process_vertical_layout.addLayout(system_prompt_layout)
         
         # 加载系统提示词
-        self.load_system_prompts()
+        self.connect_system_prompts()
         
         # 第一行：处理方式选择
         process_selector_layout = QHBoxLayout()
@@ -143,8 +158,50 @@ class FileProcessingTab(BaseTab):
         self.process_selector.addItems(['生成学习卡片', '显示文件内容', '测试功能'])
         process_selector_layout.addWidget(QLabel('处理方式：'))
         process_selector_layout.addWidget(self.process_selector)
+        
+        # 生成卡片后同时导出Anki卡包
+        self.export_anki_checkbox = QCheckBox('同时导出Anki卡包(.apkg)')
+        self.export_anki_checkbox.setToolTip('每个文件的卡片会另外保存为可直接导入Anki的.apkg文件，重新导出时更新已有笔记')
+        process_selector_layout.addWidget(self.export_anki_checkbox)
+        
+        # 过滤与已有卡片或本次生成的卡片近似重复的问题
+        self.dedup_checkbox = QCheckBox('过滤近似重复卡片')
+        self.dedup_checkbox.setToolTip('问题与输出目录中已有卡片或本次生成的卡片相似度达到阈值时不再保存')
+        self.dedup_checkbox.setChecked(Config.DEDUP_ENABLED)
+        self.dedup_threshold_spin = QDoubleSpinBox()
+        self.dedup_threshold_spin.setRange(*Config.DEDUP_THRESHOLD_RANGE)
+        self.dedup_threshold_spin.setSingleStep(0.05)
+        self.dedup_threshold_spin.setDecimals(2)
+        self.dedup_threshold_spin.setValue(Config.DEDUP_THRESHOLD)
+        self.dedup_threshold_spin.setToolTip('相似度阈值，越高越严格（1.0只过滤几乎完全相同的问题）')
+        self.dedup_threshold_spin.setEnabled(Config.DEDUP_ENABLED)
+        self.dedup_checkbox.toggled.connect(self.on_dedup_settings_changed)
+        self.dedup_threshold_spin.valueChanged.connect(self.on_dedup_settings_changed)
+        process_selector_layout.addWidget(self.dedup_checkbox)
+        process_selector_layout.addWidget(self.dedup_threshold_spin)
+        
+        # 填写Ollama嵌入模型后额外按语义过滤重复卡片
+        self.embedding_model_input = QLineEdit(Config.EMBEDDING_MODEL)
+        self.embedding_model_input.setPlaceholderText('嵌入模型（可选）')
+        self.embedding_model_input.setToolTip(
+            '填写本地Ollama嵌入模型（例如 nomic-embed-text）后，'
+            f'与已有卡片语义相似度达到 {Config.SEMANTIC_DEDUP_THRESHOLD:.2f} 的卡片也会被过滤，'
+            '并可在卡片库中查找相关卡片；留空不启用'
+        )
+        self.embedding_model_input.setMaximumWidth(160)
+        self.embedding_model_input.setEnabled(Config.DEDUP_ENABLED)
+        self.embedding_model_input.editingFinished.connect(
+            lambda: Config.update_embedding_settings(self.embedding_model_input.text())
+        )
+        process_selector_layout.addWidget(self.embedding_model_input)
         process_selector_layout.addStretch()
         
+        # 在所有生成过的卡片中检索
+        self.search_cards_btn = QPushButton('搜索卡片库')
+        self.search_cards_btn.setToolTip('在所有生成过的卡片中全文检索')
+        self.search_cards_btn.clicked.connect(self.open_card_search)
+        process_selector_layout.addWidget(self.search_cards_btn)
+        
         # 添加第一行到垂直布局
         process_vertical_layout.addLayout(process_selector_layout)
         
@@ -318,12 +375,11 @@ class FileProcessingTab(BaseTab):
         # 初始隐藏输出文件区域
         self.output_files_widget.setVisible(False)
         
-        # 输出区域
-        self.output_area = QTextEdit()
-        self.output_area.setReadOnly(True)
+        # 输出区域（批量刷新、有界缓冲，支持查找和过滤）
+        self.output_area = LogConsole()
         self.output_area.setPlaceholderText("处理结果将显示在这里")
         self.output_area.setStyleSheet("""
-            QTextEdit {
+            QPlainTextEdit {
                 background: transparent;
                 border: 1px solid #ddd;
                 border-radius: 4px;
@@ -507,6 +563,19 @@ class FileProcessingTab(BaseTab):
         else:
             self.output_area.append("输出目录不存在")
     
+    def on_dedup_settings_changed(self, *args):
+        """保存近似重复过滤设置"""
+        enabled = self.dedup_checkbox.isChecked()
+        self.dedup_threshold_spin.setEnabled(enabled)
+        self.embedding_model_input.setEnabled(enabled)
+        Config.update_dedup_settings(enabled, self.dedup_threshold_spin.value())
+    
+    def open_card_search(self):
+        """打开卡片库搜索对话框，打开时会先增量导入输出目录中的CSV"""
+        from ui.dialogs.card_search import CardSearchDialog
+        dialog = CardSearchDialog(self, output_dir=self.output_dir)
+        dialog.exec_()
+    
     def open_output_file(self, file_path):
         """打开输出文件"""
         if os.path.exists(file_path):
@@ -527,6 +596,7 @@ class FileProcessingTab(BaseTab):
             # 如果有正在运行的worker，也将其is_processing设为False
             if self.current_worker:
                 self.current_worker.is_processing = False
+            self.progress_timer.stop()
                 
             # 立即恢复UI状态，不等待worker线程结束
             self.run_btn.setEnabled(True)
@@ -537,27 +607,22 @@ class FileProcessingTab(BaseTab):
             if self.output_files:
                 self.output_area.append(f"已生成 {len(self.output_files)} 个文件，可以直接双击打开")
 
-    def update_progress(self, current, total, message=''):
-        """更新进度信息"""
-        self.current_progress = current
-        self.total_files = total
-        progress_percentage = int((current / total) * 100)
-        
-        # 更新进度条
-        self.progress_bar.setValue(progress_percentage)
-        
-        # 更新状态标签
-        status_text = f'正在处理部分: {progress_percentage}% ({current}/{total})'
-        if message:
-            status_text += f' - {message}'
+    def sample_progress(self):
+        """定时采样后台任务的进度并更新进度条和状态标签"""
+        if self.current_worker is None:
+            return
+        stats = self.current_worker.progress.snapshot()
+        self.current_progress = stats['percent']
+        self.progress_bar.setValue(stats['percent'])
+        
+        status_text = f"正在处理部分: {stats['percent']}%"
+        if stats['message']:
+            status_text += f" - {stats['message']}"
+        status_text += (f" | {stats['sections_per_sec']:.2f} 片段/秒"
+                        f" | {stats['tokens_per_sec']:.0f} tokens/秒"
+                        f" | 剩余 {ProgressTracker.format_duration(stats['eta'])}")
         self.status_label.setText(status_text)
-        
-        # 添加日志信息
-        if message:
-            Logger.info(f"处理进度: {current}/{total} ({progress_percentage}%) - {message}")
-        else:
-            Logger.info(f"处理进度: {current}/{total} ({progress_percentage}%)")
-
+    
     def add_output_file(self, file_path, description):
         """添加输出文件到列表"""
         if file_path not in self.output_files:
@@ -587,7 +652,6 @@ class FileProcessingTab(BaseTab):
         # 创建一个带信号的Worker类
         class CardGeneratorWorker(QRunnable):
             class Signals(QObject):
-                progress = pyqtSignal(int, int, str)
                 log = pyqtSignal(str)
                 finished = pyqtSignal(bool, str)
                 file_processed = pyqtSignal(str, str)  # 文件路径, 描述
@@ -601,7 +665,23 @@ class FileProcessingTab(BaseTab):
                 self.is_processing = True
                 self.api_handler = parent.api_handler
                 self.model_name = Config.SELECTED_MODEL
-                self.processed_sections = set()  # 用于跟踪已处理的文件片段
+                # 任务开始时在GUI线程中确定系统提示词，整个任务复用
+                self.system_prompt = parent.get_selected_system_prompt()
+                # 进度只写入计数器，由界面定时采样
+                self.progress = ProgressTracker()
+                self.export_anki = parent.export_anki_checkbox.isChecked()
+                # 当前文件的卡片输出（每个文件一个打开的句柄，由所有片段共用）
+                self.card_sink = None
+                self.current_input_file = None
+                # 卡片同时写入集中的卡片库，便于跨文件检索
+                self.card_store = CardStore.default()
+                # 近似重复过滤，在后台线程开始时载入已有卡片
+                self.dedup_enabled = Config.DEDUP_ENABLED
+                self.dedup_threshold = Config.DEDUP_THRESHOLD
+                self.deduplicator = None
+                self.embedding_model = Config.EMBEDDING_MODEL
+                self.semantic_threshold = Config.SEMANTIC_DEDUP_THRESHOLD
+                self.card_embeddings = None
                 
             def log_message(self, message, show_in_ui=False):
                 """将信息记录到日志中，根据需要也在UI中显示
@@ -623,13 +703,13 @@ class FileProcessingTab(BaseTab):
                 self.log_message(message, show_in_ui=True)
 
             def update_progress(self, current, total, message=''):
-                self.signals.progress.emit(current, total, message)
+                self.progress.set_progress(current, total, message)
                 
             def check_if_should_stop(self):
                 """检查是否应该停止处理"""
                 return not self.parent.is_processing or not self.is_processing
             
-            def get_output_filename(self, input_file):
+            def get_output_filename(self, input_file, announce=True):
                 """生成输出文件名: 输入文件名-模型名-功能名.csv"""
                 base_name = os.path.basename(input_file)
                 file_name, _ = os.path.splitext(base_name)
@@ -638,11 +718,12 @@ class FileProcessingTab(BaseTab):
                 safe_model_name = self.model_name.replace(':', '-').replace('/', '-').replace('\\', '-').replace('*', '-').replace('?', '-').replace('"', '-').replace('<', '-').replace('>', '-').replace('|', '-')
                 
                 output_name = f"{file_name}-{safe_model_name}-学习卡片.csv"
-                self.show_card_message(f"生成安全的输出文件名: {output_name}")
+                if announce:
+                    self.show_card_message(f"生成安全的输出文件名: {output_name}")
                 return os.path.join(self.output_dir, output_name)
             
             def process_file(self, file_path, file_index, total_files):
-                """处理单个文件"""
+                """处理单个文件，边切分边生成卡片"""
                 try:
                     # 检查是否应该停止处理
                     if self.check_if_should_stop():
@@ -653,134 +734,69 @@ class FileProcessingTab(BaseTab):
                     self.log_message(f"处理进度: {file_index}/{total_files}")
                     
                     # 更新进度
-                    self.update_progress(file_index, total_files, f"处理文件: {os.path.basename(file_path)}")
+                    self.update_progress((file_index - 1) * 100, total_files * 100, f"处理文件: {os.path.basename(file_path)}")
+                    
+                    if get_splitter(file_path) is None:
+                        self.log_message(f"不支持的文件类型: {os.path.splitext(file_path)[1]}")
+                        return False
+                    
+                    # 检查文件是否为空
+                    if os.path.getsize(file_path) == 0:
+                        self.log_message(f"文件 {os.path.basename(file_path)} 是空文件，没有可处理的内容")
+                        return False
                     
                     # 为当前文件创建输出文件
                     output_file = self.get_output_filename(file_path)
                     self.log_message(f"输出文件: {output_file}")
                     
-                    # 创建临时目录存放切割文件
-                    import tempfile
-                    temp_dir = tempfile.mkdtemp(prefix=f"file_{file_index}_")
-                    self.log_message(f"创建临时目录: {temp_dir}")
-                    
                     try:
-                        # 切割文件
-                        self.log_message(f"开始切割文件: {os.path.basename(file_path)}")
-                        if file_path.lower().endswith('.md'):
-                            section_count = self.parent.split_md_by_title(file_path, temp_dir)
-                        elif file_path.lower().endswith('.txt'):
-                            section_count = self.parent.split_txt_by_section(file_path, temp_dir)
-                        elif file_path.lower().endswith('.pdf'):
-                            section_count = self.parent.split_pdf_by_page(file_path, temp_dir)
-                        else:
-                            self.log_message(f"不支持的文件类型: {os.path.splitext(file_path)[1]}")
-                            return False
-                        
-                        # 检查文件是否为空
-                        file_size = os.path.getsize(file_path)
-                        if file_size == 0:
-                            self.log_message(f"文件 {os.path.basename(file_path)} 是空文件，没有可处理的内容")
-                            return False
-                            
-                        # 如果文件太短，没有切割成功，直接处理整个文件内容
-                        if section_count == 0:
-                            self.log_message(f"文件 {os.path.basename(file_path)} 内容较短，将作为单个段落处理")
-                            
-                            # 读取原始文件内容
-                            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                                content = f.read()
-                            
-                            # 将整个内容保存为一个临时段落文件
-                            section_path = os.path.join(temp_dir, "full_content.txt")
-                            with open(section_path, 'w', encoding='utf-8') as f:
-                                f.write(content)
-                            
-                            section_count = 1
-                            section_files = ["full_content.txt"]
-                            
-                            # 创建输出CSV文件
-                            with open(output_file, 'w', newline='', encoding='utf-8') as f:
-                                writer = csv.writer(f)
-                                writer.writerow(['问题', '答案'])  # 写入表头
-                            
-                            # 处理该文件内容
-                            self.log_message(f"开始处理单一段落内容，大小: {len(content)} 字节")
-                            cards = self.process_section(section_path, 1, 1, output_file)
-                            
-                            card_count = len(cards)
-                            if card_count > 0:
-                                self.log_message(f"文件处理完成，共生成了 {card_count} 个学习卡片")
-                                self.signals.file_processed.emit(output_file, f"{card_count}个卡片")
-                                return True
-                            else:
-                                self.log_message(f"文件处理完成，但没有生成卡片")
-                                return False
-                
-                        self.log_message(f"文件切割完成，共 {section_count} 个片段")
-                        
-                        # 列出所有切割后的片段文件
-                        section_files = sorted(os.listdir(temp_dir))
-                        self.log_message(f"切割后的片段文件列表:")
-                        for idx, sec_file in enumerate(section_files):
-                            sec_path = os.path.join(temp_dir, sec_file)
-                            sec_size = os.path.getsize(sec_path)
-                            self.log_message(f"  {idx+1}. {sec_file} ({sec_size} 字节)")
-                        
                         # 创建输出CSV文件
-                        with open(output_file, 'w', newline='', encoding='utf-8') as f:
-                            writer = csv.writer(f)
-                            writer.writerow(['问题', '答案'])  # 写入表头
+                        self.open_card_output(file_path, output_file)
                         self.log_message(f"创建CSV输出文件: {output_file}")
                         
-                        # 处理每个片段
-                        processed_sections = 0
-                        all_cards = []
+                        # 片段在读取文件的同时逐个切出，读到第一个片段就开始生成
+                        self.log_message(f"开始切分文件: {os.path.basename(file_path)}")
+                        section_count = 0
                         
-                        # 遍历临时目录中的所有切割文件
-                        for i, section_file in enumerate(section_files):
+                        for section in iter_sections(file_path):
                             # 检查是否应该停止处理
                             if self.check_if_should_stop():
                                 self.log_message(f"处理被中断，停止处理剩余片段")
                                 return False
-                                
-                            section_path = os.path.join(temp_dir, section_file)
                             
-                            # 跳过已处理的片段
-                            section_id = f"{temp_dir}_{section_file}"
-                            if section_id in self.processed_sections:
-                                self.log_message(f"跳过已处理的片段: {section_file}")
-                                continue
-                                
-                            processed_sections += 1
-                            self.processed_sections.add(section_id)  # 标记为已处理
-                            
-                            self.log_message(f"\n--- 开始处理片段 {processed_sections}/{section_count}: {section_file} ---")
+                            section_count += 1
+                            location = ' > '.join(section.breadcrumb) or section.title
+                            title = f" {location}" if location else ""
+                            self.log_message(f"\n--- 开始处理片段 {section.index}{title} ({len(section.text)} 字符) ---")
                             
-                            
-                            # 处理当前片段，传递原始文件路径用于生成输出
+                            # 处理当前片段
                             start_time = time.time()
-                            cards = self.process_section(section_path, i + 1, section_count, output_file)
+                            self.process_section(section.text, section.index, output_file, section.breadcrumb)
                             end_time = time.time()
                             self.log_message(f"片段处理耗时: {end_time - start_time:.2f}秒")
                             
-                            # 添加卡片到结果集合中
-                            all_cards.extend(cards)
-                            
-                            # 输出已经在process_section中处理了，这里不再需要写入CSV
+                            # 卡片已在process_section中写入，片段完成后同步到磁盘
+                            self.card_sink.checkpoint()
                             
-                            self.log_message(f"--- 片段 {processed_sections}/{section_count} 处理完成 ---\n")
+                            self.log_message(f"--- 片段 {section.index} 处理完成 ---\n")
+                            self.progress.add_section()
                             
-                            # 更新进度 - 使用小片段进度
-                            progress_message = f"处理文件 {file_index}/{total_files}: {os.path.basename(file_path)} - 片段 {processed_sections}/{section_count}"
+                            # 更新进度 - 按已读取的文件比例
+                            progress_message = f"处理文件 {file_index}/{total_files}: {os.path.basename(file_path)} - 片段 {section.index} ({section.progress:.0%})"
                             self.update_progress(
-                                (file_index - 1) * 100 + (processed_sections * 100) // section_count,
+                                (file_index - 1) * 100 + int(section.progress * 100),
                                 total_files * 100,
                                 progress_message
                             )
                         
-                        # 完成处理
-                        card_count = len(all_cards)
+                        if section_count == 0:
+                            self.show_card_message(f"文件 {os.path.basename(file_path)} 没有可处理的内容")
+                            return False
+                        self.log_message(f"文件切分完成，共 {section_count} 个片段")
+                        
+                        # 完成处理，卡片数以去重后实际写入CSV的为准
+                        card_count = self.card_sink.card_count
+                        self.close_card_output()
                         if card_count > 0:
                             self.show_card_message(f"文件 {os.path.basename(file_path)} 处理完成，共生成了 {card_count} 个学习卡片")
                             self.show_card_message(f"输出文件: {output_file}")
@@ -788,19 +804,15 @@ class FileProcessingTab(BaseTab):
                             # 发送文件处理完成信号
                             description = f"{card_count}个卡片"
                             self.signals.file_processed.emit(output_file, description)
+                            self.export_anki_package(file_path, output_file)
                             return True
                         else:
                             self.show_card_message(f"文件 {os.path.basename(file_path)} 没有生成卡片")
                             return False
                             
                     finally:
-                        # 清理临时目录
-                        import shutil
-                        try:
-                            self.log_message(f"清理临时目录: {temp_dir}")
-                            shutil.rmtree(temp_dir)
-                        except Exception as e:
-                            self.log_message(f"清理临时文件时出错: {str(e)}")
+                        # 中断或出错时也要把已生成的卡片写入磁盘
+                        self.close_card_output()
                 
                 except Exception as e:
                     self.show_card_message(f"处理文件 {os.path.basename(file_path)} 时出错: {str(e)}")
@@ -808,86 +820,156 @@ class FileProcessingTab(BaseTab):
                     self.log_message(f"详细错误: {traceback.format_exc()}")
                     return False
             
-            def process_section(self, section_path, section_index, total_sections, output_file):
-                """处理单个文件片段"""
+            def open_card_output(self, input_file, output_file):
+                """创建文件的CSV输出，并清除卡片库中该CSV上一次生成的卡片"""
+                self.current_input_file = input_file
+                self.card_sink = CsvCardSink(output_file).open()
+                try:
+                    self.card_store.remove_csv(output_file)
+                except Exception as e:
+                    self.log_message(f"清理卡片库记录失败: {str(e)}")
+            
+            def close_card_output(self):
+                """关闭CSV输出并在卡片库中登记，之后增量导入时不再重复读取"""
+                if self.card_sink is None:
+                    return
+                sink, self.card_sink = self.card_sink, None
+                try:
+                    # 关闭前登记：文件关闭后卡片库的增量导入不再跳过它，登记后其大小和修改时间已记录
+                    sink.checkpoint()
+                    self.card_store.mark_ingested(sink.path)
+                except Exception as e:
+                    self.log_message(f"登记卡片库失败: {str(e)}")
+                finally:
+                    sink.close()
+            
+            def prepare_deduplicator(self):
+                """载入输出目录中已有的卡片，本次将重新生成的CSV除外"""
+                if not self.dedup_enabled:
+                    return
+                from core.dedup import CardDeduplicator
+                self.deduplicator = CardDeduplicator(self.dedup_threshold)
+                excluded = [self.get_output_filename(f, announce=False) for f in self.files]
+                try:
+                    start_time = time.time()
+                    self.card_store.ingest_directory(self.output_dir, should_stop=self.check_if_should_stop)
+                    count = self.deduplicator.seed_from_store(self.card_store, excluded, self.output_dir)
+                    self.show_card_message(
+                        f"已载入 {count} 张已有卡片用于去重（相似度阈值 {self.dedup_threshold:.2f}，"
+                        f"耗时 {time.time() - start_time:.2f}秒）"
+                    )
+                except Exception as e:
+                    self.log_message(f"载入已有卡片失败，只在本次生成的卡片之间去重: {str(e)}")
+                self.prepare_card_embeddings(excluded)
+            
+            def prepare_card_embeddings(self, excluded):
+                """配置了嵌入模型时，为已有卡片补齐向量用于语义去重"""
+                if not self.embedding_model:
+                    return
+                from core.services.card_embeddings import CardEmbeddings
+                if not CardEmbeddings.available():
+                    self.show_card_message("未安装numpy，跳过语义去重")
+                    return
+                try:
+                    start_time = time.time()
+                    embeddings = CardEmbeddings(self.embedding_model)
+                    count = embeddings.seed_from_store(
+                        self.card_store, excluded, self.output_dir, should_stop=self.check_if_should_stop
+                    )
+                    self.card_embeddings = embeddings
+                    self.show_card_message(
+                        f"语义去重已启用（{self.embedding_model}，相似度阈值 {self.semantic_threshold:.2f}，"
+                        f"{count} 张已有卡片，耗时 {time.time() - start_time:.2f}秒）"
+                    )
+                except Exception as e:
+                    self.show_card_message(f"嵌入模型不可用，跳过语义去重: {str(e)}")
+            
+            def write_cards(self, rows, section_content):
+                """把一个片段的卡片写入CSV和卡片库，近似重复的卡片被跳过
+
+                Returns:
+                    实际写入的 (问题, 答案) 列表
+                """
+                rows = list(rows)
+                if self.deduplicator is not None:
+                    rows, dropped = self.deduplicator.filter(rows)
+                    if dropped:
+                        self.show_card_message(f"跳过 {len(dropped)} 张近似重复的卡片")
+                        for question, duplicate_of in dropped:
+                            self.log_message(f"近似重复: {question[:40]} ≈ {duplicate_of[:40]}")
+                if self.card_embeddings is not None and rows:
+                    try:
+                        rows, dropped = self.card_embeddings.filter(rows, self.semantic_threshold)
+                        if dropped:
+                            self.show_card_message(f"跳过 {len(dropped)} 张语义重复的卡片")
+                            for question, duplicate_of in dropped:
+                                self.log_message(f"语义重复: {question[:40]} ≈ {duplicate_of[:40]}")
+                    except Exception as e:
+                        # 嵌入服务出错时本次任务不再尝试
+                        self.card_embeddings = None
+                        self.show_card_message(f"语义去重失败，已停用: {str(e)}")
+                self.card_sink.write_cards(rows)
+                try:
+                    self.card_store.add_cards(
+                        rows,
+                        source_file=self.current_input_file or '',
+                        model=self.model_name,
+                        section_hash=CardStore.section_hash(section_content),
+                        csv_path=self.card_sink.path,
+                    )
+                except Exception as e:
+                    self.log_message(f"写入卡片库失败: {str(e)}")
+                return rows
+            
+            def index_source_section(self, content):
+                """把片段原文保存到卡片库的检索索引中"""
+                try:
+                    from core.retrieval import ContextRetriever
+                    ContextRetriever(self.card_store).add_source(content, self.current_input_file or '')
+                except Exception as e:
+                    self.log_message(f"保存原文检索索引失败: {str(e)}")
+            
+            def export_anki_package(self, input_file, csv_file):
+                """把文件的CSV卡片导出为同名的.apkg卡包，牌组以输入文件命名"""
+                if not self.export_anki:
+                    return
+                from core.export import AnkiExporter
+                deck_name = f"Memoride::{os.path.splitext(os.path.basename(input_file))[0]}"
+                apkg_file = os.path.splitext(csv_file)[0] + '.apkg'
+                exporter = AnkiExporter(deck_name)
+                result = exporter.export(AnkiExporter.read_csv_cards(csv_file), apkg_file)
+                if 'error' in result:
+                    self.show_card_message(result['error'])
+                    return
+                self.show_card_message(f"已导出Anki卡包: {apkg_file}（{result['notes']}个笔记）")
+                self.signals.file_processed.emit(apkg_file, f"Anki卡包 {result['notes']}个笔记")
+            
+            def process_section(self, content, section_index, output_file, breadcrumb=()):
+                """处理单个文件片段
+
+                Args:
+                    breadcrumb: 片段所在的各级标题，多于一级时写入提示词作为上下文
+
+                Returns:
+                    去重后实际写入的 (问题, 答案) 列表
+                """
                 try:
                     # 检查是否应该停止处理
                     if self.check_if_should_stop():
                         return []
-                        
-                    # 读取文件内容
-                    with open(section_path, 'r', encoding='utf-8') as f:
-                        content = f.read().strip()
                     
+                    content = content.strip()
                     if not content:  # 跳过空内容
                         return []
                     
-                    # 计算内容行数
-                    content_lines = content.split('\n')
-                    line_count = len(content_lines)
+                    line_count = content.count('\n') + 1
                     self.log_message(f"当前片段内容行数: {line_count}")
                     
-                    # 如果内容行数少于20行，持续合并多个片段直到达到20行
-                    original_line_count = line_count
-                    if line_count < 20 and section_index < total_sections:
-                        self.log_message(f"内容行数少于20行，开始尝试合并片段")
-                        
-                        # 获取当前片段所在目录
-                        dir_path = os.path.dirname(section_path)
-                        
-                        # 获取目录中的所有文件并排序
-                        all_files = sorted([f for f in os.listdir(dir_path) if f.endswith('.md')])
-                        
-                        # 找到当前文件的索引
-                        current_filename = os.path.basename(section_path)
-                        if current_filename in all_files:
-                            current_index = all_files.index(current_filename)
-                            next_index = current_index + 1
-                            
-                            # 持续合并后续片段，直到行数达到或超过20行，或者没有更多片段可合并
-                            merged_count = 0
-                            while line_count < 20 and next_index < len(all_files):
-                                next_filename = all_files[next_index]
-                                next_file_path = os.path.join(dir_path, next_filename)
-                                
-                                # 读取下一个文件的内容
-                                try:
-                                    self.log_message(f"尝试合并片段 {next_index-current_index}: {next_filename}")
-                                    with open(next_file_path, 'r', encoding='utf-8') as f:
-                                        next_content = f.read().strip()
-                                    
-                                    # 将下一个片段标记为已处理
-                                    next_section_id = f"{dir_path}_{next_filename}"
-                                    self.processed_sections.add(next_section_id)
-                                    self.log_message(f"已将片段 {next_filename} 标记为已处理")
-                                    
-                                    # 合并内容
-                                    content = content + "\n\n" + next_content
-                                    content_lines = content.split('\n')
-                                    line_count = len(content_lines)
-                                    merged_count += 1
-                                    self.log_message(f"合并后内容行数: {line_count}")
-                                    
-                                    # 继续查找下一个片段
-                                    next_index += 1
-                                    
-                                except Exception as e:
-                                    self.log_message(f"读取片段 {next_filename} 时出错: {str(e)}")
-                                    next_index += 1  # 尝试下一个片段
-                            
-                            # 合并完成后记录信息
-                            if merged_count > 0:
-                                self.log_message(f"合并完成: 已合并 {merged_count} 个片段，内容行数从 {original_line_count} 增加到 {line_count}")
-                            else:
-                                self.log_message(f"未找到可合并的片段")
-                    
-                    # 如果内容仍然少于20行，记录信息
-                    if line_count < 20:
-                        self.log_message(f"警告: 即使尝试合并多个片段，内容仍少于20行 ({line_count}行)")
-                    else:
-                        self.log_message(f"内容行数已达到目标: {line_count}行")
+                    # 保存原文分块，供对话时检索
+                    self.index_source_section(content)
                     
                     # 生成AI提示
+                    context = f"内容所在章节: {' > '.join(breadcrumb)}\n" if len(breadcrumb) > 1 else ""
                     prompt = f"""
                     请将以下内容转换为学习卡片(问答对)格式。请严格按照JSON输出格式,不要输出任何其他解释文字:
                     {{
@@ -903,7 +985,7 @@ class FileProcessingTab(BaseTab):
                     ]
                     }}
                     
-                    原始内容:
+                    {context}原始内容:
                     {content}
                     """
                     
@@ -911,17 +993,16 @@ class FileProcessingTab(BaseTab):
                     if self.check_if_should_stop():
                         return []
                     
-                    # 调用API处理内容
+                    # 调用API处理内容，本片段的负载日志是否完整输出只采样一次
+                    full_payload_log = PayloadLogPolicy.should_dump_full()
                     self.log_message(f"正在通过模型生成卡片...")
                     self.log_message(f"使用模型: {self.model_name}")
-                    self.log_message(f"提示内容: \n{prompt}")
+                    self.log_message(f"提示内容: {PayloadLogPolicy.summarize(prompt, full=full_payload_log)}")
                     
-                    # 获取系统提示词（如果选择了）
-                    system_prompt = None
-                    if hasattr(self.parent, 'get_selected_system_prompt'):
-                        system_prompt = self.parent.get_selected_system_prompt()
-                        if system_prompt:
-                            self.log_message(f"使用系统提示词: {system_prompt[:100]}..." if len(system_prompt) > 100 else f"使用系统提示词: {system_prompt}")
+                    # 使用任务开始时确定的系统提示词
+                    system_prompt = self.system_prompt
+                    if system_prompt:
+                        self.log_message(f"使用系统提示词: {system_prompt[:100]}..." if len(system_prompt) > 100 else f"使用系统提示词: {system_prompt}")
                     
                     # 设置一个较短的超时时间来允许中断检查
                     try:
@@ -992,7 +1073,7 @@ class FileProcessingTab(BaseTab):
                             
                         # 假设返回的是JSON字符串或结果对象
                         self.log_message(f"原始响应类型: {type(response)}")
-                        self.log_message(f"原始响应内容: {str(response)}")
+                        self.log_message(f"原始响应内容: {PayloadLogPolicy.summarize(response, full=full_payload_log)}")
                         
                         # 处理DeepSeek/OpenAI格式的响应
                         if isinstance(response, dict) and 'choices' in response:
@@ -1024,7 +1105,8 @@ class FileProcessingTab(BaseTab):
                             response_text = response.get('response', '') if isinstance(response, dict) else str(response)
                             self.log_message(f"使用默认格式处理响应: {response_text[:200]}...")
                         
-                        self.log_message(f"提取的响应文本: {response_text}")
+                        self.log_message(f"提取的响应文本: {PayloadLogPolicy.summarize(response_text, full=full_payload_log)}")
+                        self.progress.add_tokens(completion_tokens(response, response_text))
                         
                         # 在 process_section 方法中添加完整性检查
                         if not response_text.strip().endswith('}'):
@@ -1109,35 +1191,15 @@ class FileProcessingTab(BaseTab):
                                     # 如果所有尝试都失败，使用正则表达式从文本中直接提取问答对
                                     self.log_message(f"所有通过格式的JSON提取方法均失败，尝试正则表达式解析")
                                     
-                                    # 使用增强的正则表达式匹配问答模式
-                                    qa_pattern = re.compile(
-                                        r'(问题\d*[:：]?\s*|q[:：]?\s*)(?P<question>.+?)\n'
-                                        r'(答案\d*[:：]?\s*|a[:：]?\s*)(?P<answer>.+?)(?=\n\s*(问题|q|$))',
-                                        re.DOTALL | re.IGNORECASE
-                                    )
-                                    
                                     cards = []
-                                    for match in qa_pattern.finditer(response_text):
-                                        question = match.group('question').strip()
-                                        answer = match.group('answer').strip()
-                                        
-                                        import re
-                                        # 清理可能存在的引号和特殊符号
-                                        question = re.sub(r'^["\']|["\']$', '', question)
-                                        answer = re.sub(r'^["\']|["\']$', '', answer)
-                                        
-                                        if question and answer:
-                                            cards.append({'q': question, 'a': answer})
-                                            self.log_message(f"通过正则提取到卡片: Q:{question[:30]}... A:{answer[:30]}...")
+                                    for question, answer in extract_qa_pairs(response_text):
+                                        cards.append({'q': question, 'a': answer})
+                                        self.log_message(f"通过正则提取到卡片: Q:{question[:30]}... A:{answer[:30]}...")
                                     
                                     if cards:
                                         self.log_message(f"通过正则表达式成功提取 {len(cards)} 个问答对")
                                         # 将提取的卡片写入CSV
-                                        with open(output_file, 'a', newline='', encoding='utf-8') as f:
-                                            writer = csv.writer(f)
-                                            for card in cards:
-                                                writer.writerow([card['q'], card['a']])
-                                        return cards
+                                        return self.write_cards(((card['q'], card['a']) for card in cards), content)
                                     else:
                                         self.log_message(f"正则表达式解析失败: 未找到有效问答对")
                                         raise json.JSONDecodeError(f"无法从响应中提取有效JSON或问答对", response_text, 0)                                
@@ -1162,8 +1224,8 @@ class FileProcessingTab(BaseTab):
                             self.log_message(f"所有JSON提取方法均失败: {str(e)}")
                             raise json.JSONDecodeError(f"无法从响应中提取有效JSON: {str(e)}", response_text, 0)
                         
-                        # 显示解析后的JSON对象
-                        self.log_message(f"解析后的JSON对象: {cards_data}")
+                        # 显示解析后的JSON对象结构（内容已在上方以摘要形式记录）
+                        self.log_message(f"解析后的JSON对象字段: {list(cards_data.keys()) if isinstance(cards_data, dict) else type(cards_data).__name__}")
                         
                         if 'cards' in cards_data and isinstance(cards_data['cards'], list):
                             cards = cards_data['cards']
@@ -1177,23 +1239,23 @@ class FileProcessingTab(BaseTab):
                                 self.show_card_message(f"答案: {card.get('a', '无答案')}")
 
                             # 增量保存卡片到CSV文件
-                            with open(output_file, 'a', newline='', encoding='utf-8') as f:
-                                writer = csv.writer(f)
-                                for card in cards:
-                                    if 'q' in card and 'a' in card:
-                                        question = card['q'].replace('\n', ' ').strip()
-                                        answer = card['a'].replace('\n', ' ').strip()
-                                        self.log_message(f"写入卡片: Q: {question[:30]}... A: {answer[:30]}...")
-                                        writer.writerow([question, answer])
+                            rows = []
+                            for card in cards:
+                                if 'q' in card and 'a' in card:
+                                    question = card['q'].replace('\n', ' ').strip()
+                                    answer = card['a'].replace('\n', ' ').strip()
+                                    self.log_message(f"写入卡片: Q: {question[:30]}... A: {answer[:30]}...")
+                                    rows.append((question, answer))
+                            kept = self.write_cards(rows, content)
                                 
-                            self.log_message(f"已将 {len(cards)} 个卡片保存到文件: {output_file}")
-                            return cards
+                            self.log_message(f"已将 {len(kept)} 个卡片保存到文件: {output_file}")
+                            return kept
                         else:
                             self.log_message(f"错误: 无法从响应中提取卡片数据，缺少'cards'字段或格式不正确")
                             return []
                     except json.JSONDecodeError as je:
                         self.log_message(f"JSON解析错误: {str(je)}")
-                        self.log_message(f"无效的JSON字符串: {response_text}")
+                        self.log_message(f"无效的JSON字符串: {PayloadLogPolicy.summarize(response_text, full=full_payload_log)}")
                         return []
                     except Exception as e:
                         self.log_message(f"处理响应时出错: {str(e)}")
@@ -1240,11 +1302,8 @@ class FileProcessingTab(BaseTab):
                     self.log_message(f"清理嵌套代码块时出错: {str(e)}")
                     
                     # 如果无法解析JSON，则使用正则表达式替换
-                    import re
-                    # 替换任何不在卡片内容中的代码块标记
-                    fixed_json = re.sub(r'```[^`]*```', '', json_str)
-                    # 替换任何剩余的代码块开始和结束标记
-                    fixed_json = fixed_json.replace('```', '')
+                    # 去掉代码块及剩余的代码块开始和结束标记
+                    fixed_json = strip_code_blocks(json_str)
                     
                     self.log_message(f"使用正则表达式清理嵌套代码块")
                     return fixed_json
@@ -1259,6 +1318,9 @@ class FileProcessingTab(BaseTab):
                     else:
                         self.log_message(f"使用现有输出目录: {self.output_dir}")
                     
+                    # 载入已有卡片用于近似重复过滤
+                    self.prepare_deduplicator()
+                    
                     # 初始化统计信息
                     total_files = len(self.files)
                     processed_files = 0
@@ -1329,78 +1391,31 @@ class FileProcessingTab(BaseTab):
         self.current_worker = CardGeneratorWorker(self, files, output_dir)
         
         # 连接信号
-        self.current_worker.signals.progress.connect(self.update_progress)
         self.current_worker.signals.log.connect(self.output_area.append)
         self.current_worker.signals.file_processed.connect(self.add_output_file)
         self.current_worker.signals.finished.connect(self.handle_processing_finished)
         
-        # 启动worker
+        # 启动worker，并开始定时采样进度
         self.thread_pool.start(self.current_worker)
+        self.progress_timer.start()
         
     def handle_processing_finished(self, success, message):
-        """处理完成的回调"""
-        # 使用 QMetaObject.invokeMethod 在主线程中更新UI
-        def update_ui():
-            # 恢复UI状态
-            self.is_processing = False
-            self.run_btn.setEnabled(True)
-            self.stop_btn.setEnabled(False)
-            self.status_label.setText('准备就绪')
-            
-            # 详细日志输出
-            self.output_area.append("\n" + "="*50)
-            self.output_area.append("处理完成状态摘要:")
-            self.output_area.append(f"成功状态: {'成功' if success else '失败'}")
-            self.output_area.append(f"状态消息: {message}")
-            self.output_area.append(f"输出目录: {self.output_dir}")
-            
-            # 如果有输出文件，确保显示文件列表区域
-            if self.output_files:
-                self.output_area.append(f"生成文件数量: {len(self.output_files)}")
-                self.output_area.append("生成文件列表:")
-                for i, file_path in enumerate(self.output_files):
-                    # 从列表项中获取描述
-                    item = self.output_files_list.item(i)
-                    if item:
-                        item_text = item.text()
-                        # 从项目文本中提取描述部分
-                        desc = item_text.split(' - ', 1)[1] if ' - ' in item_text else '无描述'
-                        self.output_area.append(f"  {i+1}. {os.path.basename(file_path)} - {desc}")
-                    else:
-                        self.output_area.append(f"  {i+1}. {os.path.basename(file_path)}")
-                
-                self.output_files_widget.setVisible(True)
-            else:
-                self.output_area.append("没有生成任何文件")
-                
-            # 最终更新进度条并隐藏
-            if success:
-                self.progress_bar.setValue(100)
-            else:
-                self.progress_bar.setValue(0)
-                
-            # 一秒后隐藏进度条
-            from PyQt5.QtCore import QTimer
-            QTimer.singleShot(1000, lambda: self.progress_bar.setVisible(False))
-            
-            # 完成消息
-            self.output_area.append(f"\n{message}")
-            
-            # 添加提示消息
-            if self.output_files:
-                self.output_area.append(f"\n您可以双击列表中的文件直接打开查看")
-                self.output_area.append(f"文件已保存在: {self.output_dir}")
-            
-            self.output_area.append("="*50)
-        
+        """处理完成的回调，在主线程中更新UI"""
+        # 停止后又开始了新的处理时，忽略旧worker迟到的完成信号
+        worker = self.current_worker
+        if worker is not None and self.sender() is not worker.signals:
+            return
         # 在主线程中执行UI更新
-        from PyQt5.QtCore import QMetaObject, Qt, Q_ARG
+        from PyQt5.QtCore import QMetaObject
         QMetaObject.invokeMethod(self, "update_ui_main_thread", Qt.QueuedConnection)
 
     # 添加一个可以被跨线程调用的槽函数
     from PyQt5.QtCore import pyqtSlot
     @pyqtSlot()
     def update_ui_main_thread(self):
+        # 停止进度采样并释放已结束的worker
+        self.progress_timer.stop()
+        self.current_worker = None
         # 恢复UI状态
         self.is_processing = False
         self.run_btn.setEnabled(True)
@@ -1415,419 +1430,3 @@ class FileProcessingTab(BaseTab):
         # 提示处理完成
         self.output_area.append("\n处理已完成。如需查看详细日志，请检查应用程序日志。")
         
-
-
-    def split_md_by_title(self, md_file_path, output_dir):
-        """按标题切割Markdown文件"""
-        try:
-            with open(md_file_path, 'r', encoding='utf-8') as md_file:
-                content = md_file.readlines()
-            
-            file_content = []
-            file_counter = 1  # 文件编号
-            
-            for line in content:
-                # 跳过以 #include 开头的行
-                if line.strip().startswith("#include"):
-                    continue
-                if "https://" in line or "http://" in line:  # 跳过链接
-                    continue
-                
-                # 处理一级标题、二级标题或三级标题
-                if line.startswith('#') and line.count('#') in [1, 2, 3]:
-                    # 如果当前内容有实际内容且不为空，保存
-                    if file_content:
-                        cleaned_content = self.clean_content(file_content)
-                        if cleaned_content:  # 如果清理后的内容不为空
-                            file_name = f"{file_counter:03d}.md"
-                            file_path = os.path.join(output_dir, file_name)
-                            os.makedirs(os.path.dirname(file_path), exist_ok=True)  # 确保目录存在
-                            with open(file_path, 'w', encoding='utf-8') as section_file:
-                                section_file.writelines(cleaned_content)
-                            file_counter += 1
-                    
-                    # 开始新的内容段落，保留标题
-                    file_content = [line]
-                else:
-                    # 添加当前内容行
-                    file_content.append(line)
-            
-            # 保存最后一部分的内容
-            if file_content:
-                cleaned_content = self.clean_content(file_content)
-                if cleaned_content:  # 如果清理后的内容不为空
-                    file_name = f"{file_counter:03d}.md"
-                    file_path = os.path.join(output_dir, file_name)
-                    os.makedirs(os.path.dirname(file_path), exist_ok=True)  # 确保目录存在
-                    with open(file_path, 'w', encoding='utf-8') as section_file:
-                        section_file.writelines(cleaned_content)
-                    file_counter += 1
-            
-            return file_counter - 1  # 返回实际创建的文件数量
-        
-        except Exception as e:
-            self.output_area.append(f"切割文件时出错: {str(e)}")
-            return 0
-    
-    def split_txt_by_section(self, file_path, output_dir):
-        """简化版TXT文件分割方法 - 仅按固定行数分割"""
-        try:
-            # 确保输出目录存在
-            os.makedirs(output_dir, exist_ok=True)
-            
-            # 读取文件内容
-            with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
-                lines = f.readlines()
-            
-            # 如果文件为空，返回0
-            if not lines:
-                self.output_area.append(f"文件为空: {os.path.basename(file_path)}")
-                return 0
-                
-            # 分割参数
-            lines_per_section = 50  # 每个段落包含的行数
-            min_section_lines = 10  # 最小有效段落行数
-            section_count = 0
-            
-            # 实际分割操作
-            for i in range(0, len(lines), lines_per_section):
-                # 获取当前段落的行
-                segment_lines = lines[i:i+lines_per_section]
-                
-                # 跳过太短的段落
-                if len(segment_lines) < min_section_lines:
-                    # 如果是最后一个片段且太短，可以合并到前一个片段
-                    if i + lines_per_section >= len(lines) and section_count > 0:
-                        # 将最后几行添加到前一个文件
-                        prev_file = os.path.join(output_dir, f"section_{section_count:03d}.txt")
-                        if os.path.exists(prev_file):
-                            with open(prev_file, 'a', encoding='utf-8') as f:
-                                f.write("\n")
-                                f.writelines(segment_lines)
-                    continue
-                
-                # 过滤空行和只有空白字符的行
-                filtered_lines = [line for line in segment_lines if line.strip()]
-                if not filtered_lines:
-                    continue
-                    
-                # 保存到文件
-                section_count += 1
-                output_file = os.path.join(output_dir, f"section_{section_count:03d}.txt")
-                
-                with open(output_file, 'w', encoding='utf-8') as f:
-                    f.writelines(filtered_lines)
-            
-            Logger.info(f"TXT文件分割完成，共创建 {section_count} 个片段")
-            
-            return section_count
-            
-        except Exception as e:
-            self.output_area.append(f"分割TXT文件时出错: {str(e)}")
-            import traceback
-            self.output_area.append(traceback.format_exc())
-            return 0
-            
-    def split_pdf_by_page(self, file_path, output_dir):
-        """PDF文件分割方法 - 按页或固定字符数分割"""
-        try:
-            # 确保输出目录存在
-            os.makedirs(output_dir, exist_ok=True)
-            
-            # 导入PyPDF2库
-            from PyPDF2 import PdfReader
-            
-            # 打开PDF文件
-            reader = PdfReader(file_path)
-            total_pages = len(reader.pages)
-            
-            if total_pages == 0:
-                self.output_area.append(f"PDF文件为空: {os.path.basename(file_path)}")
-                return 0
-                
-            self.output_area.append(f"PDF文件共有 {total_pages} 页")
-            
-            # 分割参数
-            chars_per_section = 3000  # 每个段落包含的大约字符数
-            min_chars = 500  # 最小有效段落字符数
-            section_count = 0
-            current_text = ""
-            current_chars = 0
-            
-            # 按页提取文本
-            for page_num in range(total_pages):
-                # 获取当前页文本
-                page = reader.pages[page_num]
-                page_text = page.extract_text()
-                
-                # 清理页面文本
-                cleaned_page_text = self._clean_pdf_text(page_text)
-                
-                # 如果当前页文本加上已累积文本超过了字符限制，保存当前段落
-                if current_chars > 0 and current_chars + len(cleaned_page_text) > chars_per_section:
-                    # 保存当前段落
-                    if current_chars >= min_chars:
-                        section_count += 1
-                        output_file = os.path.join(output_dir, f"section_{section_count:03d}.txt")
-                        
-                        with open(output_file, 'w', encoding='utf-8') as f:
-                            f.write(current_text)
-                            
-                        # 重置当前文本和字符计数
-                        current_text = cleaned_page_text
-                        current_chars = len(cleaned_page_text)
-                    else:
-                        # 如果当前段落太短，继续累积
-                        current_text += "\n\n" + cleaned_page_text
-                        current_chars += len(cleaned_page_text)
-                else:
-                    # 累积文本
-                    if current_chars > 0:
-                        current_text += "\n\n" + cleaned_page_text
-                    else:
-                        current_text = cleaned_page_text
-                    current_chars += len(cleaned_page_text)
-            
-            # 保存最后一个段落（如果有）
-            if current_chars >= min_chars:
-                section_count += 1
-                output_file = os.path.join(output_dir, f"section_{section_count:03d}.txt")
-                
-                with open(output_file, 'w', encoding='utf-8') as f:
-                    f.write(current_text)
-            
-            Logger.info(f"PDF文件分割完成，共创建 {section_count} 个片段")
-            
-            return section_count
-            
-        except Exception as e:
-            self.output_area.append(f"分割PDF文件时出错: {str(e)}")
-            import traceback
-            self.output_area.append(traceback.format_exc())
-            return 0
-    
-    def _clean_pdf_text(self, text):
-        """清理从PDF提取的文本"""
-        if not text:
-            return ""
-        
-        import re
-        # 移除多余的空白字符
-        text = re.sub(r'\s+', ' ', text)
-        
-        # 恢复段落分隔符（连续两个换行）
-        text = re.sub(r'(?<=[.!?。！？])\s+', '\n\n', text)
-        
-        # 清理可能的页眉页脚
-        lines = text.split('\n')
-        cleaned_lines = []
-        
-        for line in lines:
-            # 跳过可能的页码行
-            if re.match(r'^\s*\d+\s*$', line):
-                continue
-                
-            # 跳过过短的行（可能是页眉页脚）
-            if len(line.strip()) < 10 and any(char.isdigit() for char in line):
-                continue
-                
-            cleaned_lines.append(line)
-        
-        return '\n'.join(cleaned_lines)
-
-
-
-    def clean_content(self, content_lines):
-        """清理内容，去除空行和无用信息"""
-        cleaned_lines = []
-        has_content = False
-        
-        for line in content_lines:
-            line = line.rstrip()
-            
-            # 跳过纯空行和只包含空白字符的行
-            if not line.strip():
-                continue
-                
-            # 添加有内容的行
-            cleaned_lines.append(line + '\n')
-            
-            # 如果不是标题行，标记为有实际内容
-            if not line.strip().startswith('#'):
-                has_content = True
-        
-        # 如果只有标题没有内容，或者清理后完全为空，则返回空
-        if not has_content or not cleaned_lines:
-            return []
-            
-        return cleaned_lines
-
-    def load_system_prompts(self):
-        """加载系统提示词文件夹中的提示词文件"""
-        import os
-        
-        self.system_prompt_selector.blockSignals(True)
-        current_selection = self.system_prompt_selector.currentText()
-        
-        # 清除当前列表，保留"无"选项
-        self.system_prompt_selector.clear()
-        self.system_prompt_selector.addItem('无')
-        
-        # 首先尝试从应用程序安装目录加载内置的提示词模板
-        cwd = os.getcwd()
-        built_in_prompts_dir = os.path.join(cwd, 'system_prompts')
-        print(f"内置系统提示词文件夹路径: {built_in_prompts_dir}")
-        
-        # 然后获取用户可写的提示词目录
-        user_prompts_dir = self.get_user_prompts_dir()
-        print(f"用户系统提示词文件夹路径: {user_prompts_dir}")
-        
-        # 确保用户文件夹存在
-        if not os.path.exists(user_prompts_dir):
-            try:
-                os.makedirs(user_prompts_dir)
-                if hasattr(self, 'output_area'):
-                    self.output_area.append(f"已创建用户系统提示词文件夹: {user_prompts_dir}")
-                print(f"已创建用户系统提示词文件夹: {user_prompts_dir}")
-            except Exception as e:
-                if hasattr(self, 'output_area'):
-                    self.output_area.append(f"创建用户系统提示词文件夹失败: {str(e)}")
-                print(f"创建用户系统提示词文件夹失败: {str(e)}")
-        
-        # 收集所有提示词文件
-        prompt_files = []
-        
-        # 先加载内置提示词(如果目录存在)
-        if os.path.exists(built_in_prompts_dir):
-            try:
-                built_in_files = [f for f in os.listdir(built_in_prompts_dir) if f.endswith(('.txt', '.md'))]
-                for file in built_in_files:
-                    prompt_name = os.path.splitext(file)[0]
-                    # 记录文件全路径和名称
-                    prompt_files.append((os.path.join(built_in_prompts_dir, file), prompt_name, "内置"))
-            except Exception as e:
-                print(f"读取内置提示词目录出错: {str(e)}")
-        
-        # 再加载用户提示词
-        if os.path.exists(user_prompts_dir):
-            try:
-                user_files = [f for f in os.listdir(user_prompts_dir) if f.endswith(('.txt', '.md'))]
-                for file in user_files:
-                    prompt_name = os.path.splitext(file)[0]
-                    # 记录文件全路径和名称
-                    prompt_files.append((os.path.join(user_prompts_dir, file), prompt_name, "用户"))
-            except Exception as e:
-                print(f"读取用户提示词目录出错: {str(e)}")
-        
-        # 按名称排序并添加到下拉框
-        prompt_files.sort(key=lambda x: x[1])  # 按提示词名称排序
-        
-        for full_path, prompt_name, source in prompt_files:
-            # 用户提示词优先级更高，可能会覆盖同名的内置提示词
-            self.system_prompt_selector.addItem(prompt_name)
-        
-        if hasattr(self, 'output_area'):
-            self.output_area.append(f"已加载 {len(prompt_files)} 个系统提示词模板")
-        
-        # 恢复之前的选择(如果存在)
-        if current_selection and self.system_prompt_selector.findText(current_selection) >= 0:
-            self.system_prompt_selector.setCurrentText(current_selection)
-        else:
-            # 默认选择第一个提示词(如果有)
-            if self.system_prompt_selector.count() > 1:
-                self.system_prompt_selector.setCurrentIndex(1)
-        
-        self.system_prompt_selector.blockSignals(False)
-    
-    def get_user_prompts_dir(self):
-        """获取用户系统提示词目录的路径"""
-        import os
-        import tempfile
-        
-        try:
-            # 首先尝试使用APPDATA环境变量(Windows)
-            if 'APPDATA' in os.environ:
-                return os.path.join(os.environ['APPDATA'], 'Memoride', 'system_prompts')
-            # 其次尝试使用用户主目录
-            elif 'HOME' in os.environ:
-                return os.path.join(os.environ['HOME'], '.memoride', 'system_prompts')
-            # 最后使用临时目录
-            else:
-                return os.path.join(tempfile.gettempdir(), 'memoride_system_prompts')
-        except Exception as e:
-            print(f"获取用户提示词目录时出错: {str(e)}")
-            return os.path.join(os.getcwd(), 'user_system_prompts')
-    
-    def open_system_prompts_folder(self):
-        """打开系统提示词文件夹"""
-        import os
-        from PyQt5.QtGui import QDesktopServices
-        from PyQt5.QtCore import QUrl
-        
-        # 获取用户可写的提示词目录
-        user_prompts_dir = self.get_user_prompts_dir()
-        
-        # 确保目录存在
-        if not os.path.exists(user_prompts_dir):
-            try:
-                os.makedirs(user_prompts_dir)
-            except Exception as e:
-                if hasattr(self, 'output_area'):
-                    self.output_area.append(f"创建系统提示词文件夹失败: {str(e)}")
-                return
-        
-        # 打开文件夹
-        QDesktopServices.openUrl(QUrl.fromLocalFile(user_prompts_dir))
-
-    def get_selected_system_prompt(self):
-        """获取选中的系统提示词内容"""
-        import os
-        
-        selected_prompt = self.system_prompt_selector.currentText()
-        if selected_prompt == '无':
-            return None
-        
-        # 首先检查用户提示词目录
-        user_prompts_dir = self.get_user_prompts_dir()
-        
-        # 然后检查内置提示词目录
-        cwd = os.getcwd()
-        built_in_prompts_dir = os.path.join(cwd, 'system_prompts')
-        
-        # 先在用户目录查找(优先级更高)
-        prompt_content = self._read_prompt_file(user_prompts_dir, selected_prompt)
-        if prompt_content is not None:
-            return prompt_content
-            
-        # 然后在内置目录查找
-        prompt_content = self._read_prompt_file(built_in_prompts_dir, selected_prompt)
-        if prompt_content is not None:
-            return prompt_content
-            
-        if hasattr(self, 'output_area'):
-            self.output_area.append(f"系统提示词文件不存在: {selected_prompt}")
-        print(f"系统提示词文件不存在: {selected_prompt}")
-        return None
-        
-    def _read_prompt_file(self, directory, prompt_name):
-        """从指定目录读取提示词文件内容"""
-        import os
-        
-        # 检查目录是否存在
-        if not os.path.exists(directory):
-            return None
-            
-        # 查找可能的文件扩展名
-        for ext in ['.txt', '.md']:
-            prompt_file = os.path.join(directory, prompt_name + ext)
-            if os.path.exists(prompt_file):
-                try:
-                    with open(prompt_file, 'r', encoding='utf-8') as f:
-                        return f.read().strip()
-                except Exception as e:
-                    if hasattr(self, 'output_area'):
-                        self.output_area.append(f"读取系统提示词文件失败: {str(e)}")
-                    print(f"读取系统提示词文件失败: {str(e)}")
-                    return None
-                    
-        return None
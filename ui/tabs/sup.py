@@ -10,11 +10,13 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QPixmap, QFont
 from ui.tabs.base import BaseTab
+from ui.helpers import ResourceLoader
 
 class SupportTab(BaseTab):
     def __init__(self, api_handler):
         super().__init__(api_handler)
-        import resources
+        # 收款码图片在标签页首次显示时才加载
+        self.qr_images_loaded = False
         
     def init_ui(self):
         # 调用父类的init_ui以设置基本布局
@@ -80,18 +82,12 @@ class SupportTab(BaseTab):
         wechat_label.setAlignment(Qt.AlignCenter)
         wechat_label.setFont(QFont("", 12, QFont.Bold))
         
-        # 从资源加载微信收款码图片
-        wechat_qr = QLabel()
-        wechat_qr_pixmap = QPixmap(":/images/wechat_qr.png")
-        if wechat_qr_pixmap.isNull():
-            wechat_qr.setText("微信收款码图片未找到")
-        else:
-            wechat_qr_pixmap = wechat_qr_pixmap.scaled(200, 200, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            wechat_qr.setPixmap(wechat_qr_pixmap)
-            wechat_qr.setAlignment(Qt.AlignCenter)
+        # 微信收款码图片，首次显示时从资源加载
+        self.wechat_qr = QLabel("加载中...")
+        self.wechat_qr.setAlignment(Qt.AlignCenter)
         
         wechat_layout.addWidget(wechat_label)
-        wechat_layout.addWidget(wechat_qr)
+        wechat_layout.addWidget(self.wechat_qr)
         
         # 支付宝收款码
         alipay_group = QWidget()
@@ -100,18 +96,12 @@ class SupportTab(BaseTab):
         alipay_label.setAlignment(Qt.AlignCenter)
         alipay_label.setFont(QFont("", 12, QFont.Bold))
         
-        # 从资源加载支付宝收款码图片
-        alipay_qr = QLabel()
-        alipay_qr_pixmap = QPixmap(":/images/alipay_qr.png")
-        if alipay_qr_pixmap.isNull():
-            alipay_qr.setText("支付宝收款码图片未找到")
-        else:
-            alipay_qr_pixmap = alipay_qr_pixmap.scaled(200, 200, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            alipay_qr.setPixmap(alipay_qr_pixmap)
-            alipay_qr.setAlignment(Qt.AlignCenter)
+        # 支付宝收款码图片，首次显示时从资源加载
+        self.alipay_qr = QLabel("加载中...")
+        self.alipay_qr.setAlignment(Qt.AlignCenter)
         
         alipay_layout.addWidget(alipay_label)
-        alipay_layout.addWidget(alipay_qr)
+        alipay_layout.addWidget(self.alipay_qr)
         
         # 添加收款码到水平布局
         qr_layout.addWidget(wechat_group)
@@ -176,6 +166,28 @@ class SupportTab(BaseTab):
         # 将滚动区域添加到主布局
         self.layout.addWidget(scroll_area)
         
+    def showEvent(self, event):
+        """标签页首次显示时加载收款码图片"""
+        super().showEvent(event)
+        if not self.qr_images_loaded:
+            self.qr_images_loaded = True
+            self.load_qr_images()
+    
+    def load_qr_images(self):
+        """注册Qt资源并加载收款码图片"""
+        ResourceLoader.ensure_loaded()
+        self._set_qr_pixmap(self.wechat_qr, ":/images/wechat_qr.png", "微信收款码图片未找到")
+        self._set_qr_pixmap(self.alipay_qr, ":/images/alipay_qr.png", "支付宝收款码图片未找到")
+    
+    def _set_qr_pixmap(self, label, resource_path, missing_text):
+        """将资源图片缩放后显示到标签上"""
+        pixmap = QPixmap(resource_path)
+        if pixmap.isNull():
+            label.setText(missing_text)
+        else:
+            pixmap = pixmap.scaled(200, 200, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            label.setPixmap(pixmap)
+    
     def cleanup_resources(self):
         """清理标签页资源的方法，在主窗口关闭时会被调用"""
         print("支持与帮助标签页资源已清理")
\ No newline at end of file